@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark hashing of deeply nested blank node chains.
+
+Generates chains like `examples/recursive-64.ttl` (`[ : [ : [ : ... ] ] ]`) at
+increasing depths and reports subjects hashed per second for each graph type.
+
+    python benchmarks/deep_chain.py --depths 100 1000 10000 --graph oxigraph
+"""
+import argparse
+import os
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, ".."))
+
+from rdfhash import hash_subjects
+
+
+def deep_chain(depth):
+    """Return N-Triples of a chain of 'depth' nested blank nodes."""
+    lines = [f"_:b{i} <http://rdfhash.com/> _:b{i + 1} .\n" for i in range(depth - 1)]
+    lines.append(f"_:b{depth - 1} <http://rdfhash.com/> <http://rdfhash.com/> .\n")
+    return "".join(lines)
+
+
+def run(depth, graph_type):
+    data = deep_chain(depth)
+    start = time.perf_counter()
+    try:
+        hash_subjects(data, format="application/n-triples", graph_type=graph_type)
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[64, 500, 1000, 5000, 10000]
+    )
+    parser.add_argument("--graph", nargs="+", default=["oxigraph"])
+    args = parser.parse_args()
+
+    print(f"{'graph':<10} {'depth':>8} {'seconds':>10} {'subjects/s':>12}")
+    for graph_type in args.graph:
+        for depth in args.depths:
+            seconds = run(depth, graph_type)
+            if seconds == None:
+                print(f"{graph_type:<10} {depth:>8} {'RecursionError':>23}")
+            else:
+                print(
+                    f"{graph_type:<10} {depth:>8} {seconds:>10.3f} "
+                    f"{depth / seconds:>12.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
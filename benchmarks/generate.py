@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Generate deterministic synthetic N-Triples for benchmarks.
+
+Shapes:
+    wide:     Blank nodes with many triples each.
+    deep:     Chains of nested blank nodes.
+    shared:   Many blank nodes referencing a small pool of shared blank nodes,
+              including duplicate nodes which hash to the same subject.
+    literals: Blank nodes with typed, language tagged and escaped literals.
+
+Output only depends on shape, size and seed.
+
+    python benchmarks/generate.py wide 1000000 -o wide-1M.nt
+"""
+import argparse
+import random
+import sys
+from itertools import islice
+
+ns = "http://rdfhash.com/bench/"
+xsd = "http://www.w3.org/2001/XMLSchema#"
+
+
+def wide(rng, width=50):
+    i = 0
+    while True:
+        yield f"<{ns}root> <{ns}has> _:w{i} .\n"
+        for j in range(width - 1):
+            if j % 5 == 0:
+                yield f"_:w{i} <{ns}link{j}> <{ns}thing{rng.randrange(1000)}> .\n"
+            else:
+                yield f'_:w{i} <{ns}p{j}> "{i}-{rng.randrange(10**6)}" .\n'
+        i += 1
+
+
+def deep(rng, depth=100):
+    k = 0
+    while True:
+        yield f"<{ns}chain{k}> <{ns}next> _:c{k}_0 .\n"
+        for i in range(depth - 1):
+            yield f"_:c{k}_{i} <{ns}next> _:c{k}_{i + 1} .\n"
+        yield f'_:c{k}_{depth - 1} <{ns}value> "{rng.randrange(10**6)}" .\n'
+        k += 1
+
+
+def shared(rng, pool_size=100):
+    # Shared nodes: pairs with identical content hash to the same subject.
+    for j in range(pool_size):
+        yield f"_:s{j} <{ns}kind> <{ns}kind{j // 2}> .\n"
+        yield f'_:s{j} <{ns}label> "shared {j // 2}" .\n'
+    i = 0
+    while True:
+        yield f"<{ns}root> <{ns}has> _:p{i} .\n"
+        for _ in range(3):
+            yield f"_:p{i} <{ns}ref> _:s{rng.randrange(pool_size)} .\n"
+        yield f"_:p{i} <{ns}id> \"{i}\"^^<{xsd}integer> .\n"
+        i += 1
+
+
+def literals(rng):
+    values = [
+        lambda: f'"{rng.randrange(-10**6, 10**6)}"^^<{xsd}integer>',
+        lambda: f'"{rng.random() * 1000:.4f}"^^<{xsd}decimal>',
+        lambda: f'"{rng.random():.6e}"^^<{xsd}double>',
+        lambda: f'"{rng.choice(["true", "false"])}"^^<{xsd}boolean>',
+        lambda: f'"20{rng.randrange(10, 30)}-0{rng.randrange(1, 10)}-1{rng.randrange(10)}'
+        f'T12:00:00Z"^^<{xsd}dateTime>',
+        lambda: f'"text {rng.randrange(10**6)}"@{rng.choice(["en", "en-US", "fr"])}',
+        lambda: f'"line\\none \\"{rng.randrange(10**6)}\\" \\u00e9"',
+        lambda: '"' + "x" * rng.randrange(10, 200) + '"',
+    ]
+    i = 0
+    while True:
+        yield f"<{ns}root> <{ns}has> _:l{i} .\n"
+        for j, value in enumerate(values):
+            yield f"_:l{i} <{ns}v{j}> {value()} .\n"
+        i += 1
+
+
+shapes = {
+    "wide": wide,
+    "deep": deep,
+    "shared": shared,
+    "literals": literals,
+}
+
+
+def generate(shape, triples, seed=0):
+    """Yield 'triples' N-Triples lines of 'shape'.
+
+    Output is truncated at 'triples', so the last subject may be incomplete.
+    """
+    if shape not in shapes:
+        raise ValueError(
+            "Argument 'shape' must be one of: " + ", ".join(shapes) + f". Got: {shape}"
+        )
+    return islice(shapes[shape](random.Random(seed)), triples)
+
+
+def write(shape, triples, path, seed=0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(generate(shape, triples, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("shape", choices=shapes.keys())
+    parser.add_argument("triples", type=int)
+    parser.add_argument("-o", "--output", default="-")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.output == "-":
+        sys.stdout.writelines(generate(args.shape, args.triples, args.seed))
+    else:
+        write(args.shape, args.triples, args.output, args.seed)
+
+
+if __name__ == "__main__":
+    main()
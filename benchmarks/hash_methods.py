@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Compare throughput of registered hash methods on canonical hash inputs.
+
+Hashes sorted `{predicate} {object}.` lines of synthetic subjects with each
+method (see `register_hash_method`), fed incrementally like `hash_subjects`
+does, and reports MB/s and subjects/s. Optional fast methods (eg. `xxh3-64`
+from `xxhash`, `blake3`) are included when installed.
+
+    python benchmarks/hash_methods.py --subjects 10000 --width 10 100
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, ".."))
+
+from rdfhash.utils.hash import hash_lines, hash_types, hash_types_resolvable
+
+# Length used for methods which require one.
+default_length = 32
+
+
+def subject_lines(subject, width):
+    """Return sorted UTF-8 canonical lines of a synthetic subject of 'width' triples."""
+    return sorted(
+        f'<http://example.com/p{i % 7}> "value {subject} {i}"^^'
+        f"<http://www.w3.org/2001/XMLSchema#string>.\n".encode("utf-8")
+        for i in range(width)
+    )
+
+
+def run(method, inputs, repeat=1):
+    """Benchmark 'method' on 'inputs' (list of line lists). Returns result record."""
+    length = default_length if hash_types[method].requires_length else None
+    size = sum(len(line) for lines in inputs for line in lines)
+
+    best = None
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for lines in inputs:
+                hash_lines(lines, method, length)
+            seconds = time.perf_counter() - start
+            if best == None or seconds < best:
+                best = seconds
+    except Exception as e:
+        return {"method": method, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "method": method,
+        "incremental": hash_types[method].supports_update,
+        "seconds": best,
+        "bytes": size,
+        "mb_per_second": size / best / 1e6,
+        "subjects_per_second": len(inputs) / best,
+    }
+
+
+def summary(result, width):
+    if "error" in result:
+        return f"{result['method']:<12} {width:>6} {result['error']}"
+    return (
+        f"{result['method']:<12} {width:>6} {result['seconds']:>9.3f} "
+        f"{result['mb_per_second']:>9.1f} {result['subjects_per_second']:>12.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--subjects", type=int, default=10000)
+    parser.add_argument("--width", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument(
+        "--method",
+        nargs="+",
+        default=["all"],
+        help="Hash methods to run, or 'all' for every resolvable registered method.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args()
+
+    if args.method == ["all"]:
+        methods = sorted(hash_types_resolvable)
+    else:
+        methods = args.method
+
+    results = []
+    print(
+        f"{'method':<12} {'width':>6} {'seconds':>9} {'MB/s':>9} {'subjects/s':>12}",
+        file=sys.stderr,
+    )
+    for width in args.width:
+        # Same total size for every width.
+        count = max(1, args.subjects * args.width[0] // width)
+        inputs = [subject_lines(s, width) for s in range(count)]
+        for method in methods:
+            result = {"width": width, **run(method, inputs, args.repeat)}
+            print(summary(result, width), file=sys.stderr)
+            results.append(result)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "subjects": args.subjects,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
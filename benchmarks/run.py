@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Time `hash_subjects` and `reverse_hash_subjects` on synthetic graphs.
+
+Runs every combination of shape, size, graph type and hash method (see
+`generate.py`), and writes results as JSON to '--output' (stdout by default).
+A summary table is printed to stderr.
+
+    python benchmarks/run.py --sizes 1000 100000 --graph oxigraph -o results.json
+
+Defaults run every graph type with 'sha256'. Use `--method all` for every
+method in `hash_types`.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, ".."))
+sys.path.append(script_dir)
+
+from rdfhash import hash_subjects, reverse_hash_subjects
+from rdfhash.utils.graph import graph_types
+from rdfhash.utils.hash import hash_types, hash_types_requiring_length
+
+from generate import shapes, write
+
+nt = "application/n-triples"
+template = "{method}:{value}"
+
+# Length used for methods which require one.
+default_length = 32
+
+
+def timed(function, *args, **kwargs):
+    """Return `(result, wall seconds, cpu seconds)` of calling 'function'."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def run(path, triples, shape, graph_type, method, repeat=1):
+    """Benchmark one combination. Returns list of result records."""
+    if method in hash_types_requiring_length:
+        method = f"{method}:{default_length}"
+
+    record = {"shape": shape, "triples": triples, "graph": graph_type, "method": method}
+    results = []
+
+    best = None
+    try:
+        for _ in range(repeat):
+            (graph, hashed), wall, cpu = timed(
+                hash_subjects, path, nt, method, graph_type=graph_type
+            )
+            if best == None or wall < best[0]:
+                best = (wall, cpu)
+    except Exception as e:
+        return [{**record, "operation": "hash", "error": f"{type(e).__name__}: {e}"}]
+
+    results.append(
+        {
+            **record,
+            "operation": "hash",
+            "seconds": best[0],
+            "cpu_seconds": best[1],
+            "triples_per_second": triples / best[0],
+            "subjects": len(hashed),
+            "triples_after": len(graph),
+        }
+    )
+
+    hashed_data = graph.serialize(format=nt)
+    if isinstance(hashed_data, bytes):
+        hashed_data = hashed_data.decode("utf-8")
+    best = None
+    try:
+        for _ in range(repeat):
+            _, wall, cpu = timed(
+                reverse_hash_subjects, hashed_data, nt, template, graph_type
+            )
+            if best == None or wall < best[0]:
+                best = (wall, cpu)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return results + [{**record, "operation": "reverse", "error": error}]
+
+    results.append(
+        {
+            **record,
+            "operation": "reverse",
+            "seconds": best[0],
+            "cpu_seconds": best[1],
+            "triples_per_second": len(graph) / best[0],
+        }
+    )
+    return results
+
+
+def summary(result):
+    if "error" in result:
+        return (
+            f"{result['shape']:<9} {result['triples']:>9} {result['graph']:<9} "
+            f"{result['method']:<12} {result['operation']:<8} {result['error']}"
+        )
+    return (
+        f"{result['shape']:<9} {result['triples']:>9} {result['graph']:<9} "
+        f"{result['method']:<12} {result['operation']:<8} "
+        f"{result['seconds']:>9.3f} {result['triples_per_second']:>12.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--shapes", nargs="+", default=list(shapes), choices=shapes)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument(
+        "--graph", nargs="+", default=list(graph_types), choices=graph_types
+    )
+    parser.add_argument(
+        "--method",
+        nargs="+",
+        default=["sha256"],
+        help="Hash methods to run, or 'all' for every method in 'hash_types'.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args()
+
+    methods = list(hash_types) if args.method == ["all"] else args.method
+
+    results = []
+    print(
+        f"{'shape':<9} {'triples':>9} {'graph':<9} {'method':<12} {'op':<8} "
+        f"{'seconds':>9} {'triples/s':>12}",
+        file=sys.stderr,
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for shape in args.shapes:
+            for size in args.sizes:
+                path = os.path.join(tmp_dir, f"{shape}-{size}.nt")
+                write(shape, size, path, args.seed)
+                for graph_type in args.graph:
+                    for method in methods:
+                        for result in run(
+                            path, size, shape, graph_type, method, args.repeat
+                        ):
+                            print(summary(result), file=sys.stderr)
+                            results.append(result)
+                os.remove(path)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
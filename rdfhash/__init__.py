@@ -1,4 +1,8 @@
 from rdfhash.main import reverse_hash_subjects, hash_subjects
+from rdfhash.stream import hash_subjects_stream, reverse_hash_subjects_stream
+from rdfhash.merge import merge_subjects
+from rdfhash.utils.stats import Stats
+from rdfhash.utils.hash import register_hash_method
 
 # Default function 'rdfhash' uses function 'hash_subjects'.
 rdfhash = hash_subjects
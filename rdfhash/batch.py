@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rdfhash.logger import logger
+from rdfhash.main import hash_subjects
+from rdfhash.utils.graph import file_ext
+from rdfhash.utils.hash import register_hash_methods, runtime_hash_methods
+from rdfhash.utils.progress import Progress
+from rdfhash.utils.stats import Stats
+
+
+def output_path(file_path, in_dir, out_dir, method, accept="text/turtle"):
+    """Return output path of 'file_path': `{out_dir}/{name}__{method}.{ext}`.
+
+    Subdirectories of 'in_dir' are mirrored in 'out_dir'. 'ext' is the file
+    extension of 'accept' (eg. 'ttl' for 'text/turtle').
+    """
+    ext = next(ext for ext, mime_type in file_ext.items() if mime_type == accept)
+    relative = os.path.relpath(file_path, in_dir)
+    name = os.path.splitext(relative)[0]
+    return os.path.join(out_dir, f"{name}__{method}.{ext}")
+
+
+def input_files(in_dir):
+    """Return sorted paths of RDF files in 'in_dir' and its subdirectories."""
+    files = []
+    for root, dirs, names in os.walk(in_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if os.path.splitext(name)[1][1:] in file_ext:
+                files.append(os.path.join(root, name))
+    return files
+
+
+def _hash_file(file_path, out_path, accept, options):
+    """Worker: hash one file and write result to 'out_path'.
+
+    Returns:
+        dict: Report of this file. Contains 'error' if hashing failed.
+    """
+    report = {"input": file_path, "output": out_path}
+    start = time.perf_counter()
+    try:
+        stats = Stats()
+        graph, hashed_values = hash_subjects(file_path, stats=stats, **options)
+        try:
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            with stats.phase("serialize"):
+                graph.serialize(out_path, format=accept)
+        finally:
+            graph.close()
+        report.update(stats.to_dict())
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def hash_directory(
+    in_dir,
+    out_dir,
+    method="sha256",
+    template="{method}:{value}",
+    sparql_select_subjects=None,
+    graph_type="oxrdflib",
+    accept="text/turtle",
+    jobs=None,
+    bulk=False,
+    select=None,
+):
+    """Hash each RDF file of 'in_dir' independently, writing results to 'out_dir'.
+
+    Files are hashed in a pool of 'jobs' worker processes. Each worker is started
+    once and hashes many files, so libraries are only imported once per worker.
+    Output files are named `{name}__{method}.{ext}` (see `output_path`). A file
+    which fails to hash is reported, and does not stop the batch.
+
+    Args:
+        in_dir (str): Directory of input files. Format is inferred from extension.
+        out_dir (str): Directory of output files.
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        sparql_select_subjects (str, optional): SPARQL SELECT query to return
+            list of subjects which will have their triples hashed. Defaults to None.
+        graph_type (str, optional): Graph type to use. Defaults to "oxrdflib".
+        accept (str, optional): Output format. Defaults to "text/turtle".
+        jobs (int, optional): Number of worker processes.
+            Defaults to None (`os.cpu_count()`). 1 hashes files in this process.
+        bulk (bool, optional): See `hash_subjects`. Defaults to False.
+        select (str, optional): Native subject selector (see `hash_subjects`).
+            Defaults to None.
+
+    Returns:
+        dict: Summary report. 'files' holds the report of each file, with its
+            phase timings and counters (see `Stats`) or 'error'.
+    """
+    start = time.perf_counter()
+    options = {
+        "method": method,
+        "template": template,
+        "sparql_select_subjects": sparql_select_subjects,
+        "graph_type": graph_type,
+        "bulk": bulk,
+        "select": select,
+    }
+    files = input_files(in_dir)
+    jobs = jobs or os.cpu_count() or 1
+    logger.info(f"Hashing ({len(files)}) files with ({jobs}) jobs.")
+
+    tasks = [
+        (file_path, output_path(file_path, in_dir, out_dir, method, accept))
+        for file_path in files
+    ]
+    progress = Progress(len(tasks), unit="files")
+    reports = []
+
+    def collect(report):
+        if "error" in report:
+            logger.error(f"Failed to hash '{report['input']}': {report['error']}")
+        reports.append(report)
+        progress.update(
+            triples=report.get("counters", {}).get("triples_before", 0)
+        )
+
+    if jobs == 1 or len(tasks) <= 1:
+        for file_path, out_path in tasks:
+            collect(_hash_file(file_path, out_path, accept, options))
+    else:
+        # Spawned workers: forking after a graph library started its own threads
+        # can deadlock in the child.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=context,
+            initializer=register_hash_methods,
+            initargs=(runtime_hash_methods(),),
+        ) as executor:
+            futures = [
+                executor.submit(_hash_file, file_path, out_path, accept, options)
+                for file_path, out_path in tasks
+            ]
+            for future in futures:
+                collect(future.result())
+    progress.done()
+
+    failed = [report for report in reports if "error" in report]
+    return {
+        "files": reports,
+        "succeeded": len(reports) - len(failed),
+        "failed": len(failed),
+        "subjects_hashed": sum(
+            report["counters"]["subjects_hashed"]
+            for report in reports
+            if "error" not in report
+        ),
+        "seconds": time.perf_counter() - start,
+    }
@@ -1,11 +1,25 @@
 import argparse
+import json
+import os
 import sys
 import logging
 
 from rdfhash.main import hash_subjects, reverse_hash_subjects
+from rdfhash.batch import hash_directory
+from rdfhash.merge import merge_subjects
+from rdfhash.serve import serve
+from rdfhash.stream import (
+    hash_subjects_stream,
+    reverse_hash_subjects_stream,
+    stream_format,
+)
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils.endpoint import SparqlEndpoint
+from rdfhash.utils.stats import Stats, disabled
 from rdfhash.logger import logger
 from rdfhash.utils.hash import hash_types
-from rdfhash.utils.graph import mime, file_ext, graph_types
+from rdfhash.utils.graph import mime, mime_type, file_ext, graph_types
+from rdfhash.utils.select import parse_selector
 
 
 def get_parser():
@@ -23,7 +37,8 @@ def get_parser():
     parser.add_argument(
         "data",
         nargs="+",
-        help="Input RDF string or file path.\nSupported file formats: ['."
+        help="Input RDF string or file path. Use '-' to read from stdin with "
+        "--stream.\nSupported file formats: ['."
         + "', '.".join(file_ext.keys())
         + "']",
     )
@@ -31,8 +46,9 @@ def get_parser():
     parser.add_argument(
         "-f",
         "--format",
-        help="Input format.\nSupports: ['" + "', '".join(mime.keys()) + "']",
-        default="text/turtle",
+        help="Input format. Defaults to 'text/turtle', or N-Triples/N-Quads by file "
+        "extension with --stream.\nSupports: ['" + "', '".join(mime.keys()) + "']",
+        default=None,
     )
 
     parser.add_argument(
@@ -51,6 +67,16 @@ def get_parser():
         help=f"Output accept format.\nSupports: ['" + "', '".join(mime.keys()) + "']",
     )
 
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        metavar="PATH",
+        help="Write output to this file instead of stdout. Output is written "
+        "incrementally; N-Triples/N-Quads are written straight from the rewrite "
+        "phase without building the result graph.",
+    )
+
     parser.add_argument(
         "-t",
         "--template",
@@ -70,9 +96,17 @@ def get_parser():
         "-s",
         "--sparql",
         "--sparql-select-subjects",
-        default="SELECT ?s WHERE { ?s ?p ?o . FILTER (isBlank(?s)) }",
+        default=None,
         help="SPARQL SELECT query returning subject URIs to replace with hash of"
-        " their triples. Defaults to all blank node subjects.",
+        " their triples. Defaults to all blank node subjects (see --select).",
+    )
+
+    parser.add_argument(
+        "--select",
+        default=None,
+        help="Native subject selector, evaluated in a single store scan without "
+        "SPARQL: 'bnodes', 'type=<IRI>[,<IRI>]' or 'predicate=<IRI>[,<IRI>]'. "
+        "Defaults to 'bnodes' unless --sparql is given.",
     )
 
     parser.add_argument(
@@ -82,6 +116,103 @@ def get_parser():
         help="Reverse hashed URIs to Blank Nodes. --template is used to identify hashed URI template.",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes used to hash subjects of each dependency "
+        "level in parallel. Defaults to serial hashing.",
+    )
+
+    parser.add_argument(
+        "--parse-jobs",
+        type=int,
+        default=None,
+        help="Number of input files, or chunks of large N-Triples/N-Quads files, "
+        "bulk loaded concurrently into pyoxigraph stores. Defaults to the number "
+        "of CPUs.",
+    )
+
+    parser.add_argument(
+        "--sort-threshold",
+        type=int,
+        default=1000000,
+        help="Canonical lines of a subject sorted in memory. Wider subjects are "
+        "sorted with an external merge sort spilling to disk. Also applies to "
+        "--stream.",
+    )
+
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Compute every hash first, then rebuild the graph in a single bulk "
+        "pass instead of updating it triple by triple.",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream N-Triples/N-Quads line by line with bounded memory, writing "
+        "N-Triples/N-Quads to stdout or --output. Only blank node subjects are hashed "
+        "(--sparql and --select are ignored). With --reverse, hashed URIs of the input are "
+        "reversed to blank nodes in a single pass instead.",
+    )
+
+    parser.add_argument(
+        "--store",
+        default=None,
+        metavar="PATH",
+        help="Load input into an on-disk pyoxigraph store at this directory with "
+        "the bulk loader, and hash it in place. Implies '--graph oxigraph-disk'.",
+    )
+
+    parser.add_argument(
+        "--cache",
+        default=None,
+        metavar="PATH",
+        help="Persistent hash cache file (sqlite). Hash inputs seen in previous "
+        "runs are resolved from the cache instead of being hashed again.",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1000000,
+        help="Maximum number of entries kept in --cache. Least recently used "
+        "entries are evicted. Defaults to 1000000.",
+    )
+
+    parser.add_argument(
+        "--endpoint",
+        default=None,
+        metavar="URL",
+        help="SPARQL endpoint holding full descriptions of selected IRI subjects. "
+        "Their triples are fetched in batched queries before hashing, so partial "
+        "extracts hash like the full data.",
+    )
+
+    parser.add_argument(
+        "--endpoint-batch-size",
+        type=int,
+        default=100,
+        help="Subjects described per --endpoint query.",
+    )
+
+    parser.add_argument(
+        "--endpoint-concurrency",
+        type=int,
+        default=4,
+        help="Maximum --endpoint requests in flight (and pooled connections).",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-phase wall and CPU time and counters of the run as JSON "
+        "to stderr.",
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -98,34 +229,302 @@ def get_parser():
     return parser
 
 
-def cli(args_list=None):
-    """
-    Parse arguments and pass to function 'hash_subjects'. Serialize results with
-    respect to 'accept' argument.
-    """
-    # Parse arguments.
-    if args_list == None:
-        args_list = sys.argv[1:]
-    parser = get_parser()
-    args = parser.parse_args(["--help"] if len(args_list) == 0 else sys.argv[1:])
+def get_batch_parser():
+    """Return argument parser for command 'rdfhash batch'."""
+    parser = argparse.ArgumentParser(
+        prog="rdfhash batch",
+        description=(
+            "Hash each RDF file of IN_DIR independently in a pool of worker "
+            "processes. Results are written to OUT_DIR as '{name}__{method}.{ext}'."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("in_dir", help="Directory of input RDF files.")
+    parser.add_argument("out_dir", help="Directory of output files.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "-g",
+        "--graph",
+        default="oxrdflib",
+        help="Graph library to use.\nSupports: ['"
+        + "', '".join(graph_types.keys())
+        + "']",
+    )
+    parser.add_argument(
+        "-a",
+        "--accept",
+        default="text/turtle",
+        help="Output format.\nSupports: ['" + "', '".join(file_ext.keys()) + "']",
+    )
+    parser.add_argument("-t", "--template", default="{method}:{value}")
+    parser.add_argument("-m", "--method", "--hash-method", default="sha256")
+    parser.add_argument("-s", "--sparql", "--sparql-select-subjects", default=None)
+    parser.add_argument("--select", default=None)
+    parser.add_argument("--bulk", action="store_true")
+    parser.add_argument(
+        "--report", default=None, help="Write full JSON report to this path."
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def get_merge_parser():
+    """Return argument parser for command 'rdfhash merge'."""
+    parser = argparse.ArgumentParser(
+        prog="rdfhash merge",
+        description=(
+            "Hash new RDF data and merge it into an existing on-disk pyoxigraph "
+            "store. Hashed subjects already in the store are not inserted again."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "store", help="Directory of the pyoxigraph store. Created if missing."
+    )
+    parser.add_argument("data", help="Input RDF file path.")
+    parser.add_argument(
+        "-f",
+        "--format",
+        default=None,
+        help="Input format. Defaults to the file extension.\nSupports: ['"
+        + "', '".join(mime.keys())
+        + "']",
+    )
+    parser.add_argument("-t", "--template", default="{method}:{value}")
+    parser.add_argument("-m", "--method", "--hash-method", default="sha256")
+    parser.add_argument("-s", "--sparql", "--sparql-select-subjects", default=None)
+    parser.add_argument("--select", default=None)
+    parser.add_argument("--cache", default=None, metavar="PATH")
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-phase wall and CPU time and counters as JSON to stderr.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def get_serve_parser():
+    """Return argument parser for command 'rdfhash serve'."""
+    parser = argparse.ArgumentParser(
+        prog="rdfhash serve",
+        description=(
+            "Serve hashing over HTTP with a pool of warm workers. POST RDF to "
+            "'/hash', with options of 'rdfhash' as query parameters (eg. "
+            "'/hash?method=md5&accept=nt'). GET '/stats' for throughput and "
+            "latency counters."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=8321)
+    parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="PATH",
+        help="Listen on this Unix socket instead of --host and --port.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes. 1 hashes requests one at a time in a "
+        "thread of the server process.",
+    )
+    parser.add_argument("--cache", default=None, metavar="PATH")
+    parser.add_argument("--cache-size", type=int, default=1000000)
+    parser.add_argument("--endpoint", default=None, metavar="URL")
+    parser.add_argument("--endpoint-batch-size", type=int, default=100)
+    parser.add_argument("--endpoint-concurrency", type=int, default=4)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def serve_cli(args_list):
+    """Parse 'rdfhash serve' arguments and pass to function 'serve'."""
+    parser = get_serve_parser()
+    args = parser.parse_args(args_list)
+
+    if args.verbose:
+        logger.setLevel(logging.INFO)
+
+    try:
+        serve(
+            (args.host, args.port),
+            args.socket,
+            args.jobs,
+            cache=args.cache,
+            cache_size=args.cache_size,
+            endpoint=args.endpoint,
+            endpoint_batch_size=args.endpoint_batch_size,
+            endpoint_concurrency=args.endpoint_concurrency,
+        )
+    except ValueError as e:
+        parser.print_usage()
+        print(f"\nERROR: {e}")
+        sys.exit(1)
+
+
+def merge_cli(args_list):
+    """Parse 'rdfhash merge' arguments and pass to function 'merge_subjects'."""
+    parser = get_merge_parser()
+    args = parser.parse_args(args_list)
 
     if args.format in mime:
         args.format = mime[args.format]
     elif args.format in file_ext:
         args.format = file_ext[args.format]
-    elif args.format not in mime.values():
+
+    if not os.path.isfile(args.data):
         parser.print_usage()
-        print(f"\nERROR: Unsupported format: {args.format}")
+        print(f"\nERROR: Input file not found: {args.data}")
+        sys.exit(1)
+
+    if args.verbose:
+        logger.setLevel(logging.INFO)
+
+    check_select(parser, args)
+
+    stats = Stats() if args.stats else None
+    report = merge_subjects(
+        args.store,
+        args.data,
+        args.format,
+        args.method,
+        args.template,
+        args.sparql,
+        cache=args.cache,
+        stats=stats,
+        select=args.select,
+    )
+    print(
+        f"Merged '{args.data}' into '{args.store}': ({report['subjects_new']}) new "
+        f"subjects, ({report['subjects_deduplicated']}) deduplicated, "
+        f"({report['triples_inserted']}) triples inserted."
+    )
+    if stats != None:
+        print(json.dumps(stats.to_dict(), indent=2), file=sys.stderr)
+
+
+def check_select(parser, args):
+    """Exit with an error if --select is invalid, or given with --sparql."""
+    if args.select == None:
+        return
+    error = None
+    if args.sparql != None:
+        error = "--select and --sparql are exclusive."
+    else:
+        try:
+            parse_selector(args.select)
+        except ValueError as e:
+            error = str(e)
+    if error != None:
+        parser.print_usage()
+        print(f"\nERROR: {error}")
         sys.exit(1)
 
+
+def batch_cli(args_list):
+    """Parse 'rdfhash batch' arguments and pass to function 'hash_directory'."""
+    parser = get_batch_parser()
+    args = parser.parse_args(args_list)
+
     if args.accept in mime:
         args.accept = mime[args.accept]
     elif args.accept in file_ext:
         args.accept = file_ext[args.accept]
-    elif args.accept not in mime.values():
+    if args.accept not in file_ext.values():
+        parser.print_usage()
+        print(f"\nERROR: Unsupported accept format: {args.accept}")
+        sys.exit(1)
+
+    if not os.path.isdir(args.in_dir):
+        parser.print_usage()
+        print(f"\nERROR: Input directory not found: {args.in_dir}")
+        sys.exit(1)
+
+    if args.verbose:
+        logger.setLevel(logging.INFO)
+
+    check_select(parser, args)
+
+    report = hash_directory(
+        args.in_dir,
+        args.out_dir,
+        args.method,
+        args.template,
+        args.sparql,
+        args.graph,
+        args.accept,
+        args.jobs,
+        args.bulk,
+        args.select,
+    )
+
+    if args.report != None:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for file_report in report["files"]:
+        if "error" in file_report:
+            print(f"FAILED {file_report['input']}: {file_report['error']}")
+        else:
+            print(
+                f"{file_report['input']} -> {file_report['output']} "
+                f"({file_report['counters']['subjects_hashed']} subjects, "
+                f"{file_report['seconds']:.3f}s)"
+            )
+    print(
+        f"\nHashed ({report['succeeded']}) files, ({report['failed']}) failed, "
+        f"({report['subjects_hashed']}) subjects in {report['seconds']:.2f}s."
+    )
+    if report["failed"]:
+        sys.exit(1)
+
+
+def cli(args_list=None):
+    """
+    Parse arguments and pass to function 'hash_subjects'. Results are written
+    incrementally to stdout or '--output', with respect to 'accept' argument.
+
+    `rdfhash batch IN_DIR OUT_DIR` hashes each file of a directory instead (see
+    `batch_cli`). `rdfhash merge STORE DATA` merges new data into a hashed store
+    (see `merge_cli`). `rdfhash serve` runs a hashing service (see `serve_cli`).
+    """
+    # Parse arguments.
+    if args_list == None:
+        args_list = sys.argv[1:]
+    if args_list[:1] == ["batch"]:
+        return batch_cli(args_list[1:])
+    if args_list[:1] == ["merge"]:
+        return merge_cli(args_list[1:])
+    if args_list[:1] == ["serve"]:
+        return serve_cli(args_list[1:])
+    parser = get_parser()
+    args = parser.parse_args(["--help"] if len(args_list) == 0 else args_list)
+
+    if args.format == None:
+        if not args.stream:
+            args.format = "text/turtle"
+    elif mime_type(args.format) == None:
+        parser.print_usage()
+        print(f"\nERROR: Unsupported format: {args.format}")
+        sys.exit(1)
+    else:
+        args.format = mime_type(args.format)
+
+    if mime_type(args.accept) == None:
         parser.print_usage()
         print(f"\nERROR: Unsupported accept format: {args.accept}")
         sys.exit(1)
+    args.accept = mime_type(args.accept)
 
     if args.data == None:
         parser.print_usage()
@@ -137,11 +536,109 @@ def cli(args_list=None):
     elif args.verbose:
         logger.setLevel(logging.INFO)
 
-    graph, hashed_values = hash_subjects(
-        args.data, args.format, args.method, args.template, args.sparql, args.graph
-    )
+    check_select(parser, args)
+
+    if args.store != None:
+        args.graph = "oxigraph-disk"
+
+    if args.stream:
+        if len(args.data) != 1:
+            parser.print_usage()
+            print("\nERROR: --stream takes a single file path or '-'.")
+            sys.exit(1)
+        try:
+            stream_format(args.data[0], args.format)
+        except ValueError as e:
+            parser.print_usage()
+            print(f"\nERROR: {e}")
+            sys.exit(1)
+
+    if args.endpoint != None and args.stream:
+        parser.print_usage()
+        print("\nERROR: --endpoint is not supported with --stream.")
+        sys.exit(1)
+
+    endpoint = None
+    if args.endpoint != None:
+        try:
+            endpoint = SparqlEndpoint(
+                args.endpoint,
+                args.endpoint_batch_size,
+                args.endpoint_concurrency,
+            )
+        except ValueError as e:
+            parser.print_usage()
+            print(f"\nERROR: {e}")
+            sys.exit(1)
+
+    cache = None
+    if args.cache != None:
+        cache = HashCache(args.cache, args.cache_size)
+    stats = Stats() if args.stats else None
+
+    if args.output != None:
+        output = open(args.output, "wb")
+    else:
+        sys.stdout.flush()
+        output = sys.stdout.buffer
+
+    graph = None
+    try:
+        if args.stream and args.reverse:
+            reverse_hash_subjects_stream(
+                args.data[0], output, args.format, args.template
+            )
+            return
+        if args.stream:
+            hash_subjects_stream(
+                args.data[0],
+                output,
+                args.format,
+                args.method,
+                args.template,
+                cache=cache,
+                stats=stats,
+                sort_threshold=args.sort_threshold,
+            )
+            if stats != None:
+                print(json.dumps(stats.to_dict(), indent=2), file=sys.stderr)
+            return
 
-    if args.reverse:
-        reverse_hash_subjects(graph, args.format, args.template, args.graph)
+        graph, hashed_values = hash_subjects(
+            args.data,
+            args.format,
+            args.method,
+            args.template,
+            args.sparql,
+            args.graph,
+            workers=args.jobs,
+            bulk=args.bulk,
+            cache=cache,
+            stats=stats,
+            select=args.select,
+            store_path=args.store,
+            parse_jobs=args.parse_jobs,
+            sort_threshold=args.sort_threshold,
+            endpoint=endpoint,
+            # Result is reversed before it is written.
+            output=None if args.reverse else output,
+            accept=args.accept,
+        )
+        if args.reverse:
+            reverse_hash_subjects(graph, args.format, args.template, args.graph)
+            with (stats or disabled).phase("serialize"):
+                graph.serialize(output, format=args.accept)
+    finally:
+        if graph != None:
+            graph.close()
+        if cache != None:
+            cache.close()
+        if endpoint != None:
+            endpoint.close()
+        if args.output != None:
+            output.close()
+        else:
+            output.flush()
 
-    print(graph.serialize(format=args.accept))
+    if stats != None:
+        print(json.dumps(stats.to_dict(), indent=2), file=sys.stderr)
@@ -1,7 +1,30 @@
-from rdfhash.utils.hash import hash_string, hashlib_methods
+import logging
+from itertools import count
+
+from rdfhash.utils.hash import hash_canonical_lines, split_method
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils.endpoint import SparqlEndpoint, fetch_context
 from rdfhash.utils.graph import get_graph
-from rdfhash.utils import validate_uri
+from rdfhash.utils.ntriples import mime_line_based
+from rdfhash.utils import compile_template
+from rdfhash.parallel import compute_hashes_parallel, hash_graph, hash_graphs_parallel
+from rdfhash.utils.rewrite import replace_subjects
+from rdfhash.utils.index import ReferenceIndex
+from rdfhash.utils.schedule import (
+    component_levels,
+    is_cyclic,
+    strongly_connected_components,
+    subject_dependencies,
+    topological_order,
+    triple_dependencies,
+)
 from rdfhash.logger import logger
+from rdfhash.utils import stats as stats_module
+from rdfhash.utils.stats import clock
+from rdfhash.utils.progress import Progress
+from rdfhash.utils.encode import encode_term
+from rdfhash.utils.component import component_input, hash_component
+from rdfhash.utils.select import select_subjects as select_subjects_native
 
 
 def hash_subjects(
@@ -9,9 +32,21 @@ def hash_subjects(
     format=None,
     method="sha256",
     template="{method}:{value}",
-    sparql_select_subjects=("SELECT DISTINCT ?s { ?s ?p ?o . FILTER (isBlank(?s)) }"),
+    sparql_select_subjects=None,
     graph_type="oxrdflib",
     length=None,
+    workers=None,
+    bulk=False,
+    reference_index=True,
+    stats=None,
+    cache=None,
+    select=None,
+    store_path=None,
+    output=None,
+    accept=None,
+    parse_jobs=None,
+    sort_threshold=1000000,
+    endpoint=None,
 ):
     """Hash subjects by the sum of their triples.
 
@@ -36,38 +71,259 @@ def hash_subjects(
         template (str, optional): Template string for hash URI.
             Defaults to "{method}:{value}".
         sparql_select_subject (str, optional): SPARQL SELECT query to return
-            list of subjects which will have their triples hashed.
+            list of subjects which will have their triples hashed. Defaults to None
+            (see 'select').
         graph_type (str, optional): Graph type to use. Defaults to "oxrdflib".
         length (int, optional): Length of hash result. Required for some hash methods,
             optional for all.
+        workers (int, optional): Number of worker processes. If greater than 1,
+            subjects are hashed level by level in a process pool (see
+            `compute_hashes_parallel`), or graph by graph if 'data' has named
+            graphs (see `compute_graph_hashes`). Defaults to None (serial).
+        bulk (bool, optional): Compute every hash without updating the graph, then
+            rebuild the graph in a single bulk pass (see `__Graph__.rebuild`).
+            Defaults to False.
+        reference_index (bool, optional): Index triples referencing selected
+            subjects in one pass before hashing, instead of looking up references
+            of each hashed subject. Unused with 'bulk' or native graphs (see
+            `__Graph__.native_hashing`). Defaults to True.
+        stats (Stats, optional): Collects phase timings and counters of this run
+            (see `Stats`). Defaults to None (disabled).
+        cache (str|HashCache, optional): Persistent hash cache, or path of one to
+            open for this run (see `HashCache`). Defaults to None.
+        select (str, optional): Native subject selector, evaluated without SPARQL:
+            `bnodes`, `type=<IRI>[,<IRI>]` or `predicate=<IRI>[,<IRI>]` (see
+            `select_subjects`). Defaults to None (`bnodes`, unless
+            'sparql_select_subjects' is given).
+        store_path (str, optional): Directory of an on-disk pyoxigraph store to
+            load 'data' into and hash in place (see `OxiGraphDisk`). Requires
+            'graph_type' "oxigraph" or "oxigraph-disk". Defaults to None.
+        output (str|io.BufferedIOBase, optional): File path or writable binary
+            stream to write the result to. Defaults to None.
+        accept (str, optional): Format of 'output'. With N-Triples or N-Quads,
+            hashed quads are written straight from the rewrite phase (see
+            `__Graph__.write_mapped`) and the returned graph is left unchanged.
+            Defaults to None (`text/turtle`).
+        parse_jobs (int, optional): Number of input files (or chunks of large
+            N-Triples/N-Quads files) parsed concurrently into pyoxigraph stores with
+            `bulk_load` (see `__Graph__.parse_files`). Defaults to None
+            (`os.cpu_count()`).
+        sort_threshold (int, optional): Canonical lines of a subject sorted in
+            memory. Wider subjects are sorted with an external merge sort spilling
+            to disk (see `hash_canonical_lines`). Defaults to 1000000.
+        endpoint (str|SparqlEndpoint, optional): SPARQL endpoint, or URL of one,
+            holding the full descriptions of selected IRI subjects. Their triples
+            are fetched in batched queries and replace their descriptions in the
+            graph before hashing (see `fetch_context`), so partial extracts hash
+            like the full data.
+            Defaults to None.
+
+    Raises:
+        ValueError: If both 'select' and 'sparql_select_subjects' are given.
+
+    Named graphs (eg. TriG, N-Quads) are hashed independently: a subject is hashed
+    once per graph it has triples in, from its triples in that graph only, and
+    hashed triples are kept in their graph (see `compute_graph_hashes`).
 
     Returns:
-        rdflib.Graph: Updated 'data' graph.
+        tuple: `(graph, hashed_values)`. Updated 'data' graph, and subject to hashed
+            subject. If 'data' has named graphs, keys are `(graph_name, subject)`
+            with 'graph_name' None for the default graph.
     """
+    if isinstance(cache, str):
+        with HashCache(cache) as hash_cache:
+            return hash_subjects(
+                data,
+                format,
+                method,
+                template,
+                sparql_select_subjects,
+                graph_type,
+                length,
+                workers,
+                bulk,
+                reference_index,
+                stats,
+                hash_cache,
+                select,
+                store_path,
+                output,
+                accept,
+                parse_jobs,
+                sort_threshold,
+                endpoint,
+            )
+    if isinstance(endpoint, str):
+        with SparqlEndpoint(endpoint) as sparql_endpoint:
+            return hash_subjects(
+                data,
+                format,
+                method,
+                template,
+                sparql_select_subjects,
+                graph_type,
+                length,
+                workers,
+                bulk,
+                reference_index,
+                stats,
+                cache,
+                select,
+                store_path,
+                output,
+                accept,
+                parse_jobs,
+                sort_threshold,
+                sparql_endpoint,
+            )
+
+    if stats == None:
+        stats = stats_module.disabled
+
+    if select != None and sparql_select_subjects != None:
+        raise ValueError(
+            "Arguments 'select' and 'sparql_select_subjects' are exclusive."
+        )
+    if select == None and sparql_select_subjects == None:
+        select = "bnodes"
+
+    # Line based output is written from the rewrite phase of a bulk rebuild.
+    if accept == None:
+        accept = "text/turtle"
+    streamed = output != None and accept in mime_line_based
+    bulk = bulk or streamed
+    written = None
 
     # Convert data provided to rdflib.Graph.
-    graph = get_graph(data, format, graph_type)
+    with stats.phase("parse"):
+        graph = get_graph(
+            data, format, graph_type, store_path=store_path, parse_jobs=parse_jobs
+        )
     len_before = len(graph)
 
-    # Use SPARQL query 'sparql_select_subject' to get list of subjects to hash.
+    # Use native selector 'select', or SPARQL query 'sparql_select_subject' to get
+    # list of subjects to hash.
     select_subjects = set()
-    for row in graph.query(sparql_select_subjects):
-        for item in row:
-            select_subjects.add(item)
 
-    logger.info(
-        f"\n({len(select_subjects)}) Hashing subject triples:\n-- "
-        + "\n-- ".join([graph.term_to_string(s) for s in select_subjects])
-    )
+    def select_all():
+        with stats.phase("select"):
+            select_subjects.clear()
+            if select != None:
+                select_subjects.update(select_subjects_native(graph, select))
+            else:
+                select_subjects.update(graph.query_subjects(sparql_select_subjects))
+
+    select_all()
+
+    # Complete descriptions of selected subjects from the endpoint, then select
+    # again as fetched triples may match the selection (eg. blank nodes), and
+    # replaced ones no longer do.
+    if endpoint != None:
+        with stats.phase("fetch"):
+            stats.set("triples_fetched", fetch_context(graph, select_subjects, endpoint))
+        for name, value in endpoint.stats().items():
+            stats.set(name, value)
+        select_all()
+        len_before = len(graph)
+
+    # Only build subject listings if they will be logged.
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            f"\n({len(select_subjects)}) Hashing subject triples:\n-- "
+            + "\n-- ".join([graph.term_to_string(s) for s in select_subjects])
+        )
+    progress = Progress(len(select_subjects))
 
     hashed_values = {}  # Dictionary of subjects and resolved hash values.
 
-    spec_length = None
-    if ":" in method:
-        method, spec_length = method.split(":")
-        spec_length = int(spec_length)
+    method, spec_length = split_method(method)
+
+    # Blank nodes are scoped to their named graph, each graph is hashed on its own.
+    named = graph.has_named_graphs()
+
+    # Native pyoxigraph path: collect quads and references in one store pass,
+    # compute hashes, then replace quads in a batch.
+    native = graph.native_hashing and not bulk and not named
+    triples = None
+
+    # Index references to selected subjects, used to replace them once hashed.
+    index = None
+    if native:
+        with stats.phase("index"):
+            triples, references = graph.subject_quads(select_subjects)
+    elif reference_index and not bulk and not named:
+        with stats.phase("index"):
+            index = ReferenceIndex(graph, select_subjects)
+        index_size = index.memory_size()
+        logger.info(
+            f"Indexed ({len(index)}) references to selected subjects "
+            f"(~{index_size} bytes)."
+        )
+        stats.set("reference_index_entries", len(index))
+        stats.set("reference_index_bytes", index_size)
+
+    # Pre-pass of the serial path: if selected subjects have circular dependencies,
+    # hash every subject first (see `compute_hashes`), before updating the graph.
+    serial = not (named or bulk or native or (workers and workers > 1))
+    if serial:
+        with stats.phase("index"):
+            triples, dependencies = subject_dependencies(graph, select_subjects)
+            serial = not any(
+                is_cyclic(c, dependencies)
+                for c in strongly_connected_components(dependencies)
+            )
 
-    for s in select_subjects:
+    if named:
+        graph_hashes = compute_graph_hashes(
+            graph,
+            select_subjects,
+            method,
+            template,
+            length or spec_length,
+            workers,
+            cache,
+            stats,
+            progress,
+            sort_threshold,
+        )
+        with stats.phase("rewrite"):
+            if streamed:
+                written = graph.write_mapped(output, accept, None, graph_hashes)
+            else:
+                graph.rebuild(None, graph_hashes)
+        hashed_values = {
+            (name, s): hash_subj
+            for name, mapping in graph_hashes.items()
+            for s, hash_subj in mapping.items()
+        }
+
+    elif not serial:
+        # Compute all hashes first, then update graph.
+        hashed_values, triples = compute_hashes(
+            graph,
+            select_subjects,
+            method,
+            template,
+            length or spec_length,
+            workers,
+            triples,
+            cache,
+            stats,
+            progress,
+            sort_threshold,
+        )
+        with stats.phase("rewrite"):
+            if streamed:
+                written = graph.write_mapped(output, accept, hashed_values)
+            elif bulk:
+                graph.rebuild(hashed_values)
+            elif native:
+                graph.replace(hashed_values, triples, references)
+            else:
+                replace_subjects(graph, hashed_values, triples, index)
+
+    # Serial path, hashing and updating graph subject by subject.
+    for s in () if named else select_subjects:
         if s in hashed_values:
             continue
 
@@ -86,18 +342,47 @@ def hash_subjects(
                 template,
                 select_subjects,
                 length=length or spec_length,
+                index=index,
+                cache=cache,
+                stats=stats,
+                progress=progress,
+                sort_threshold=sort_threshold,
             )
         )
+    progress.done()
 
-    logger.info(
-        f"\n({len(hashed_values)}) Hashed subjects:\n-- "
-        + "\n-- ".join(
-            f"{graph.term_to_string(k)} -> {graph.term_to_string(v)}"
-            for k, v in hashed_values.items()
+    if cache != None:
+        cache.flush()
+        for name, value in cache.stats().items():
+            stats.set(name, value)
+
+    if logger.isEnabledFor(logging.INFO):
+
+        def label(key):
+            if not named:
+                return graph.term_to_string(key)
+            name, s = key
+            in_graph = "default graph" if name is None else graph.term_to_string(name)
+            return f"{graph.term_to_string(s)} in {in_graph}"
+
+        logger.info(
+            f"\n({len(hashed_values)}) Hashed subjects:\n-- "
+            + "\n-- ".join(
+                f"{label(k)} -> {graph.term_to_string(v)}"
+                for k, v in hashed_values.items()
+            )
         )
-    )
 
-    len_after = len(graph)
+    if output != None and not streamed:
+        with stats.phase("serialize"):
+            graph.serialize(output, format=accept)
+
+    len_after = len(graph) if written == None else written
+    stats.set("triples_before", len_before)
+    stats.set("triples_after", len_after)
+    stats.set("subjects_selected", len(select_subjects))
+    stats.set("subjects_hashed", len(hashed_values))
+
     if len_before == len_after:
         logger.info(f"(=) Graph size did not change: {len_before}")
     else:
@@ -108,6 +393,248 @@ def hash_subjects(
     return graph, hashed_values
 
 
+def compute_hashes(
+    graph,
+    select_subjects,
+    method="sha256",
+    template="{method}:{value}",
+    length=None,
+    workers=None,
+    triples=None,
+    cache=None,
+    stats=None,
+    progress=None,
+    sort_threshold=1000000,
+):
+    """Compute hashed subjects without updating 'graph'.
+
+    Args:
+        graph (__Graph__): Graph containing subjects.
+        select_subjects (set): Subjects to hash.
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        length (int, optional): Length of hash result.
+        workers (int, optional): Number of worker processes. Defaults to None.
+        triples (dict, optional): Subject to list of its triples, if already
+            collected. Defaults to None (read from 'graph').
+        cache (HashCache, optional): Persistent hash cache. Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters.
+            Defaults to None.
+        progress (Progress, optional): Reports hashed subjects. Defaults to None.
+        sort_threshold (int, optional): See `hash_canonical_lines`.
+            Defaults to 1000000.
+
+    Circular dependencies between selected subjects are found before hashing
+    (see `strongly_connected_components`), reported, then each is hashed as a unit
+    (see `hash_component`).
+
+    Returns:
+        tuple: `(hashed_values, triples)`. Subject to hashed subject, and subject to
+            list of its triples.
+    """
+    if stats == None:
+        stats = stats_module.disabled
+    if progress == None:
+        progress = Progress(len(select_subjects))
+
+    with stats.phase("index"):
+        if triples == None:
+            triples, dependencies = subject_dependencies(graph, select_subjects)
+        else:
+            dependencies = triple_dependencies(triples)
+        components = strongly_connected_components(dependencies)
+    report_cycles(
+        graph, [c for c in components if is_cyclic(c, dependencies)], stats
+    )
+
+    if workers and workers > 1:
+        hashed_values = compute_hashes_parallel(
+            graph,
+            triples,
+            dependencies,
+            method,
+            template,
+            length,
+            workers,
+            cache,
+            stats,
+            progress,
+            components,
+            sort_threshold,
+        )
+        return hashed_values, triples
+
+    hashed_values = {}
+
+    def to_string(term):
+        return encode_term(hashed_values.get(term, term))
+
+    for component in components:
+        if is_cyclic(component, dependencies):
+            if stats.enabled:
+                lap = clock()
+            uris = hash_component(
+                component_input(component, triples, to_string),
+                method,
+                template,
+                length,
+                cache,
+            )
+            for s, uri in zip(component, uris):
+                hashed_values[s] = graph.NamedNode(uri)
+            if stats.enabled:
+                stats.lap("hash", lap)
+                external = {d for s in component for d in dependencies[s]}
+                for s in component:
+                    stats.depth(s, external.difference(component))
+            progress.update(
+                len(component), sum(len(triples[s]) for s in component)
+            )
+            continue
+
+        s = component[0]
+        lap = clock() if stats.enabled else None
+        uri = hash_canonical_lines(
+            (
+                f"{to_string(t[1])} {to_string(t[2])}.\n".encode("utf-8")
+                for t in triples[s]
+            ),
+            method,
+            template,
+            length,
+            cache,
+            sort_threshold,
+            stats,
+            lap,
+        )
+        hashed_values[s] = graph.NamedNode(uri)
+        if stats.enabled:
+            stats.depth(s, dependencies[s])
+        progress.update(triples=len(triples[s]))
+
+    return hashed_values, triples
+
+
+def compute_graph_hashes(
+    graph,
+    select_subjects,
+    method="sha256",
+    template="{method}:{value}",
+    length=None,
+    workers=None,
+    cache=None,
+    stats=None,
+    progress=None,
+    sort_threshold=1000000,
+):
+    """Compute hashed subjects of each graph without updating 'graph'.
+
+    Blank nodes are scoped to their graph: each graph only sees triples of its own
+    subjects, so the same subject in two graphs is hashed twice, from different
+    triples. Graphs do not depend on each other, and are hashed concurrently in a
+    process pool if 'workers' is greater than 1 (see `hash_graphs_parallel`).
+
+    Args:
+        graph (__Graph__): Graph containing subjects.
+        select_subjects (set): Subjects to hash.
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        length (int, optional): Length of hash result.
+        workers (int, optional): Number of worker processes. Defaults to None.
+        cache (HashCache, optional): Persistent hash cache. If given, graphs are
+            hashed in this process. Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters.
+            Defaults to None.
+        progress (Progress, optional): Reports hashed subjects. Defaults to None.
+        sort_threshold (int, optional): See `hash_canonical_lines`.
+
+    Returns:
+        dict: Graph name (None for the default graph) to a dictionary of subject to
+            hashed subject.
+    """
+    if stats == None:
+        stats = stats_module.disabled
+    if progress == None:
+        progress = Progress(len(select_subjects))
+
+    with stats.phase("index"):
+        graph_triples = graph.graph_triples(select_subjects)
+    stats.set("graphs", len(graph_triples))
+
+    # Components of each graph leaves first, with references to subjects of the
+    # same graph replaced by their index.
+    names = [*graph_triples]
+    orders = []
+    inputs = []
+    cyclic = []
+    with stats.phase("canonicalize"):
+        for name in names:
+            triples = graph_triples[name]
+            dependencies = triple_dependencies(triples)
+            components = strongly_connected_components(dependencies)
+            cyclic += [c for c in components if is_cyclic(c, dependencies)]
+            stats.maximum("max_depth", len(component_levels(components, dependencies)))
+            order = [s for component in components for s in component]
+            position = {s: i for i, s in enumerate(order)}
+
+            def to_input(term):
+                i = position.get(term)
+                return encode_term(term) if i is None else i
+
+            orders.append(order)
+            inputs.append(
+                [
+                    [[(to_input(t[1]), to_input(t[2])) for t in triples[s]] for s in c]
+                    for c in components
+                ]
+            )
+    report_cycles(graph, cyclic, stats)
+
+    logger.info(f"Hashing ({len(select_subjects)}) subjects in ({len(names)}) graphs.")
+
+    with stats.phase("hash"):
+        if workers and workers > 1 and cache == None:
+            results = hash_graphs_parallel(
+                inputs, method, template, length, workers, sort_threshold
+            )
+        else:
+            results = [
+                hash_graph(components, method, template, length, cache, sort_threshold)
+                for components in inputs
+            ]
+
+    graph_hashes = {}
+    for name, order, uris in zip(names, orders, results):
+        graph_hashes[name] = {
+            s: graph.NamedNode(uri) for s, uri in zip(order, uris)
+        }
+        progress.update(len(order), sum(len(graph_triples[name][s]) for s in order))
+
+    return graph_hashes
+
+
+def report_cycles(graph, components, stats=stats_module.disabled):
+    """Log every circular dependency found, before any subject is hashed.
+
+    Args:
+        graph (__Graph__): Graph containing subjects.
+        components (list[list]): Strongly connected components with a cycle.
+        stats (Stats, optional): Counts 'cyclic_components'.
+    """
+    stats.count("cyclic_components", len(components))
+    if components and logger.isEnabledFor(logging.WARNING):
+        logger.warning(
+            f"({len(components)}) Circular dependencies between selected subjects, "
+            "each hashed as a unit:\n-- "
+            + "\n-- ".join(
+                " <--> ".join(graph.term_to_string(s) for s in component)
+                for component in components
+            )
+        )
+
+
 def hash_subject(
     graph,
     subject,
@@ -116,12 +643,19 @@ def hash_subject(
     also_subjects=None,
     circ_deps=None,
     length=None,
+    index=None,
+    cache=None,
+    stats=None,
+    progress=None,
+    sort_threshold=1000000,
 ):
     """Replaces subject in graph with hash of it's triples.
 
-    If encounters a blank node in the object position, recursively hashes it.
+    If encounters any of 'also_subjects' in the predicate or object position, hashes
+    it first. Subjects are scheduled leaves first with an explicit stack (see
+    `topological_order`), so nesting depth is only limited by memory.
 
-    Updates 'graph' rdflib.Graph but does not return anything.
+    Updates 'graph' rdflib.Graph in place.
 
     Args:
         graph (rdflib.Graph): rdflib.Graph.
@@ -130,35 +664,93 @@ def hash_subject(
         template (str, optional): Template string for hash URI.
             Defaults to "{method}:{value}".
         also_subjects (set, optional) If encounters any of these terms in triples,
-            recursively resolves them. Throws error if circular dependency found.
+            resolves them first. Throws error if circular dependency found.
             Defaults to None.
-        circ_deps (set, optional): Set of values which 'subject' cannot be.
+        circ_deps (set, optional): Set of values which 'subject' cannot depend on.
             Defaults to None.
         length (int, optional): Length of hash result. Required for some hash methods,
             optional for all.
+        index (ReferenceIndex, optional): References to 'also_subjects', used to
+            replace them once hashed. Defaults to None (look up in 'graph').
+        cache (HashCache, optional): Persistent hash cache. Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters.
+            Defaults to None.
+        progress (Progress, optional): Reports hashed subjects. Defaults to None.
+        sort_threshold (int, optional): See `hash_canonical_lines`.
+            Defaults to 1000000.
 
     Raises:
-        ValueError: If blank node in predicate position of any triples.
-        ValueError: If subject does not have triples associated with it.
         ValueError: If circular dependency is detected. Unable to resolve
             current hash.
+
+    Returns:
+        dict: Subjects to hashed subjects, in the order they were hashed.
     """
     hashed_values = {}  # Return dictionary.
 
-    # if type(template) != Template:
-    #     template = Template(template)
-
     if also_subjects == None:
         also_subjects = set()
+    if stats == None:
+        stats = stats_module.disabled
+
+    # Terms of each subject, only kept if 'stats' is enabled to measure depth.
+    # Includes subjects hashed in previous calls, already replaced by their hash.
+    terms = {}
+
+    def dependencies_of(s):
+        triples = [*graph.triples((s, None, None))]
+        if stats.enabled:
+            terms[s] = [t[i] for t in triples for i in (1, 2)]
+        return [t[i] for t in triples for i in (1, 2) if t[i] in also_subjects]
+
+    for s in topological_order(
+        [subject], dependencies_of, circ_deps, graph.term_to_string
+    ):
+        hash_subj = _hash_triples(
+            graph,
+            s,
+            method,
+            template,
+            length,
+            hashed_values,
+            index,
+            cache,
+            stats,
+            progress,
+            sort_threshold,
+        )
+        if hash_subj is not None:
+            hashed_values[s] = hash_subj
+            if stats.enabled:
+                stats.depth(s, terms.pop(s))
+                stats.depths[hash_subj] = stats.depths[s]
 
-    if circ_deps == None:
-        circ_deps = set()
+    return hashed_values
 
-    # Add current subject to circular dependencies.
-    circ_deps.add(subject)
 
-    hash_input_list = []  # List of values to hash. (`${predicate} ${object}.`)
-    triples_add = []  # List of triples to replace with hashed subject.
+def _hash_triples(
+    graph,
+    subject,
+    method,
+    template,
+    length,
+    hashed_values,
+    index,
+    cache=None,
+    stats=stats_module.disabled,
+    progress=None,
+    sort_threshold=1000000,
+):
+    """Replace 'subject' with the hash of its triples. Dependencies must be hashed.
+
+    Objects referencing hashed subjects are already replaced in 'graph'. Predicates
+    are replaced using 'hashed_values'.
+
+    Returns:
+        Hashed subject, or None if 'subject' has no triples.
+    """
+    if stats.enabled:
+        lap = clock()
 
     # Get all triples containing subject.
     triples = [*graph.triples((subject, None, None))]
@@ -168,76 +760,63 @@ def hash_subject(
         logger.warning(
             "Could not find any triples for subject: " + graph.term_to_string(subject)
         )
-        return hashed_values
-
-    # Generate list of `${predicate} ${object}.` for each triple on subject.
-    # ----------------------------------------------------------------------
+        return None
 
+    pred_objs = []
     for triple in triples:
         graph.remove(triple)  # Remove triple from graph.
-
-        triple_new = []
-
-        # Iterate over 'predicate' (1) and 'object' (2).
-        for i in range(1, 3):
-            term = triple[i]
-            if term in also_subjects:
-                # If object in circular dependencies, throw error.
-                if term in circ_deps:
-                    raise ValueError(
-                        "Unable to resolve hash. Circular dependency "
-                        f"detected: {graph.term_to_string(subject)} <--> {graph.term_to_string(term)}"
-                    )
-
-                # Recursive Call.
-                # ---------------
-                # Resolve hash value of nested triples first.
-                hashed_values.update(
-                    hash_subject(
-                        graph, term, method, template, also_subjects, circ_deps, length
-                    )
-                )
-                triple_new.append(hashed_values[term])
-            else:
-                triple_new.append(term)
-
-        # Append predicate and object to list to be added later with hashed subject.
-        triples_add.append(triple_new)
-
-        # Append `{predicate} {object}.\n` to list of values to hash.
-        hash_input_list.append(
-            f"{graph.term_to_string(triple_new[0], True)} {graph.term_to_string(triple_new[1], True)}.\n"
+        pred_objs.append((hashed_values.get(triple[1], triple[1]), triple[2]))
+
+    # `${predicate} ${object}.\n` for each triple on subject, encoded lazily.
+    def to_line(pred_obj):
+        p, o = pred_obj
+        return f"{graph.term_to_string(p, True)} {graph.term_to_string(o, True)}.\n"
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            '(%d) Hashing triple set: """%s"""',
+            len(pred_objs),
+            "".join(sorted(map(to_line, pred_objs))),
         )
 
-    # Sort and concatenate list, hash value, then add to graph.
-    # ---------------------------------------------------------
-
-    # Sort list of strings: `{predicate} {object}.\n`
-    hash_input_list.sort()
-
-    # Join list of strings to be hashed.
-    hash_input = "".join(hash_input_list)
-
-    logger.debug(f'({len(hash_input_list)}) Hashing triple set: """{hash_input}"""')
-
-    # Concatenate sorted list, hash with method, then add to a URIRef.
-    hash_dict = {"method": method, "value": hash_string(hash_input, method, length)}
-    hash_subj = graph.NamedNode(template.format(**hash_dict))
+    # Sort lines as bytes, hash incrementally, then add to a URIRef.
+    hash_subj = graph.NamedNode(
+        hash_canonical_lines(
+            (to_line(pred_obj).encode("utf-8") for pred_obj in pred_objs),
+            method,
+            template,
+            length,
+            cache,
+            sort_threshold,
+            stats,
+            lap if stats.enabled else None,
+        )
+    )
+    if stats.enabled:
+        lap = clock()
 
-    logger.debug(f"Result of hashed triples: {graph.term_to_string(hash_subj)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Result of hashed triples: {graph.term_to_string(hash_subj)}")
 
     # Add triples to graph with hashed subject.
-    for pred_obj in triples_add:
+    for pred_obj in pred_objs:
         graph.add((hash_subj, *pred_obj))
 
     # Replace instances of current subject in the object position.
-    for triple in graph.triples((None, None, subject)):
+    if index == None:
+        references = [*graph.triples((None, None, subject))]
+    else:
+        references = index.pop(subject)
+    for triple in references:
         graph.remove(triple)
         graph.add((triple[0], triple[1], hash_subj))
 
-    # Add hashed subject to 'hashed_values' and return.
-    hashed_values[subject] = hash_subj
-    return hashed_values
+    if stats.enabled:
+        stats.lap("rewrite", lap)
+    if progress != None:
+        progress.update(triples=len(triples))
+
+    return hash_subj
 
 
 def reverse_hash_subjects(
@@ -245,43 +824,47 @@ def reverse_hash_subjects(
 ):
     """Convert hashed URIs to blank nodes.
 
+    'template' is compiled once (see `TemplateMatcher`), and each distinct term is
+    matched once. Triples are collected in a single pass before the graph is
+    updated. See `reverse_hash_subjects_stream` for N-Triples/N-Quads streams.
+
     Args:
         data (_type_): Data representing RDF triples.
         format (str, optional): Format of data. Defaults to None.
+        template (str, optional): Template of hashed URIs.
+            Defaults to "{method}:{value}".
+        graph_type (str, optional): Graph type to use. Defaults to "oxrdflib".
 
     Returns:
         rdflib.Graph: Updated 'data' graph.
     """
-    bnode_int = 0
-    bnode_dict = {}
-
+    matcher = compile_template(template)
     graph = get_graph(data, format, graph_type)
 
-    # Check every term in graph.
+    bnodes = {}  # Term to blank node, or None if term is not a hashed URI.
+    bnode_ids = count()
+
+    def reverse(term):
+        if term not in bnodes:
+            bnodes[term] = None
+            # If term matches 'template', replace with blank node.
+            if graph.is_uri(term) and matcher(graph.term_to_string(term)[1:-1]):
+                bnodes[term] = graph.BlankNode(str(next(bnode_ids)))
+        return bnodes[term]
+
+    # Check every term in graph, without updating graph while iterating.
+    updates = []
     for triple in graph.triples():
-        new_triple = []  # Replaces 'triple'.
-        updated = False  # Tracks whether 'new_triple' is different to 'triple'.
-
-        for term in triple:
-            if term in bnode_dict:
-                updated = True
-                new_triple.append(bnode_dict[term])
-            # If term matches 'template' regex, replace with blank node.
-            elif graph.is_uri(term) and validate_uri(
-                graph.term_to_string(term)[1:-1], template
-            ):
-                updated = True
-                bnode = graph.BlankNode(bnode_int)
-                bnode_int += 1
-                bnode_dict[term] = bnode
-                new_triple.append(bnode)
-            # If does not start with hash method, do not update.
-            else:
-                new_triple.append(term)
+        reversed_terms = [reverse(term) for term in triple]
+        if any(term is not None for term in reversed_terms):
+            new_triple = tuple(
+                term if new is None else new
+                for term, new in zip(triple, reversed_terms)
+            )
+            updates.append((triple, new_triple))
 
-        # If 'new_triple' is different to 'triple', replace with new.
-        if updated:
-            graph.remove(triple)
-            graph.add(new_triple)
+    for triple, new_triple in updates:
+        graph.remove(triple)
+        graph.add(new_triple)
 
     return graph
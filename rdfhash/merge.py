@@ -0,0 +1,106 @@
+import pyoxigraph
+
+from rdfhash.logger import logger
+from rdfhash.main import hash_subjects
+from rdfhash.utils import stats as stats_module
+
+
+def merge_subjects(
+    store,
+    data,
+    format=None,
+    method="sha256",
+    template="{method}:{value}",
+    sparql_select_subjects=None,
+    length=None,
+    cache=None,
+    stats=None,
+    select=None,
+):
+    """Hash new 'data' and merge it into an existing hashed store.
+
+    Only 'data' is parsed and hashed. Hashed subjects are content addressed, so a
+    hashed subject already found in 'store' (in the same graph) has the same
+    triples: its triples are skipped. Other triples are inserted with a single
+    `bulk_extend`. Each hashed subject costs one index lookup in 'store', so ingest
+    cost depends on the size of 'data', not the size of 'store'.
+
+    Example:
+
+        merge_subjects("corpus.oxigraph", "batch-42.ttl")
+        # {"subjects_hashed": 120, "subjects_new": 7, "subjects_deduplicated": 113, ...}
+
+    Args:
+        store (str|pyoxigraph.Store): Directory of an on-disk pyoxigraph store
+            (created if missing), or an open store.
+        data (str): Data representing RDF triples, or path of a file.
+        format (str, optional): Format of data. Defaults to None.
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        sparql_select_subjects (str, optional): See `hash_subjects`.
+        length (int, optional): Length of hash result.
+        cache (str|HashCache, optional): See `hash_subjects`. Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters.
+            Defaults to None.
+        select (str, optional): Native subject selector (see `hash_subjects`).
+
+    Returns:
+        dict: Report of the merge. 'subjects_deduplicated' counts hashed subjects
+            of 'data' not inserted: already in 'store', or repeated in 'data'.
+    """
+    if stats == None:
+        stats = stats_module.disabled
+    if isinstance(store, str):
+        store = pyoxigraph.Store(store)
+
+    graph, hashed_values = hash_subjects(
+        data,
+        format,
+        method,
+        template,
+        sparql_select_subjects,
+        "oxigraph",
+        length,
+        stats=stats,
+        cache=cache,
+        select=select,
+    )
+    hashed = set(hashed_values.values())
+
+    with stats.phase("merge"):
+        present = {}  # `(hashed subject, graph name)` to True if found in 'store'.
+        new = set()
+        quads = []
+        for quad in graph.graph:
+            s = quad.subject
+            if s in hashed:
+                key = (s, quad.graph_name)
+                if key not in present:
+                    found = store.quads_for_pattern(s, None, None, quad.graph_name)
+                    present[key] = next(iter(found), None) is not None
+                    if not present[key]:
+                        new.add(s)
+                if present[key]:
+                    continue
+            quads.append(quad)
+
+        store.bulk_extend(quads)
+        store.flush()
+
+    report = {
+        "subjects_hashed": len(hashed_values),
+        "subjects_new": len(new),
+        "subjects_deduplicated": len(hashed_values) - len(new),
+        "triples_inserted": len(quads),
+        "triples_skipped": len(graph) - len(quads),
+    }
+    for name, value in report.items():
+        stats.set(name, value)
+
+    logger.info(
+        f"Merged ({report['subjects_new']}) new subjects, "
+        f"({report['subjects_deduplicated']}) deduplicated, "
+        f"({report['triples_inserted']}) triples inserted."
+    )
+    return report
@@ -0,0 +1,311 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from rdfhash.logger import logger
+from rdfhash.utils.encode import encode_term
+from rdfhash.utils.component import component_input, hash_component
+from rdfhash.utils.hash import (
+    hash_canonical_lines,
+    is_deterministic,
+    register_hash_methods,
+    runtime_hash_methods,
+)
+from rdfhash.utils.sort import ExternalSorter
+from rdfhash.utils.schedule import (
+    component_levels,
+    is_cyclic,
+    strongly_connected_components,
+)
+from rdfhash.utils import stats as stats_module
+from rdfhash.utils.progress import Progress
+
+# Levels smaller than this are hashed in-process, avoiding pool round trips.
+min_chunk_size = 256
+
+
+def _lines(pairs):
+    """Encode `(predicate, object)` canonical term strings as hash input lines."""
+    return (f"{p} {o}.\n".encode("utf-8") for p, o in pairs)
+
+
+def _hash_chunk(chunk, method, template, length, sort_threshold):
+    """Worker: sort canonical lines of each subject in 'chunk' and hash them.
+
+    Args:
+        chunk (list): Lists of `(predicate, object)` canonical term strings.
+
+    Returns:
+        list[str]: Hash URI of each subject in 'chunk'.
+    """
+    return [
+        hash_canonical_lines(
+            _lines(pairs), method, template, length, None, sort_threshold
+        )
+        for pairs in chunk
+    ]
+
+
+def hash_graph(
+    components, method, template, length, cache=None, sort_threshold=1000000
+):
+    """Hash subjects of one graph, component by component.
+
+    Args:
+        components (list): Strongly connected components of the graph, leaves
+            first. Each is a list of `(predicate, object)` lists of its members. A
+            term is either its canonical string, or the index of a subject in the
+            concatenation of 'components'.
+        sort_threshold (int, optional): See `hash_canonical_lines`.
+
+    Returns:
+        list[str]: Hash URI of each subject, in order of 'components'.
+    """
+    uris = []
+
+    for subjects in components:
+        start = len(uris)
+
+        def to_input(term):
+            if type(term) is str:
+                return term
+            if term < start:
+                return f"<{uris[term]}>"
+            return term - start  # Member of this component.
+
+        subjects = [[(to_input(p), to_input(o)) for p, o in pairs] for pairs in subjects]
+        if len(subjects) > 1 or any(type(t) is int for pair in subjects[0] for t in pair):
+            uris += hash_component(subjects, method, template, length, cache)
+            continue
+        uris.append(
+            hash_canonical_lines(
+                _lines(subjects[0]), method, template, length, cache, sort_threshold
+            )
+        )
+    return uris
+
+
+def _hash_graphs(chunk, method, template, length, sort_threshold):
+    """Worker: hash each graph in 'chunk' (see `hash_graph`)."""
+    return [
+        hash_graph(components, method, template, length, None, sort_threshold)
+        for components in chunk
+    ]
+
+
+def _chunks(items, count):
+    size = max(min_chunk_size, -(-len(items) // count))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def compute_hashes_parallel(
+    graph,
+    triples,
+    dependencies,
+    method="sha256",
+    template="{method}:{value}",
+    length=None,
+    workers=None,
+    cache=None,
+    stats=None,
+    progress=None,
+    components=None,
+    sort_threshold=1000000,
+):
+    """Compute hashed subjects level by level in a process pool.
+
+    Groups subjects which are ready at each level of the dependency DAG, and hashes
+    each level in a `ProcessPoolExecutor`. Circular dependencies are hashed as a
+    unit in this process (see `hash_component`). 'graph' is not updated. Results
+    are identical to the serial path.
+
+    Args:
+        graph (__Graph__): Graph containing subjects.
+        triples (dict): Subject to list of its triples.
+        dependencies (dict): Subject to set of subjects it depends on.
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        length (int, optional): Length of hash result.
+        workers (int, optional): Number of worker processes.
+            Defaults to None (`os.cpu_count()`).
+        cache (HashCache, optional): Persistent cache looked up in the parent
+            process. Only inputs missing from the cache are sent to workers.
+            Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters.
+            Defaults to None.
+        progress (Progress, optional): Reports hashed subjects. Defaults to None.
+        components (list, optional): Strongly connected components of
+            'dependencies', if already found. Defaults to None.
+        sort_threshold (int, optional): Canonical lines of a subject sorted in
+            memory by a worker (see `hash_canonical_lines`). Defaults to 1000000.
+
+    Returns:
+        dict: Subject to hashed subject.
+    """
+    if stats == None:
+        stats = stats_module.disabled
+    if progress == None:
+        progress = Progress(len(triples))
+    if components == None:
+        components = strongly_connected_components(dependencies)
+
+    levels = component_levels(components, dependencies)
+    stats.maximum("max_depth", len(levels))
+
+    logger.info(
+        f"Hashing ({len(triples)}) subjects in ({len(levels)}) dependency levels."
+    )
+
+    hashed_values = {}
+
+    def to_string(term):
+        return encode_term(hashed_values.get(term, term))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=register_hash_methods,
+        initargs=(runtime_hash_methods(),),
+    ) as executor:
+        for components in levels:
+            level = []
+            for component in components:
+                if not is_cyclic(component, dependencies):
+                    level.append(component[0])
+                    continue
+                with stats.phase("hash"):
+                    uris = hash_component(
+                        component_input(component, triples, to_string),
+                        method,
+                        template,
+                        length,
+                        cache,
+                    )
+                for s, uri in zip(component, uris):
+                    hashed_values[s] = graph.NamedNode(uri)
+                progress.update(len(component), sum(len(triples[s]) for s in component))
+
+            with stats.phase("canonicalize"):
+                inputs = [
+                    [(to_string(t[1]), to_string(t[2])) for t in triples[s]]
+                    for s in level
+                ]
+            if stats.enabled:
+                stats.count(
+                    "bytes_hashed",
+                    sum(
+                        len(p.encode("utf-8")) + len(o.encode("utf-8")) + 3
+                        for pairs in inputs
+                        for p, o in pairs
+                    ),
+                )
+
+            with stats.phase("hash"):
+                args = (method, template, length, sort_threshold)
+                if cache == None or not is_deterministic(method):
+                    results = _map_chunks(executor, _hash_chunk, inputs, args, workers)
+                else:
+                    results = _map_cached(executor, cache, inputs, args, workers)
+
+            for s, uri in zip(level, results):
+                hashed_values[s] = graph.NamedNode(uri)
+            progress.update(len(level), sum(len(pairs) for pairs in inputs))
+
+    return hashed_values
+
+
+def _map_chunks(executor, worker, inputs, args, workers):
+    chunks = _chunks(inputs, workers * 4)
+    if len(chunks) == 1:
+        return worker(inputs, *args)
+    futures = [executor.submit(worker, chunk, *args) for chunk in chunks]
+    return [uri for future in futures for uri in future.result()]
+
+
+def _map_cached(executor, cache, inputs, args, workers):
+    """Look up each input in 'cache' first, and only send misses to workers."""
+    method, template, length, sort_threshold = args
+    results = []
+    misses = []  # `(index, key, pairs)` of inputs not found in 'cache'.
+    for pairs in inputs:
+        fingerprint = cache.fingerprinter(method, template, length)
+        with ExternalSorter(sort_threshold, binary=True) as sorter:
+            sorter.extend(_lines(pairs))
+            for line in sorter.sorted():
+                fingerprint.update(line)
+        key = fingerprint.digest()
+        uri = cache.get(key)
+        if uri == None:
+            misses.append((len(results), key, pairs))
+        results.append(uri)
+
+    if misses:
+        uris = _map_chunks(
+            executor, _hash_chunk, [miss[2] for miss in misses], args, workers
+        )
+        for (i, key, _), uri in zip(misses, uris):
+            results[i] = uri
+            cache.put(key, uri)
+    return results
+
+
+def _graph_chunks(graphs, count):
+    """Split 'graphs' into about 'count' chunks of similar number of triples."""
+    size = max(min_chunk_size, -(-sum(map(_graph_size, graphs)) // count))
+    chunks = [[]]
+    chunk_size = 0
+    for components in graphs:
+        if chunk_size >= size:
+            chunks.append([])
+            chunk_size = 0
+        chunks[-1].append(components)
+        chunk_size += _graph_size(components)
+    return chunks
+
+
+def _graph_size(components):
+    return sum(len(pairs) for subjects in components for pairs in subjects)
+
+
+def hash_graphs_parallel(
+    graphs, method, template, length=None, workers=None, sort_threshold=1000000
+):
+    """Hash independent graphs concurrently in a process pool.
+
+    Graphs are grouped into chunks of similar number of triples, so thousands of
+    small graphs are sent to workers in few round trips.
+
+    Args:
+        graphs (list): Components of each graph (see `hash_graph`).
+        method (str): Hashing method to use.
+        template (str): Template string for hash URI.
+        length (int, optional): Length of hash result.
+        workers (int, optional): Number of worker processes.
+            Defaults to None (`os.cpu_count()`).
+        sort_threshold (int, optional): See `hash_canonical_lines`.
+
+    Returns:
+        list[list[str]]: Hash URIs of the subjects of each graph.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _graph_chunks(graphs, workers * 4)
+    if len(chunks) == 1:
+        return _hash_graphs(graphs, method, template, length, sort_threshold)
+
+    # Spawned workers: forking after a graph library started its own threads can
+    # deadlock in the child (see `hash_directory`).
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=register_hash_methods,
+        initargs=(runtime_hash_methods(),),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _hash_graphs, chunk, method, template, length, sort_threshold
+            )
+            for chunk in chunks
+        ]
+        return [uris for future in futures for uris in future.result()]
@@ -0,0 +1,521 @@
+import io
+import json
+import multiprocessing
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from rdfhash.logger import logger
+from rdfhash.main import hash_subjects, reverse_hash_subjects
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils.endpoint import SparqlEndpoint
+from rdfhash.utils.graph import get_graph, mime_type
+from rdfhash.utils.hash import register_hash_methods, runtime_hash_methods
+from rdfhash.utils.stats import Stats
+
+# CLI options configured once for the server, or not applicable to a request.
+server_options = {
+    "stream",
+    "store",
+    "output",
+    "cache",
+    "cache-size",
+    "stats",
+    "verbose",
+    "debug",
+    "help",
+    "jobs",
+    "parse-jobs",
+    "endpoint",
+    "endpoint-batch-size",
+    "endpoint-concurrency",
+}
+
+# Graph types a request can use. Payloads are small and held in memory: on-disk
+# stores would only cost each request a temporary directory.
+request_graph_types = ("oxrdflib", "rdflib", "oxigraph")
+
+# Latencies kept for percentiles in `/stats`.
+latency_window = 1024
+
+# Largest request payload accepted, in bytes.
+max_payload = 256 * 1024 * 1024
+
+# Hash cache and endpoint client of this worker, kept warm across requests.
+_worker = {}
+
+
+def _init_worker(hash_methods, cache=None, cache_size=1000000, endpoint=None):
+    """Worker initializer: open caches, then hash a small graph so every backend
+    and plugin used by requests is loaded before the first request.
+    """
+    register_hash_methods(hash_methods)
+    _worker["cache"] = None if cache == None else HashCache(cache, cache_size)
+    _worker["endpoint"] = None if endpoint == None else SparqlEndpoint(**endpoint)
+    for graph_type in request_graph_types:
+        for accept in ("text/turtle", "application/n-triples"):
+            hash_subjects(
+                '_:b <urn:rdfhash:warm> "warm" .\n',
+                "text/turtle",
+                graph_type=graph_type,
+                output=io.BytesIO(),
+                accept=accept,
+            )
+
+
+def _close_worker():
+    for name in ("cache", "endpoint"):
+        if _worker.get(name) != None:
+            _worker.pop(name).close()
+
+
+def _hash_request(payload, options):
+    """Worker: hash RDF 'payload' with request 'options' (see `request_options`).
+
+    Returns:
+        dict: 'status' (HTTP status), and 'body' and 'stats' (see `Stats`), or
+            'error'.
+    """
+    stats = Stats()
+    graph = None
+    try:
+        data = payload.decode("utf-8")
+        # Payloads are never file paths on the server ('max_path' 0).
+        with stats.phase("parse"):
+            graph = get_graph(data, options["format"], options["graph"], max_path=0)
+        output = io.BytesIO()
+        graph, hashed_values = hash_subjects(
+            graph,
+            method=options["method"],
+            template=options["template"],
+            sparql_select_subjects=options["sparql"],
+            select=options["select"],
+            bulk=options["bulk"],
+            sort_threshold=options["sort_threshold"],
+            stats=stats,
+            cache=_worker.get("cache"),
+            endpoint=_worker.get("endpoint"),
+            # Result is reversed before it is written.
+            output=None if options["reverse"] else output,
+            accept=options["accept"],
+        )
+        if options["reverse"]:
+            reverse_hash_subjects(graph, template=options["template"])
+            with stats.phase("serialize"):
+                graph.serialize(output, format=options["accept"])
+    except (ValueError, SyntaxError, UnicodeDecodeError) as e:
+        return {"status": 400, "error": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        logger.exception("Failed to hash request.")
+        return {"status": 500, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if graph != None:
+            graph.close()
+    return {"status": 200, "body": output.getvalue(), "stats": stats.to_dict()}
+
+
+def _request_parser():
+    # Imported here, 'rdfhash.cli' imports this module.
+    from rdfhash.cli import get_parser
+
+    parser = get_parser()
+
+    def error(message):
+        raise ValueError(message)
+
+    parser.error = error
+    return parser
+
+
+def request_options(query, content_type=None, parser=None):
+    """Parse options of a request, given as query parameters named like the long
+    options of `cli()` (eg. `?method=md5&select=bnodes&accept=nt`).
+
+    Flags (eg. `reverse`, `bulk`) are set by an empty value, `1` or `true`.
+    Without a `format` parameter, the format is taken from 'content_type'.
+
+    Args:
+        query (str): Query string of request.
+        content_type (str, optional): Content-Type header of request.
+        parser (argparse.ArgumentParser, optional): Parser of `cli()` options.
+            Defaults to None (new parser).
+
+    Raises:
+        ValueError: If an option is unknown, invalid, or configured by the server
+            (eg. `cache`, `jobs`), or if `graph` is not one of
+            'request_graph_types'.
+
+    Returns:
+        dict: Options of `_hash_request`.
+    """
+    if parser == None:
+        parser = _request_parser()
+
+    args_list = ["-"]
+    for name, values in parse_qs(query, keep_blank_values=True).items():
+        flag = "--" + name.replace("_", "-")
+        if flag[2:] in server_options:
+            raise ValueError(f"Option '{name}' is configured by the server.")
+        action = parser._option_string_actions.get(flag)
+        if action == None:
+            raise ValueError(f"Unknown option '{name}'.")
+        for value in values:
+            if action.nargs == 0:
+                if value.lower() in ("", "1", "true"):
+                    args_list.append(flag)
+            else:
+                args_list += [flag, value]
+    args = parser.parse_args(args_list)
+
+    if args.graph not in request_graph_types:
+        raise ValueError(
+            f"Graph type '{args.graph}' is not available per request. Use one of: "
+            + ", ".join(request_graph_types)
+        )
+
+    if args.format == None and content_type != None:
+        content_type = content_type.split(";")[0].strip()
+        if mime_type(content_type) != None:
+            args.format = content_type
+    for name in ("format", "accept"):
+        value = getattr(args, name) or "text/turtle"
+        if mime_type(value) == None:
+            raise ValueError(f"Unsupported {name}: {value}")
+        setattr(args, name, mime_type(value))
+
+    return {
+        "format": args.format,
+        "accept": args.accept,
+        "graph": args.graph,
+        "method": args.method,
+        "template": args.template,
+        "sparql": args.sparql,
+        "select": args.select,
+        "reverse": args.reverse,
+        "bulk": args.bulk,
+        "sort_threshold": args.sort_threshold,
+    }
+
+
+class Counters:
+    """Throughput and latency counters of a server, shared by request threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.triples = 0
+        self.subjects_hashed = 0
+        self.phases = {}
+        self.latencies = deque(maxlen=latency_window)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self, seconds, bytes_in, bytes_out, result):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.latencies.append(seconds)
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+            if result["status"] != 200:
+                self.errors += 1
+                return
+            counters = result["stats"]["counters"]
+            self.triples += counters.get("triples_before", 0)
+            self.subjects_hashed += counters.get("subjects_hashed", 0)
+            for name, times in result["stats"]["phases"].items():
+                phase = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                phase["wall"] += times["wall"]
+                phase["cpu"] += times["cpu"]
+
+    def to_dict(self):
+        with self.lock:
+            uptime = time.perf_counter() - self.start
+            latencies = sorted(self.latencies)
+
+            def percentile(p):
+                if not latencies:
+                    return None
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "requests_per_second": self.requests / uptime,
+                "triples_per_second": self.triples / uptime,
+                "triples": self.triples,
+                "subjects_hashed": self.subjects_hashed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "latency": {
+                    "mean": self.latency_total / self.requests
+                    if self.requests
+                    else None,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "max": self.latency_max,
+                },
+                "phases": {name: dict(times) for name, times in self.phases.items()},
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP handler of `HashServer`.
+
+    - `POST /hash`: Hash RDF payload, return result in format `accept`.
+    - `GET /stats`: Throughput and latency counters as JSON.
+    - `GET /health`: `ok`.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(
+        self, status, body, content_type="text/plain; charset=utf-8", headers=None
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send(200, b"ok\n")
+        elif path == "/stats":
+            body = json.dumps(self.server.hash_server.stats(), indent=2).encode("utf-8")
+            self._send(200, body, "application/json")
+        else:
+            self._send(404, b"Not found.\n")
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if parts.path != "/hash":
+            self.rfile.read(length)
+            self._send(404, b"Not found.\n")
+            return
+        if length > max_payload:
+            self.close_connection = True
+            self._send(413, f"Payload larger than {max_payload} bytes.\n".encode())
+            return
+
+        result = self.server.hash_server.hash(
+            self.rfile.read(length), parts.query, self.headers.get("Content-Type")
+        )
+        if result["status"] != 200:
+            self._send(result["status"], (result["error"] + "\n").encode("utf-8"))
+            return
+        counters = result["stats"]["counters"]
+        self._send(
+            200,
+            result["body"],
+            result["accept"],
+            {
+                "X-Subjects-Hashed": str(counters.get("subjects_hashed", 0)),
+                "X-Triples": str(counters.get("triples_after", 0)),
+            },
+        )
+
+    def log_message(self, format, *args):
+        # Unix socket clients have no address.
+        logger.debug(format % args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class HashServer:
+    """Long-running hashing service: an HTTP server (TCP or Unix socket) handing
+    requests to a pool of warm workers.
+
+    Workers import every graph library, load parser and serializer plugins, and
+    open the hash cache and SPARQL endpoint client once (see `_init_worker`), so a
+    request only pays for hashing its payload. With 'jobs' greater than 1, workers
+    are processes hashing requests in parallel. Otherwise requests are hashed one
+    at a time by a thread of this process.
+
+    Request options are the long options of `cli()`, as query parameters (see
+    `request_options`):
+
+        curl --data-binary @data.ttl \\
+            'http://localhost:8321/hash?method=md5&select=bnodes&accept=nt'
+
+    Example:
+
+        with HashServer(("127.0.0.1", 8321), jobs=4) as server:
+            server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 8321),
+        socket_path=None,
+        jobs=1,
+        cache=None,
+        cache_size=1000000,
+        endpoint=None,
+        endpoint_batch_size=100,
+        endpoint_concurrency=4,
+    ):
+        """
+        Args:
+            address (tuple, optional): `(host, port)` to listen on. Port 0 picks a
+                free port. Defaults to `("127.0.0.1", 8321)`.
+            socket_path (str, optional): Path of Unix socket to listen on instead
+                of 'address'. Defaults to None.
+            jobs (int, optional): Number of worker processes. Defaults to 1 (a
+                single worker thread in this process).
+            cache (str, optional): Path of persistent hash cache shared by workers
+                (see `HashCache`). Defaults to None.
+            cache_size (int, optional): See `HashCache`. Defaults to 1000000.
+            endpoint (str, optional): URL of SPARQL endpoint holding full
+                descriptions of selected subjects (see `SparqlEndpoint`).
+                Defaults to None.
+            endpoint_batch_size (int, optional): See `SparqlEndpoint`.
+            endpoint_concurrency (int, optional): See `SparqlEndpoint`.
+        """
+        self.jobs = jobs or os.cpu_count() or 1
+        self.parser = _request_parser()
+        self.parser_lock = threading.Lock()
+
+        endpoint_options = None
+        if endpoint != None:
+            endpoint_options = {
+                "url": endpoint,
+                "batch_size": endpoint_batch_size,
+                "concurrency": endpoint_concurrency,
+            }
+            # Raise on invalid URL before starting workers.
+            SparqlEndpoint(**endpoint_options).close()
+        initargs = (runtime_hash_methods(), cache, cache_size, endpoint_options)
+
+        if self.jobs > 1:
+            # Spawned workers: forking after a graph library started its own threads
+            # can deadlock in the child.
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.jobs,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=initargs,
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, initializer=_init_worker, initargs=initargs
+            )
+        # Start workers now, so the first request is not slowed by warm up.
+        for future in [
+            self.executor.submit(time.sleep, 0) for _ in range(self.jobs)
+        ]:
+            future.result()
+
+        if socket_path != None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.server = _UnixHTTPServer(socket_path, Handler)
+            self.url = f"unix:{socket_path}"
+        else:
+            self.server = _HTTPServer(address, Handler)
+            host, port = self.server.server_address[:2]
+            self.url = f"http://{host}:{port}"
+        self.socket_path = socket_path
+        self.server.hash_server = self
+        self.counters = Counters()
+        logger.info(f"Serving rdfhash on {self.url} with ({self.jobs}) workers.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def hash(self, payload, query="", content_type=None):
+        """Hash 'payload' with options of 'query' in a worker, recording counters.
+
+        Returns:
+            dict: Result of `_hash_request`, with 'accept' format of 'body'.
+        """
+        start = time.perf_counter()
+        self.counters.begin()
+        result = None
+        try:
+            with self.parser_lock:
+                options = request_options(query, content_type, self.parser)
+            result = self.executor.submit(_hash_request, payload, options).result()
+            result["accept"] = options["accept"]
+        except ValueError as e:
+            result = {"status": 400, "error": f"ValueError: {e}"}
+        except Exception as e:
+            logger.exception("Failed to hash request.")
+            result = {"status": 500, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.counters.end(
+                time.perf_counter() - start,
+                len(payload),
+                len(result["body"]) if result and "body" in result else 0,
+                result or {"status": 500},
+            )
+        return result
+
+    def stats(self):
+        return {"jobs": self.jobs, **self.counters.to_dict()}
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def shutdown(self):
+        """Stop 'serve_forever' (from another thread)."""
+        self.server.shutdown()
+
+    def close(self):
+        self.server.server_close()
+        # Worker processes exit without closing caches, which are flushed after
+        # every request (see `hash_subjects`).
+        if isinstance(self.executor, ThreadPoolExecutor):
+            self.executor.submit(_close_worker).result()
+        self.executor.shutdown(wait=True)
+        if self.socket_path != None and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def serve(address=("127.0.0.1", 8321), socket_path=None, jobs=1, **options):
+    """Run a `HashServer` until interrupted.
+
+    Args:
+        address (tuple, optional): See `HashServer`.
+        socket_path (str, optional): See `HashServer`.
+        jobs (int, optional): See `HashServer`.
+        **options: Other arguments of `HashServer`.
+    """
+    with HashServer(address, socket_path, jobs, **options) as server:
+        print(f"Serving rdfhash on {server.url} ({server.jobs} workers).", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,431 @@
+import io
+import os.path
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from rdfhash.logger import logger
+from rdfhash.utils.graph import mime, file_ext
+from rdfhash.utils.hash import hash_canonical_lines, split_method
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils import stats as stats_module
+from rdfhash.utils.progress import Progress
+from rdfhash.utils.ntriples import (
+    format_line,
+    is_bnode,
+    is_uri,
+    mime_line_based,
+    parse_line,
+)
+from rdfhash.utils.template import compile_template
+from rdfhash.utils.encode import encode_ntriples
+from rdfhash.utils.sort import ExternalSorter, unique_sorted
+
+
+@contextmanager
+def open_stream(target, mode="r"):
+    """Open 'target' as a text stream.
+
+    Args:
+        target (str|io.IOBase): File path, `-` for stdin/stdout, or an open
+            text/binary stream (left open on exit).
+        mode (str, optional): `r` to read, `w` to write. Defaults to "r".
+    """
+    if target == "-":
+        std = sys.stdin if mode == "r" else sys.stdout
+        yield std
+        if mode == "w":
+            std.flush()
+    elif isinstance(target, str):
+        with open(target, mode, encoding="utf-8", newline="\n") as f:
+            yield f
+    elif isinstance(target, io.TextIOBase):
+        yield target
+    else:
+        wrapper = io.TextIOWrapper(target, encoding="utf-8", newline="\n")
+        try:
+            yield wrapper
+        finally:
+            wrapper.flush()
+            wrapper.detach()
+
+
+def stream_format(target, format=None):
+    """Resolve line based format of 'target' (N-Triples or N-Quads).
+
+    Raises:
+        ValueError: If format is not N-Triples or N-Quads.
+    """
+    if format == None and isinstance(target, str) and target != "-":
+        ext = os.path.splitext(target)[1][1:]
+        format = file_ext.get(ext)
+    if format == None:
+        return "application/n-quads"
+    format = mime.get(format, file_ext.get(format, format))
+    if format not in mime_line_based:
+        raise ValueError(
+            "Streaming requires 'application/n-triples' or 'application/n-quads'. "
+            f"Got: {format}"
+        )
+    return format
+
+
+def _subject_key(line):
+    return line[: line.index(" ")]
+
+
+class _ClusterStore:
+    """Disk-backed store of blank node triples indexed by subject.
+
+    Triples are stored one row per line, and looked up by blank node label while
+    resolving a cluster. Resolved hashes are written back so later clusters sharing
+    a node reuse them.
+    """
+
+    def __init__(self, tmp_dir=None):
+        self.file = tempfile.NamedTemporaryFile(suffix=".sqlite", dir=tmp_dir)
+        self.db = sqlite3.connect(self.file.name)
+        self.db.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE lines (subject TEXT, line TEXT);
+            CREATE TABLE hashes (subject TEXT PRIMARY KEY, hash TEXT);
+            CREATE TABLE emitted (hash TEXT PRIMARY KEY);
+            """
+        )
+
+    def load_lines(self, lines):
+        self.db.executemany(
+            "INSERT INTO lines VALUES (?, ?)",
+            ((_subject_key(line), line) for line in lines),
+        )
+        self.db.execute("CREATE INDEX lines_subject ON lines (subject)")
+
+    def subjects(self):
+        return self.db.execute("SELECT DISTINCT subject FROM lines ORDER BY subject")
+
+    def lines(self, subject):
+        """Return lines of 'subject', or None if it has no triples."""
+        rows = self.db.execute(
+            "SELECT line FROM lines WHERE subject = ?", (subject,)
+        ).fetchall()
+        return [row[0] for row in rows] or None
+
+    def get_hash(self, subject):
+        row = self.db.execute(
+            "SELECT hash FROM hashes WHERE subject = ?", (subject,)
+        ).fetchone()
+        return None if row == None else row[0]
+
+    def set_hash(self, subject, hash_subj):
+        self.db.execute("INSERT INTO hashes VALUES (?, ?)", (subject, hash_subj))
+
+    def mark_emitted(self, hash_subj):
+        """Return True if 'hash_subj' was not already written to output."""
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO emitted VALUES (?)", (hash_subj,)
+        )
+        return cursor.rowcount == 1
+
+    def close(self):
+        self.db.close()
+        self.file.close()
+
+
+def _hash_cluster(
+    store, root, write, method, template, length, cache=None, sort_threshold=1000000
+):
+    """Hash 'root' and every unresolved blank node reachable from it.
+
+    Walks the cluster with an explicit stack so leaves are hashed first. Only the
+    triples of the current path are held in memory. Canonical lines are sorted and
+    hashed with `hash_canonical_lines`.
+
+    Returns:
+        int: Number of subjects hashed.
+    """
+    resolved = {}  # Hashes resolved for this cluster.
+
+    def lookup(term):
+        if term in resolved:
+            return resolved[term]
+        hash_subj = store.get_hash(term)
+        if hash_subj != None:
+            resolved[term] = hash_subj
+        return hash_subj
+
+    count = 0
+    path = {root}
+    stack = [[root, [parse_line(l) for l in store.lines(root)], 0]]
+
+    while stack:
+        frame = stack[-1]
+        subject, triples, i = frame
+
+        # Descend into the next unresolved blank node object.
+        descended = False
+        while i < len(triples):
+            o = triples[i][2]
+            i += 1
+            if not is_bnode(o) or lookup(o) != None:
+                continue
+            if o in path:
+                raise ValueError(
+                    "Unable to resolve hash. Circular dependency "
+                    f"detected: {subject} <--> {o}"
+                )
+            lines = store.lines(o)
+            if lines == None:
+                # Blank node without triples is kept as is.
+                resolved[o] = o
+                continue
+            frame[2] = i
+            path.add(o)
+            stack.append([o, [parse_line(l) for l in lines], 0])
+            descended = True
+            break
+        if descended:
+            continue
+
+        # All objects resolved, hash subject.
+        triples_new = []
+        for s, p, o, g in triples:
+            if is_bnode(o):
+                o = lookup(o)
+            triples_new.append((p, o, g))
+
+        uri = hash_canonical_lines(
+            (
+                f"{encode_ntriples(p)} {encode_ntriples(o)}.\n".encode("utf-8")
+                for p, o, g in triples_new
+            ),
+            method,
+            template,
+            length,
+            cache,
+            sort_threshold,
+        )
+        hash_subj = f"<{uri}>"
+
+        if store.mark_emitted(hash_subj):
+            for p, o, g in triples_new:
+                write(format_line(hash_subj, p, o, g))
+
+        store.set_hash(subject, hash_subj)
+        resolved[subject] = hash_subj
+        path.discard(subject)
+        stack.pop()
+        count += 1
+
+    return count
+
+
+def hash_subjects_stream(
+    input,
+    output,
+    format=None,
+    method="sha256",
+    template="{method}:{value}",
+    length=None,
+    max_lines=500000,
+    tmp_dir=None,
+    cache=None,
+    stats=None,
+    sort_threshold=1000000,
+):
+    """Hash blank node subjects of N-Triples/N-Quads with bounded memory.
+
+    Streaming equivalent of `hash_subjects` with its default subject selection (all
+    blank node subjects). Input is read line by line:
+
+    - Triples without blank nodes are written to 'output' immediately.
+    - Triples with a blank node subject are sorted by subject with an external
+      sort, indexed on disk, then hashed cluster by cluster (leaves first).
+    - Triples referencing a blank node from a non blank subject are rewritten once
+      every cluster is hashed.
+
+    Peak memory depends on the largest blank node cluster and 'max_lines', not on
+    input size.
+
+    Args:
+        input (str|io.IOBase): File path, `-` for stdin, or an open stream.
+        output (str|io.IOBase): File path, `-` for stdout, or an open stream.
+        format (str, optional): 'application/n-triples' or 'application/n-quads'.
+            Defaults to None (inferred from file extension).
+        method (str, optional): Hashing method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        length (int, optional): Length of hash result. Required for some hash methods,
+            optional for all.
+        max_lines (int, optional): Lines held in memory per sort run before
+            spilling to disk. Defaults to 500000.
+        tmp_dir (str, optional): Directory for temporary files.
+            Defaults to None (system default).
+        cache (str|HashCache, optional): Persistent hash cache, or path of one to
+            open for this run (see `HashCache`). Defaults to None.
+        stats (Stats, optional): Collects phase timings and counters of this run:
+            `parse` (pass 1), `index` (pass 2), `hash` (pass 3) and `rewrite`
+            (pass 4). Defaults to None (disabled).
+        sort_threshold (int, optional): Canonical lines of a subject sorted in
+            memory (see `hash_canonical_lines`). Defaults to 1000000.
+
+    Raises:
+        ValueError: If format is not line based, or a line is invalid.
+        ValueError: If circular dependency is detected between blank nodes.
+
+    Returns:
+        int: Number of subjects hashed.
+    """
+    stream_format(input, format)
+    if stats == None:
+        stats = stats_module.disabled
+
+    method, spec_length = split_method(method)
+    length = length or spec_length
+
+    store = _ClusterStore(tmp_dir)
+    subject_sorter = ExternalSorter(max_lines, tmp_dir)
+    ref_sorter = ExternalSorter(max_lines, tmp_dir)
+    own_cache = isinstance(cache, str)
+    if own_cache:
+        cache = HashCache(cache)
+
+    try:
+        with open_stream(input, "r") as f_in, open_stream(output, "w") as f_out:
+            write = f_out.write
+
+            # Pass 1: Write through, or spill triples with blank nodes.
+            # ---------------------------------------------------------
+            written = 0
+            with stats.phase("parse"):
+                for line in f_in:
+                    terms = parse_line(line)
+                    if terms == None:
+                        continue
+                    if is_bnode(terms[0]):
+                        subject_sorter.add(format_line(*terms))
+                    elif is_bnode(terms[2]):
+                        ref_sorter.add(f"{terms[2]} {format_line(*terms)}")
+                    else:
+                        write(format_line(*terms))
+                        written += 1
+            stats.set("triples_before", written + len(subject_sorter) + len(ref_sorter))
+
+            logger.info(
+                f"Spilled ({len(subject_sorter)}) blank node subject triples and "
+                f"({len(ref_sorter)}) referencing triples."
+            )
+
+            # Pass 2: Index blank node triples by subject.
+            # --------------------------------------------
+            with stats.phase("index"):
+                store.load_lines(subject_sorter.sorted())
+            subject_sorter.close()
+
+            # Pass 3: Hash clusters, writing hashed triples as each completes.
+            # ----------------------------------------------------------------
+            count = 0
+            progress = Progress()
+            with stats.phase("hash"):
+                for (subject,) in store.subjects():
+                    if store.get_hash(subject) != None:
+                        continue
+                    hashed = _hash_cluster(
+                        store,
+                        subject,
+                        write,
+                        method,
+                        template,
+                        length,
+                        cache,
+                        sort_threshold,
+                    )
+                    count += hashed
+                    progress.update(hashed)
+            progress.done()
+            stats.set("subjects_hashed", count)
+
+            # Pass 4: Rewrite references to hashed blank nodes.
+            # -------------------------------------------------
+            def rewritten():
+                for record in ref_sorter.sorted():
+                    bnode, line = record.split(" ", 1)
+                    hash_subj = store.get_hash(bnode)
+                    if hash_subj == None:
+                        yield line
+                        continue
+                    s, p, o, g = parse_line(line)
+                    yield format_line(s, p, hash_subj, g)
+
+            with stats.phase("rewrite"), ExternalSorter(
+                max_lines, tmp_dir
+            ) as out_sorter:
+                out_sorter.extend(rewritten())
+                f_out.writelines(unique_sorted(out_sorter.sorted()))
+    finally:
+        subject_sorter.close()
+        ref_sorter.close()
+        store.close()
+        if cache != None:
+            for name, value in cache.stats().items():
+                stats.set(name, value)
+        if own_cache:
+            cache.close()
+
+    logger.info(f"({count}) Hashed subjects.")
+    return count
+
+
+def reverse_hash_subjects_stream(
+    input, output, format=None, template="{method}:{value}"
+):
+    """Convert hashed URIs of N-Triples/N-Quads to blank nodes in a single pass.
+
+    Streaming equivalent of `reverse_hash_subjects`. 'template' is compiled once
+    (see `TemplateMatcher`), and each line is written as soon as it is read.
+    Blank node labels are derived from the hash URI (`_:{method}-{value}`), so
+    no mapping is kept in memory.
+
+    Args:
+        input (str|io.IOBase): File path, `-` for stdin, or an open stream.
+        output (str|io.IOBase): File path, `-` for stdout, or an open stream.
+        format (str, optional): 'application/n-triples' or 'application/n-quads'.
+            Defaults to None (inferred from file extension).
+        template (str, optional): Template of hashed URIs.
+            Defaults to "{method}:{value}".
+
+    Raises:
+        ValueError: If format is not line based, or a line is invalid.
+
+    Returns:
+        int: Number of statements with a hashed URI replaced.
+    """
+    stream_format(input, format)
+    matcher = compile_template(template)
+
+    def reverse(term):
+        if term == None or not is_uri(term):
+            return term
+        fields = matcher.match(term[1:-1])
+        if fields == None:
+            return term
+        if "method" in fields:
+            return f"_:{fields['method']}-{fields['value']}"
+        return f"_:{fields['value']}"
+
+    count = 0
+    with open_stream(input, "r") as f_in, open_stream(output, "w") as f_out:
+        write = f_out.write
+        for line in f_in:
+            terms = parse_line(line)
+            if terms == None:
+                continue
+            reversed_terms = [reverse(term) for term in terms]
+            if reversed_terms != list(terms):
+                count += 1
+            write(format_line(*reversed_terms))
+
+    logger.info(f"({count}) Statements with hashed URIs reversed.")
+    return count
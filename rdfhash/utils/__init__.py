@@ -1,23 +1,21 @@
-import re
+from .template import TemplateMatcher, compile_template, hex_re
 
-from .hash import hash_types
 
+def validate_uri(uri, template="{method}:{value}", values=None):
+    """Return True if 'uri' matches hash URI 'template' (see `TemplateMatcher`).
 
-def validate_uri(
-    uri,
-    template="{method}:{value}",
-    values={"method": set(list(hash_types)), "value": r"[a-f0-9]+"},
-):
-    def value_re(value):
-        if type(value) == set:
-            return "(" + "|".join(value) + ")"
-        elif type(value) == str:
-            return value
-
-    # Convert 'template' to a regular expression.
-    template_re = template
-    for key in values.keys():
-        template_re = template_re.replace("{" + key + "}", value_re(values[key]))
-
-    # Validate URI.
-    return re.match(template_re, uri) != None
+    Args:
+        uri (str): URI without angle brackets.
+        template (str, optional): Template of hash URIs.
+            Defaults to "{method}:{value}".
+        values (dict, optional): Accepted values of each field: 'method' is a set
+            of hash methods, 'value' a regular expression. Defaults to None (all
+            of 'hash_types', and hexadecimal values).
+    """
+    if values == None:
+        matcher = compile_template(template)
+    else:
+        matcher = TemplateMatcher(
+            template, values.get("method"), values.get("value", hex_re)
+        )
+    return matcher.match(uri) != None
@@ -0,0 +1,133 @@
+import hashlib
+import sqlite3
+import time
+
+from rdfhash.logger import logger
+
+
+class HashCache:
+    """Persistent cache of hash URIs keyed by a fingerprint of their hash input.
+
+    Keys are 128 bit BLAKE2b digests of the hash method, length, template and the
+    canonical `{predicate} {object}.\\n` input, so a hit returns the final hash URI
+    without running the configured hash method. Entries are stored in a sqlite
+    file. When the cache holds more than 'max_entries', least recently used
+    entries are evicted on 'flush'. Hash methods which are not deterministic (eg.
+    `uuid4`) are not cached (see `is_deterministic`).
+
+    Example:
+
+        with HashCache("hashes.sqlite") as cache:
+            hash_subjects(data, cache=cache)
+            print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, path, max_entries=1000000, batch_size=10000):
+        """Open or create cache at 'path'.
+
+        Args:
+            path (str): Path of sqlite cache file.
+            max_entries (int, optional): Maximum entries kept after eviction.
+                Defaults to 1000000.
+            batch_size (int, optional): New entries buffered before writing.
+                Defaults to 10000.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS hashes (
+                key BLOB PRIMARY KEY, uri TEXT, used INTEGER
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used);
+            """
+        )
+        self.added = []
+        self.touched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    @staticmethod
+    def fingerprinter(method, template, length=None):
+        """Return incremental fingerprint, updated with a hash input in pieces.
+
+        `fingerprinter(...).digest()` after `update()` with every UTF-8 encoded
+        piece of 'hash_input' equals `fingerprint(hash_input, ...)`.
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(f"{method}\0{length}\0{template}\0".encode("utf-8"))
+        return fingerprint
+
+    @staticmethod
+    def fingerprint(hash_input, method, template, length=None):
+        """Return cache key of 'hash_input' hashed with 'method' into 'template'."""
+        fingerprint = HashCache.fingerprinter(method, template, length)
+        fingerprint.update(hash_input.encode("utf-8"))
+        return fingerprint.digest()
+
+    def get(self, key):
+        """Return hash URI cached for 'key', or None. Counts hits and misses."""
+        row = self.db.execute("SELECT uri FROM hashes WHERE key = ?", (key,)).fetchone()
+        if row == None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touched.append((time.time_ns(), key))
+        return row[0]
+
+    def put(self, key, uri):
+        self.added.append((key, uri, time.time_ns()))
+        if len(self.added) >= self.batch_size:
+            self.flush(evict=False)
+
+    def flush(self, evict=True):
+        """Write buffered entries, then evict least recently used entries."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?)", self.added
+            )
+            self.db.executemany(
+                "UPDATE hashes SET used = ? WHERE key = ?", self.touched
+            )
+            self.added = []
+            self.touched = []
+
+            if evict:
+                excess = len(self) - self.max_entries
+                if excess > 0:
+                    self.db.execute(
+                        "DELETE FROM hashes WHERE key IN "
+                        "(SELECT key FROM hashes ORDER BY used LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evicted += excess
+
+    def stats(self):
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_evicted": self.evicted,
+        }
+
+    def close(self):
+        self.flush()
+        logger.info(
+            f"Hash cache '{self.path}': ({self.hits}) hits, ({self.misses}) misses, "
+            f"({self.evicted}) evicted."
+        )
+        self.db.close()
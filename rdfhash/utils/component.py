@@ -0,0 +1,178 @@
+from collections import Counter
+
+from rdfhash.utils.hash import hash_uri
+
+
+def _rank(signatures):
+    """Replace each signature by its rank among distinct 'signatures'."""
+    ranks = {s: i for i, s in enumerate(sorted(set(signatures)))}
+    return [ranks[s] for s in signatures]
+
+
+def _refine(subjects, references, colors):
+    """Refine 'colors' by the colors of referenced and referencing members, until
+    stable.
+
+    Colors of members start from their own triples, then every round adds the
+    colors of the members they reference, and of the members referencing them
+    (color refinement). Members sharing a color may still not be symmetric, only
+    indistinguishable by refinement.
+    """
+    while True:
+
+        def to_string(term):
+            return term if type(term) is str else f"_:c{colors[term]}"
+
+        refined = _rank(
+            [
+                f"{colors[i]} "
+                + "".join(sorted(f"{to_string(p)} {to_string(o)}.\n" for p, o in pairs))
+                + "".join(sorted(f"^{colors[j]} {to_string(p)}.\n" for j, p in refs))
+                for i, (pairs, refs) in enumerate(zip(subjects, references))
+            ]
+        )
+        if len(set(refined)) == len(set(colors)):
+            return refined
+        colors = refined
+
+
+def _encoding(subjects, labels):
+    """Sorted `{member} {predicate} {object}.\n` lines of every member."""
+
+    def to_string(term):
+        return term if type(term) is str else f"_:c{labels[term]}"
+
+    return "".join(
+        sorted(
+            f"_:c{labels[i]} {to_string(p)} {to_string(o)}.\n"
+            for i, pairs in enumerate(subjects)
+            for p, o in pairs
+        )
+    )
+
+
+def _orbit(members, automorphisms):
+    """Members mapped from 'members' by any composition of 'automorphisms'."""
+    orbit = set(members)
+    pending = list(members)
+    while pending:
+        member = pending.pop()
+        for automorphism in automorphisms:
+            image = automorphism[member]
+            if image not in orbit:
+                orbit.add(image)
+                pending.append(image)
+    return orbit
+
+
+def canonical_labels(subjects):
+    """Label members of a strongly connected component independently of input order.
+
+    Members are ordered by color refinement. While members share a color, each
+    member of the smallest shared color is in turn given a color of its own, and
+    colors are refined again (individualization-refinement). Every branch ends with
+    a label per member; the labels giving the smallest component encoding (see
+    `hash_component`) are kept, so the result does not depend on the order of
+    members.
+
+    Branches are only skipped when an automorphism found on the way (two branches
+    giving the same encoding) maps the member onto one already tried, so the
+    search stays short for symmetric components (eg. cycles).
+
+    Args:
+        subjects (list): Lists of `(predicate, object)` of each member. A term is
+            either its canonical string, or the index in 'subjects' of a member.
+
+    Returns:
+        list[int]: Label of each member, from 0 to `len(subjects) - 1`.
+    """
+    references = [[] for _ in subjects]
+    for i, pairs in enumerate(subjects):
+        for p, o in pairs:
+            if type(o) is not str:
+                references[o].append((i, p))
+
+    best = None
+    best_labels = None
+    automorphisms = []
+
+    # Branches of the search: refined colors, individualized members, members of
+    # the cell left to try, and members of the cell tried.
+    stack = []
+
+    def visit(colors, path):
+        nonlocal best, best_labels
+        colors = _refine(subjects, references, colors)
+        counts = Counter(colors)
+        if len(counts) == len(colors):
+            encoding = _encoding(subjects, colors)
+            if best == None or encoding < best:
+                best, best_labels = encoding, colors
+            elif encoding == best:
+                position = {label: i for i, label in enumerate(best_labels)}
+                automorphisms.append([position[label] for label in colors])
+            return
+        shared = min(color for color, count in counts.items() if count > 1)
+        cell = [i for i, c in enumerate(colors) if c == shared]
+        stack.append((colors, path, cell[::-1], []))
+
+    visit([0] * len(subjects), [])
+    while stack:
+        colors, path, cell, tried = stack[-1]
+        if not cell:
+            stack.pop()
+            continue
+        member = cell.pop()
+        fixing = [a for a in automorphisms if all(a[v] == v for v in path)]
+        if member in _orbit(tried, fixing):
+            continue
+        tried.append(member)
+        visit([2 * c + (i == member) for i, c in enumerate(colors)], path + [member])
+    return best_labels
+
+
+def hash_component(subjects, method, template, length=None, cache=None):
+    """Hash members of a strongly connected component as a unit.
+
+    Members referencing each other cannot be hashed one after another. Instead,
+    members are labelled `_:c{label}` (see `canonical_labels`), and the component
+    is encoded as sorted `{member} {predicate} {object}.\n` lines of every member.
+    Hash input of a member is the component encoding, followed by its own label.
+
+    Args:
+        subjects (list): Lists of `(predicate, object)` of each member. A term is
+            either its canonical string, or the index in 'subjects' of a member.
+        method (str): Hashing method to use.
+        template (str): Template string for hash URI.
+        length (int, optional): Length of hash result.
+        cache (HashCache, optional): Persistent hash cache. Defaults to None.
+
+    Returns:
+        list[str]: Hash URI of each member.
+    """
+    labels = canonical_labels(subjects)
+    encoding = _encoding(subjects, labels)
+    return [
+        hash_uri(f"{encoding}_:c{label}\n", method, template, length, cache)
+        for label in labels
+    ]
+
+
+def component_input(component, triples, to_string):
+    """Build input of `hash_component` from the triples of 'component' members.
+
+    Args:
+        component (list): Members of the component.
+        triples (dict): Subject to list of its triples.
+        to_string (callable): Canonical string of a term which is not a member.
+
+    Returns:
+        list: Lists of `(predicate, object)` of each member (see `hash_component`).
+    """
+    position = {s: i for i, s in enumerate(component)}
+
+    def to_input(term):
+        i = position.get(term)
+        return to_string(term) if i is None else i
+
+    return [[(to_input(t[1]), to_input(t[2])) for t in triples[s]] for s in component]
@@ -0,0 +1,122 @@
+from functools import lru_cache
+
+import rdflib
+import pyoxigraph
+
+from rdfhash.utils import ntriples
+
+# Maximum number of terms memoized per term family (rdflib, pyoxigraph, N-Triples).
+cache_size = 1 << 16
+
+xsd_string = "http://www.w3.org/2001/XMLSchema#string"
+xsd_boolean = "http://www.w3.org/2001/XMLSchema#boolean"
+rdf_langstring = "http://www.w3.org/1999/02/22-rdf-syntax-ns#langString"
+
+# Datatypes whose lexical form is never normalized.
+lexical_datatypes = {xsd_string, rdf_langstring}
+
+
+@lru_cache(maxsize=cache_size)
+def canonical_lexical(lexical, datatype):
+    """Return canonical lexical form of a typed literal.
+
+    Lexical forms are normalized with rdflib (eg. `"01"^^xsd:integer` -> `1`), as
+    rdflib based graphs already normalize literals when parsing. Booleans are
+    capitalized (`True`, `False`).
+
+    Args:
+        lexical (str): Lexical form of literal.
+        datatype (str): Datatype IRI.
+
+    Returns:
+        str: Canonical lexical form.
+    """
+    if datatype in lexical_datatypes:
+        return lexical
+    lexical = str(rdflib.Literal(lexical, datatype=rdflib.URIRef(datatype)))
+    if datatype == xsd_boolean:
+        return lexical.capitalize()
+    return lexical
+
+
+def encode_literal(lexical, datatype=None, language=None):
+    """Canonical string of a literal: `"{value}"^^<{datatype}>[@{language}]`.
+
+    Args:
+        lexical (str): Lexical form of literal.
+        datatype (str, optional): Datatype IRI. Defaults to `xsd:string`.
+        language (str, optional): Language tag.
+    """
+    if language:
+        # Language tags are case insensitive, pyoxigraph lowercases them.
+        return f'"{lexical}"^^<{rdf_langstring}>@{language.lower()}'
+    if datatype == None:
+        datatype = xsd_string
+    return f'"{canonical_lexical(lexical, datatype)}"^^<{datatype}>'
+
+
+@lru_cache(maxsize=cache_size)
+def _encode_rdflib(term):
+    if isinstance(term, rdflib.Literal):
+        datatype = term.datatype
+        return encode_literal(
+            str(term), None if datatype == None else str(datatype), term.language
+        )
+    if isinstance(term, rdflib.BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+
+_ox_literal = pyoxigraph.Literal
+_ox_blank_node = pyoxigraph.BlankNode
+
+
+@lru_cache(maxsize=cache_size)
+def _encode_ox(term):
+    term_type = type(term)
+    if term_type is _ox_literal:
+        return encode_literal(term.value, term.datatype.value, term.language)
+    if term_type is _ox_blank_node:
+        return f"_:{term.value}"
+    return f"<{term.value}>"
+
+
+def encode_term(term):
+    """Canonical string of an rdflib or pyoxigraph term, as used in hash input.
+
+    Results are memoized per term in a bounded cache, so repeated predicates and
+    literals cost a dict lookup. Every backend encodes equal terms identically.
+
+    Args:
+        term (rdflib.term.Node|pyoxigraph term): Term to encode.
+
+    Returns:
+        str: `<{iri}>`, `_:{id}` or `"{value}"^^<{datatype}>[@{language}]`.
+    """
+    # rdflib terms are 'str' subclasses, pyoxigraph terms are not.
+    if isinstance(term, str):
+        return _encode_rdflib(term)
+    return _encode_ox(term)
+
+
+@lru_cache(maxsize=cache_size)
+def encode_ntriples(term):
+    """Canonical string of an N-Triples term (see `encode_term`)."""
+    if ntriples.is_literal(term):
+        value, datatype, language = ntriples.split_literal(term)
+        if datatype != None:
+            datatype = ntriples.unescape(datatype[1:-1])
+        return encode_literal(value, datatype, language)
+    if ntriples.is_uri(term):
+        return ntriples.unescape(term)
+    return term
+
+
+def cache_info():
+    """Return `functools.lru_cache` statistics of each term cache."""
+    return {
+        "rdflib": _encode_rdflib.cache_info(),
+        "pyoxigraph": _encode_ox.cache_info(),
+        "ntriples": encode_ntriples.cache_info(),
+        "lexical": canonical_lexical.cache_info(),
+    }
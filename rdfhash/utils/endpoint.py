@@ -0,0 +1,316 @@
+import http.client
+import io
+import queue
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import pyoxigraph
+
+from rdfhash.logger import logger
+
+# Format requested from the endpoint.
+mime_nt = "application/n-triples"
+
+# Connection errors after which a request is retried once on a new connection
+# (eg. a keep-alive connection closed by the server while idle).
+retry_errors = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def describe_query(subjects, depth=1):
+    """Return SPARQL CONSTRUCT query of the triples of 'subjects'.
+
+    Triples of blank nodes reachable from 'subjects' through blank nodes are
+    included, up to 'depth' blank nodes away, as their labels are only meaningful
+    within one response (see `truncated`).
+
+    Args:
+        subjects (list): N-Triples strings of subject IRIs (eg. `<http://a>`).
+        depth (int, optional): Levels of nested blank nodes described.
+            Defaults to 1.
+    """
+    template = "".join(f" ?o{k - 1} ?p{k} ?o{k} ." for k in range(1, depth + 1))
+    optional = ""
+    for k in range(depth, 0, -1):
+        optional = (
+            f"OPTIONAL {{ ?o{k - 1} ?p{k} ?o{k} . FILTER (isBlank(?o{k - 1})) "
+            f"{optional}}} "
+        )
+    return (
+        f"CONSTRUCT {{ ?s ?p0 ?o0 .{template} }}\n"
+        "WHERE {\n"
+        "  VALUES ?s { " + " ".join(subjects) + " }\n"
+        "  ?s ?p0 ?o0 .\n"
+        f"  {optional}\n"
+        "}"
+    )
+
+
+def truncated(content, depth):
+    """Whether blank nodes of `describe_query` response 'content' (N-Triples) may
+    have triples beyond 'depth' which were not fetched.
+
+    Blank nodes reachable from the subjects through at most 'depth' blank nodes
+    were described. Blank nodes one level further were not.
+    """
+    objects = defaultdict(list)
+    level = set()
+    for triple in pyoxigraph.parse(io.BytesIO(content), mime_nt):
+        if type(triple.object) is pyoxigraph.BlankNode:
+            if type(triple.subject) is pyoxigraph.BlankNode:
+                objects[triple.subject].append(triple.object)
+            else:
+                level.add(triple.object)
+    seen = set(level)
+    for _ in range(depth):
+        level = {o for b in level for o in objects.get(b, ()) if o not in seen}
+        seen.update(level)
+    return bool(level)
+
+
+class SparqlEndpoint:
+    """SPARQL endpoint client fetching triples of subjects in batched queries.
+
+    Subjects are described `batch_size` at a time with a `VALUES` clause (see
+    `describe_query`). Batches are sent concurrently by at most 'concurrency'
+    threads, over a pool of keep-alive HTTP connections. Responses are kept in an
+    in-memory LRU cache keyed by query, so a client reused across runs (eg. by a
+    long-running process) does not fetch the same batch twice.
+
+    Example:
+
+        with SparqlEndpoint("http://localhost:7878/query") as endpoint:
+            hash_subjects(data, select="type=<http://schema.org/Person>",
+                          endpoint=endpoint)
+            print(endpoint.stats())
+    """
+
+    def __init__(
+        self,
+        url,
+        batch_size=100,
+        concurrency=4,
+        cache_size=1024,
+        timeout=60,
+        headers=None,
+    ):
+        """
+        Args:
+            url (str): URL of SPARQL query endpoint (`http` or `https`).
+            batch_size (int, optional): Subjects described per query.
+                Defaults to 100.
+            concurrency (int, optional): Maximum requests in flight, and open
+                connections. Defaults to 4.
+            cache_size (int, optional): Responses kept in memory. Defaults to 1024.
+            timeout (float, optional): Socket timeout in seconds. Defaults to 60.
+            headers (dict, optional): Extra HTTP headers (eg. `Authorization`).
+                Defaults to None.
+
+        Raises:
+            ValueError: If 'url' is not an http(s) URL, or a limit is below 1.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid SPARQL endpoint URL: '{url}'")
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError(
+                "SPARQL endpoint 'batch_size' and 'concurrency' must be at least 1."
+            )
+
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.headers = {
+            "Accept": mime_nt,
+            "Content-Type": "application/x-www-form-urlencoded",
+            **(headers or {}),
+        }
+
+        self.connections = queue.LifoQueue()
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+
+        self.requests = 0
+        self.cache_hits = 0
+        self.bytes_fetched = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connection(self):
+        try:
+            return self.connections.get_nowait()
+        except queue.Empty:
+            return self.connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, body):
+        connection = self._connection()
+        for attempt in (0, 1):
+            try:
+                connection.request("POST", self.path, body, self.headers)
+                response = connection.getresponse()
+                content = response.read()
+                break
+            except retry_errors:
+                connection.close()
+                if attempt:
+                    raise
+            except Exception:
+                connection.close()
+                raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.connections.put(connection)
+
+        if response.status != 200:
+            raise ValueError(
+                f"SPARQL endpoint '{self.url}' returned HTTP {response.status} "
+                f"{response.reason}: {content[:200].decode('utf-8', 'replace')}"
+            )
+        return content
+
+    def construct(self, query):
+        """Run CONSTRUCT 'query', returning its N-Triples response as bytes.
+
+        Raises:
+            ValueError: If the endpoint does not answer with HTTP 200.
+        """
+        with self.lock:
+            content = self.cache.get(query)
+            if content != None:
+                self.cache.move_to_end(query)
+                self.cache_hits += 1
+                return content
+
+        content = self._post(urlencode({"query": query}).encode("utf-8"))
+
+        with self.lock:
+            self.requests += 1
+            self.bytes_fetched += len(content)
+            if self.cache_size > 0:
+                self.cache[query] = content
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        logger.debug(f"Fetched ({len(content)}) bytes from '{self.url}'.")
+        return content
+
+    def describe_batch(self, subjects):
+        """Return N-Triples response describing 'subjects' with every blank node
+        reachable from them.
+
+        The query is sent again with twice the depth of nested blank nodes while
+        the response is truncated (see `truncated`), so one query is enough for
+        data without nested blank nodes.
+        """
+        depth = 1
+        while True:
+            content = self.construct(describe_query(subjects, depth))
+            if not truncated(content, depth):
+                return content
+            depth *= 2
+
+    def describe(self, subjects):
+        """Yield N-Triples responses describing 'subjects', one per batch (see
+        `describe_batch`).
+
+        Batches are fetched concurrently; responses are yielded in batch order.
+
+        Args:
+            subjects (list): N-Triples strings of subject IRIs, sorted so batches
+                (and cached responses) are stable across runs.
+        """
+        batches = [
+            subjects[i : i + self.batch_size]
+            for i in range(0, len(subjects), self.batch_size)
+        ]
+        if len(batches) <= 1 or self.concurrency == 1:
+            return map(self.describe_batch, batches)
+        if self.executor == None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="rdfhash-endpoint"
+            )
+        return self.executor.map(self.describe_batch, batches)
+
+    def stats(self):
+        return {
+            "endpoint_requests": self.requests,
+            "endpoint_cache_hits": self.cache_hits,
+            "endpoint_bytes": self.bytes_fetched,
+        }
+
+    def close(self):
+        if self.executor != None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        while True:
+            try:
+                self.connections.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def fetch_context(graph, subjects, endpoint):
+    """Replace descriptions of IRI 'subjects' in 'graph' with the ones fetched
+    from 'endpoint'.
+
+    Completes descriptions of subjects only partially present in 'graph' (eg. an
+    extract), so they are hashed from their full set of triples. The triples of a
+    subject described by the endpoint, and of the blank nodes reachable from it,
+    replace the ones in 'graph' (see `__Graph__.replace_subjects`), so blank nodes
+    of the extract are not kept next to the fetched ones. If 'graph' has named
+    graphs, a subject's description is replaced in every named graph it has
+    triples in.
+
+    Blank node subjects can not be looked up on an endpoint and are skipped.
+
+    Args:
+        graph (__Graph__): Graph to complete.
+        subjects (set): Selected subjects.
+        endpoint (SparqlEndpoint): Endpoint to fetch from.
+
+    Returns:
+        int: Number of triples fetched into 'graph'.
+    """
+    iris = [s for s in subjects if graph.is_uri(s)]
+    if not iris:
+        return 0
+
+    if graph.has_named_graphs():
+        graph_subjects = {
+            name: sorted(graph.term_to_string(s) for s in triples)
+            for name, triples in graph.graph_triples(set(iris)).items()
+        }
+    else:
+        graph_subjects = {None: sorted(graph.term_to_string(s) for s in iris)}
+
+    fetched = 0
+    for name, strings in graph_subjects.items():
+        # Each response is parsed on its own, blank node labels are scoped to it.
+        for content in endpoint.describe(strings):
+            fetched += graph.replace_subjects(content.decode("utf-8"), name)
+
+    logger.info(
+        f"Fetched ({fetched}) triples of ({len(iris)}) subjects from "
+        f"'{endpoint.url}'."
+    )
+    return fetched
@@ -1,11 +1,21 @@
 import os.path
 import io
+import shutil
+import tempfile
+from collections import defaultdict
+from contextlib import contextmanager
 
 import oxrdflib
 import rdflib
 import pyoxigraph
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.plugins.serializers.nt import _nt_row
+from rdflib.plugins.serializers.nquads import _nq_row
 
 from rdfhash.utils.hash import hash_string
+from rdfhash.utils.encode import encode_term
+from rdfhash.utils.ntriples import mime_line_based
+from rdfhash.utils.load import BulkLoader
 
 mime = {
     "trig": "application/trig",
@@ -31,6 +41,121 @@ file_ext = {
     "n3": "text/n3",
 }
 
+# Formats holding named graphs.
+mime_datasets = {mime["trig"], mime["nq"]}
+
+
+def mime_type(format):
+    """Return MIME type of 'format' (a MIME type, or a key of 'mime' or
+    'file_ext', eg. 'ttl'), or None if it is not supported.
+    """
+    if format in mime:
+        return mime[format]
+    if format in file_ext:
+        return file_ext[format]
+    if format in mime.values():
+        return format
+    return None
+
+
+# _____________________________________________________________________________ #
+
+
+def _map_triple(mapping, s, p, o):
+    """Replace subject and object with 'mapping', and predicate if subject replaced."""
+    s_new = mapping.get(s)
+    if s_new is None:
+        return s, p, mapping.get(o, o)
+    return s_new, mapping.get(p, p), mapping.get(o, o)
+
+
+def _rewritten_quads(quads, mapping_of, contains):
+    """Yield `(s, p, o, graph)` of 'quads' with terms replaced as in `rebuild`.
+
+    Quads are rewritten one at a time, without building a new graph. Only
+    rewritten quads are kept in memory: one is skipped if it was yielded before,
+    or if it is also an unchanged quad of the graph (checked with 'contains').
+
+    Args:
+        quads (iterable): `(s, p, o, graph)` of the graph.
+        mapping_of (function): Graph to mapping of terms in that graph.
+        contains (function): Whether a `(s, p, o, graph)` quad is in the graph.
+    """
+    seen = set()
+    for s, p, o, g in quads:
+        mapping = mapping_of(g)
+        s_new, p_new, o_new = _map_triple(mapping, s, p, o)
+        # Unchanged terms are returned as is.
+        if s_new is s and o_new is o:
+            yield s, p, o, g
+            continue
+        quad = (s_new, p_new, o_new, g)
+        if quad in seen:
+            continue
+        if mapping.get(s_new) is None and mapping.get(o_new) is None and contains(quad):
+            continue
+        seen.add(quad)
+        yield quad
+
+
+def _check_line_based(format):
+    if format not in mime_line_based:
+        raise ValueError(
+            "Writing rewritten quads requires 'application/n-triples' or "
+            f"'application/n-quads'. Got: {format}"
+        )
+
+
+@contextmanager
+def _binary_output(output):
+    """Open 'output' (file path or writable binary stream, left open) for writing."""
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as f:
+            yield f
+    else:
+        yield output
+
+
+def _ox_graph_name(graph_name):
+    """Name of pyoxigraph graph 'graph_name', or None if it is the default graph."""
+    return graph_name if type(graph_name) is pyoxigraph.NamedNode else None
+
+
+def _write_ox(store, output, format, mapping_of, graph_name_of=_ox_graph_name):
+    """Write quads of pyoxigraph 'store' rewritten with 'mapping_of' to 'output'.
+
+    'graph_name_of' returns the name of a pyoxigraph graph, or None if its quads
+    are part of the default graph (see `_ox_graph_name`).
+
+    Returns:
+        int: Number of statements written.
+    """
+    _check_line_based(format)
+    written = 0
+
+    def statements():
+        nonlocal written
+        for s, p, o, g in _rewritten_quads(
+            ((*q.triple, q.graph_name) for q in store),
+            mapping_of,
+            lambda quad: pyoxigraph.Quad(*quad) in store,
+        ):
+            written += 1
+            if format == mime["nq"]:
+                g = graph_name_of(g)
+                if g is None:
+                    g = pyoxigraph.DefaultGraph()
+                yield pyoxigraph.Quad(s, p, o, g)
+            else:
+                yield pyoxigraph.Triple(s, p, o)
+
+    pyoxigraph.serialize(statements(), output, format)
+    return written
+
+
+# Blank node subjects, evaluated natively by pyoxigraph stores in a single scan.
+blank_subjects_query = "SELECT DISTINCT ?s { ?s ?p ?o . FILTER (isBlank(?s)) }"
+
 # _____________________________________________________________________________ #
 
 
@@ -68,7 +193,10 @@ class __Graph__:
 
     supports_named_graphs = True
 
-    def __init__(self, data=None, format=None, max_path=2048):
+    # Whether 'subject_quads' and 'replace' are implemented natively.
+    native_hashing = False
+
+    def __init__(self, data=None, format=None, max_path=2048, parse_jobs=None):
         """Initialize graph object
 
         Args:
@@ -76,15 +204,22 @@ class __Graph__:
             format (_type_, optional): _description_. Defaults to None.
             max_path (int, optional): Check if 'data' is a file path if length
                 is less than 'max_path'. Specify -1 to always check. Defaults to 2048.
+            parse_jobs (int, optional): Number of files (or chunks of files) parsed
+                concurrently, where supported (see `parse_files`).
+                Defaults to None (`os.cpu_count()`).
         """
         if self.graph == None:
-            self.graph = self.graph_class()
+            self.graph = self.new_graph()
+        # Contexts holding triples of the default graph (see `graph_name`).
+        self.default_graphs = {DATASET_DEFAULT_GRAPH_ID}
 
         if data:
             type_data = type(data)
 
             if type_data == self.graph_class:
                 self.graph = data
+                if hasattr(data, "default_context"):
+                    self.default_graphs.add(data.default_context.identifier)
                 return
 
             elif type_data == str:
@@ -97,11 +232,20 @@ class __Graph__:
                 )
 
             # Parse all files into graph.
+            file_paths = []
             for item in data:
                 if (max_path == -1 or len(item) < max_path) and os.path.isfile(item):
-                    self.parse_file(item, format)
+                    file_paths.append(item)
                 else:
                     self.parse(item, format)
+            self.parse_files(file_paths, format, parse_jobs)
+
+    def new_graph(self):
+        """Return a new empty 'graph_class' graph."""
+        return self.graph_class(identifier=DATASET_DEFAULT_GRAPH_ID)
+
+    def close(self):
+        """Release resources held by the graph (see `OxiGraphDisk.close`)."""
 
     def __len__(self):
         return len(self.graph)
@@ -110,36 +254,93 @@ class __Graph__:
         return item in self.graph
 
     def _parse(self, data, format):
-        self.graph.parse(data=data, format=format)
+        self._parse_source(format, data=data)
 
     def _parse_file(self, file_path, format=None):
-        self.graph.parse(file_path, format=format)
+        self._parse_source(format, source=file_path)
+
+    def _parse_source(self, format, **source):
+        """Parse triples into the default graph, and datasets into their graphs.
+
+        rdflib parses the default graph of a dataset into a context named after
+        its source (eg. the file URI): it is recorded as part of the default graph,
+        so only graphs named in the dataset are named graphs (see `graph_name`).
+        """
+        if mime.get(format, format) in mime_datasets:
+            context = self.graph.parse(format=format, **source)
+            self.default_graphs.add(context.identifier)
+        else:
+            self.graph.default_context.parse(format=format, **source)
 
     def parse(self, data, format=None):
         self._parse(data=data, format=format or self.default_format)
         return self
 
-    def parse_file(self, file_path, format=None):
+    @staticmethod
+    def file_format(file_path, format=None):
+        """Return 'format', or format of 'file_path' by its extension if None."""
         if format == None:
             ext = os.path.splitext(file_path)[1][1:]
             if ext not in file_ext:
                 raise ValueError("File specified not recognized as a valid RDF file. ")
-            self._parse_file(file_path, format=file_ext[ext])
-        else:
-            self._parse_file(file_path, format=format)
+            return file_ext[ext]
+        return format
+
+    def parse_file(self, file_path, format=None):
+        self._parse_file(file_path, format=self.file_format(file_path, format))
+        return self
+
+    def parse_files(self, file_paths, format=None, jobs=None):
+        """Parse files one after another (rdflib parsers hold the GIL).
+
+        Args:
+            file_paths (list): Paths of files.
+            format (str, optional): Format of files. Defaults to None (by extension).
+            jobs (int, optional): Unused, see `OxiGraph.parse_files`.
+        """
+        for file_path in file_paths:
+            self.parse_file(file_path, format)
         return self
 
     def serialize(self, path=None, format=None):
+        """Serialize graph to 'path', or return it as a string.
+
+        Args:
+            path (str|io.BufferedIOBase, optional): File path or writable binary
+                stream, written incrementally. Defaults to None (return string).
+            format (str, optional): Output format. Defaults to 'default_format'.
+        """
+        format = format or self.default_format
+        if mime.get(format, format) == mime["nq"]:
+            # Written without rewriting, so triples of the default graph have no
+            # graph term (rdflib writes the context they were parsed into).
+            if path:
+                self.write_mapped(path, mime["nq"], {})
+                return True
+            with io.BytesIO() as buffer:
+                self.write_mapped(buffer, mime["nq"], {})
+                return buffer.getvalue().decode("utf-8")
         if path:
-            self.graph.serialize(destination=path, format=format or self.default_format)
+            self.graph.serialize(destination=path, format=format, encoding="utf-8")
             return True
         else:
-            return self.graph.serialize(format=format or self.default_format)
+            return self.graph.serialize(format=format)
 
     def query(self, query):
         res = self.graph.query(query)
         return res
 
+    def query_subjects(self, query):
+        """Yield terms of each solution of SPARQL SELECT 'query', as they stream in.
+
+        Args:
+            query (str): SPARQL SELECT query. Unbound variables are skipped.
+        """
+        for row in self.graph.query(query):
+            for term in row:
+                if term != None:
+                    yield term
+
     def subjects(self, predicate=None, object=None):
         return self.graph.subjects(predicate, object)
 
@@ -159,6 +360,18 @@ class __Graph__:
             return self.graph.quads((None, None, None, None))
         return self.graph.quads(quad)
 
+    def blank_subjects(self):
+        """Yield blank node subjects in a single scan. May contain duplicates."""
+        BlankNode = self.BlankNode
+        for s, _, _ in self.triples():
+            if type(s) == BlankNode:
+                yield s
+
+    def pattern_subjects(self, predicate, object=None):
+        """Yield subjects of triples matching 'predicate' and 'object'. May contain
+        duplicates."""
+        return self.graph.subjects(predicate, object)
+
     def is_bnode(self, term):
         return type(term) == self.BlankNode
 
@@ -182,17 +395,16 @@ class __Graph__:
         )
 
     def term_to_string(self, term, expand_literals=False):
-        if expand_literals and type(term) == self.Literal:
-            value, datatype, language = term.value, term.datatype, term.language
-            if datatype == None:
-                if language:
-                    datatype = self.xsd_langstring
-                else:
-                    datatype = self.xsd_string
-            if term.language:
-                return f'"{value}"^^{datatype.n3()}@{language}'
+        """String representation of 'term'.
 
-            return f'"{value}"^^{datatype.n3()}'
+        Args:
+            term: Term to represent.
+            expand_literals (bool, optional): Return canonical encoding used as hash
+                input (see `encode_term`), identical for every graph type.
+                Defaults to False (N3 representation).
+        """
+        if expand_literals:
+            return encode_term(term)
         return term.n3()
 
     def hash_triples(self, triples, method="sha256", triple_format="{p} {o}\n"):
@@ -210,6 +422,176 @@ class __Graph__:
         self.graph.remove(triples)
         return self
 
+    def replace_subjects(self, data, graph_name=None):
+        """Replace descriptions of the IRI subjects of N-Triples 'data' with 'data'.
+
+        Triples of each IRI subject of 'data' in graph 'graph_name' are removed,
+        with the triples of blank nodes no longer referenced once they are (see
+        `remove_subjects`), then the triples of 'data' are added. Blank nodes of
+        'data' are new nodes, scoped to 'data'.
+
+        Args:
+            data (str): N-Triples.
+            graph_name (optional): Name of graph to replace triples in.
+                Defaults to None (default graph).
+
+        Returns:
+            int: Number of triples added.
+        """
+        triples = list(rdflib.Graph().parse(data=data, format=mime["nt"]))
+        self.remove_subjects({s for s, _, _ in triples if self.is_uri(s)}, graph_name)
+        if graph_name == None:
+            context = self.graph.default_context
+        else:
+            context = self.graph.get_context(graph_name)
+        for triple in triples:
+            context.add(triple)
+        return len(triples)
+
+    def _graph_quads(self, subject=None, object=None, graph_name=None):
+        """Quads `(s, p, o, context)` of graph 'graph_name' matching the pattern."""
+        default = self.graph.default_context
+        return [
+            (s, p, o, default if ctx is None else ctx)
+            for s, p, o, ctx in self.graph.quads((subject, None, object, None))
+            if self.graph_name(ctx) == graph_name
+        ]
+
+    def remove_subjects(self, subjects, graph_name=None):
+        """Remove triples of 'subjects' from graph 'graph_name', and triples of
+        blank nodes which are no longer referenced once they are.
+
+        Args:
+            subjects (set): Subjects to remove.
+            graph_name (optional): Name of graph to remove triples from.
+                Defaults to None (default graph).
+        """
+        pending = list(subjects)
+        while pending:
+            subject = pending.pop()
+            for s, p, o, ctx in self._graph_quads(subject, None, graph_name):
+                self.graph.remove((s, p, o, ctx))
+                if self.is_bnode(o) and not self._graph_quads(None, o, graph_name):
+                    pending.append(o)
+
+    def graph_name(self, graph):
+        """Name of named graph 'graph', or None if it is the default graph.
+
+        Only graphs named by an IRI in a TriG/N-Quads dataset are named graphs.
+        Contexts not named by an IRI, and contexts rdflib parses a source's
+        default graph into (see `_parse_source`), are part of the default graph.
+        """
+        if graph is None:
+            return None
+        identifier = graph.identifier
+        if type(identifier) != self.NamedNode or identifier in self.default_graphs:
+            return None
+        return identifier
+
+    def has_named_graphs(self):
+        return any(self.graph_name(ctx) != None for ctx in self.graph.contexts())
+
+    def graph_triples(self, subjects):
+        """Collect triples of 'subjects' in each graph, in one pass.
+
+        Args:
+            subjects (set): Selected subjects.
+
+        Returns:
+            dict: Graph name (None for the default graph) to a dictionary of subject
+                to list of its triples in that graph.
+        """
+        # Triples of a subject are kept in order, once per graph: several
+        # contexts may be part of the default graph.
+        graphs = defaultdict(lambda: defaultdict(dict))
+        for s, p, o, ctx in self.graph.quads((None, None, None, None)):
+            if s in subjects:
+                graphs[self.graph_name(ctx)][s][(s, p, o)] = None
+        return {
+            name: {s: list(triples) for s, triples in graph.items()}
+            for name, graph in graphs.items()
+        }
+
+    def rebuild(self, mapping, graph_mappings=None):
+        """Rebuild graph in a single pass, replacing terms found in 'mapping'.
+
+        Subjects and objects are replaced everywhere. Predicates are only replaced
+        on triples of a replaced subject. Named graphs are kept.
+
+        Args:
+            mapping (dict): Old term to new term.
+            graph_mappings (dict, optional): Graph name (None for the default graph)
+                to mapping of terms in that graph, used instead of 'mapping'.
+                Defaults to None.
+        """
+        graph_new = self.new_graph()
+        for prefix, namespace in self.graph.namespaces():
+            graph_new.bind(prefix, namespace)
+
+        default_id = self.graph.default_context.identifier
+
+        def context(ctx):
+            # oxrdflib yields no context for quads of its default graph.
+            if ctx == None or ctx.identifier == default_id:
+                return graph_new.default_context
+            return graph_new.get_context(ctx.identifier)
+
+        mapping_of = self._mapping_of(mapping, graph_mappings)
+        graph_new.addN(
+            (*_map_triple(mapping_of(ctx), s, p, o), context(ctx))
+            for s, p, o, ctx in self.graph.quads((None, None, None, None))
+        )
+        self.graph = graph_new
+        return self
+
+    def _mapping_of(self, mapping, graph_mappings=None):
+        """Return function of a graph to the mapping of its terms (see `rebuild`)."""
+        if graph_mappings == None:
+            return lambda graph: mapping
+        return lambda graph: graph_mappings.get(self.graph_name(graph), {})
+
+    def write_mapped(self, output, format, mapping, graph_mappings=None):
+        """Write graph with terms found in 'mapping' replaced, leaving it unchanged.
+
+        Quads are rewritten as in `rebuild` and written line by line as they are
+        read, without building the result graph.
+
+        Args:
+            output (str|io.BufferedIOBase): File path or writable binary stream.
+            format (str): 'application/n-triples' or 'application/n-quads'.
+                N-Triples output holds the triples of every graph.
+            mapping (dict): Old term to new term.
+            graph_mappings (dict, optional): Graph name to mapping of terms in that
+                graph, used instead of 'mapping' (see `rebuild`).
+
+        Raises:
+            ValueError: If 'format' is not N-Triples or N-Quads.
+
+        Returns:
+            int: Number of statements written.
+        """
+        _check_line_based(format)
+        quads = format == mime["nq"]
+        written = 0
+        with _binary_output(output) as f:
+            f_text = io.TextIOWrapper(f, encoding="utf-8", newline="\n")
+            try:
+                for s, p, o, ctx in _rewritten_quads(
+                    self.graph.quads((None, None, None, None)),
+                    self._mapping_of(mapping, graph_mappings),
+                    self.graph.__contains__,
+                ):
+                    name = self.graph_name(ctx) if quads else None
+                    if name == None:
+                        f_text.write(_nt_row((s, p, o)))
+                    else:
+                        f_text.write(_nq_row((s, p, o), name))
+                    written += 1
+            finally:
+                f_text.flush()
+                f_text.detach()
+        return written
+
     """Available methods:
     __init__
     __len__
@@ -220,11 +602,14 @@ class __Graph__:
     parse_file
     serialize
     query
+    query_subjects
     subjects
     predicates
     objects
     quads
     triples
+    blank_subjects
+    pattern_subjects
     is_bnode
     is_uri
     is_literal
@@ -232,6 +617,10 @@ class __Graph__:
     hash_triples
     add
     remove
+    graph_name
+    has_named_graphs
+    graph_triples
+    rebuild
     """
 
 
@@ -262,9 +651,180 @@ class OxRdfLibGraph(RdfLibGraph):
     supports_named_graphs = True
     """Inheriting methods from RdfLibGraph"""
 
-    def __init__(self, data=None, format=None, max_path=2048):
-        self.graph = rdflib.ConjunctiveGraph(store="Oxigraph")
-        super().__init__(data, format, max_path)
+    def __init__(self, data=None, format=None, max_path=2048, parse_jobs=None):
+        self.graph = self.new_graph()
+        super().__init__(data, format, max_path, parse_jobs)
+
+    def new_graph(self):
+        """Return a new empty rdflib graph backed by an oxrdflib store."""
+        return rdflib.ConjunctiveGraph(
+            store="Oxigraph", identifier=DATASET_DEFAULT_GRAPH_ID
+        )
+
+    def _ox_store(self):
+        """Return the pyoxigraph `Store` behind oxrdflib, or None if not found.
+
+        oxrdflib does not expose its store publicly. Methods reading it directly
+        fall back to the rdflib API (see `RdfLibGraph`) when it is None, eg. with
+        another version of oxrdflib.
+        """
+        store = getattr(self.graph.store, "_inner", None)
+        return store if isinstance(store, pyoxigraph.Store) else None
+
+    def parse_files(self, file_paths, format=None, jobs=None):
+        """Bulk load N-Triples files into the underlying pyoxigraph store.
+
+        N-Triples files are loaded concurrently (see `BulkLoader`), into the
+        default graph as other triple formats are (see `_parse_source`). Other
+        formats are parsed by rdflib, which keeps their prefixes for serialization.
+        """
+        store = self._ox_store()
+        if store is None:
+            return super().parse_files(file_paths, format, jobs)
+        others = []
+        with BulkLoader(store, jobs) as loader:
+            for file_path in file_paths:
+                if self.file_format(file_path, format) != mime["nt"]:
+                    others.append(file_path)
+                    continue
+                loader.load_file(file_path, mime["nt"])
+        return super().parse_files(others, format)
+
+    @staticmethod
+    def _to_ox(term):
+        if type(term) == rdflib.BNode:
+            return pyoxigraph.BlankNode(str(term))
+        return pyoxigraph.NamedNode(str(term))
+
+    @staticmethod
+    def _from_ox(term):
+        type_term = type(term)
+        if type_term is pyoxigraph.BlankNode:
+            return rdflib.BNode(term.value)
+        if type_term is pyoxigraph.Literal:
+            if term.language:
+                return rdflib.Literal(term.value, lang=term.language)
+            return rdflib.Literal(term.value, datatype=rdflib.URIRef(term.datatype.value))
+        return rdflib.URIRef(term.value)
+
+    def query_subjects(self, query):
+        """Run 'query' with pyoxigraph's `Store.query`, bypassing rdflib's result
+        rows. Terms are converted to rdflib as solutions are consumed.
+
+        Prefixes bound in the graph are declared, as rdflib does.
+        """
+        store = self._ox_store()
+        if store is None:
+            yield from super().query_subjects(query)
+            return
+        prefixes = "".join(
+            f"PREFIX {prefix}: <{namespace}>\n"
+            for prefix, namespace in self.graph.namespaces()
+        )
+        solutions = store.query(prefixes + query, use_default_graph_as_union=True)
+        from_ox = self._from_ox
+        for solution in solutions:
+            for term in solution:
+                if term is not None:
+                    yield from_ox(term)
+
+    def blank_subjects(self):
+        """Scan pyoxigraph store natively, converting each blank node subject once."""
+        store = self._ox_store()
+        if store is None:
+            yield from super().blank_subjects()
+            return
+        for solution in store.query(
+            blank_subjects_query, use_default_graph_as_union=True
+        ):
+            yield rdflib.BNode(solution[0].value)
+
+    def pattern_subjects(self, predicate, object=None):
+        store = self._ox_store()
+        if store is None:
+            return super().pattern_subjects(predicate, object)
+        quads = store.quads_for_pattern(
+            None,
+            self._to_ox(predicate),
+            None if object == None else self._to_ox(object),
+        )
+        return (self._from_ox(q.subject) for q in quads)
+
+    def rebuild(self, mapping, graph_mappings=None):
+        """Rebuild graph with pyoxigraph's `bulk_extend`, bypassing rdflib terms.
+
+        Args:
+            mapping (dict): Old term to new term.
+            graph_mappings (dict, optional): Graph name to mapping of terms in that
+                graph, used instead of 'mapping' (see `__Graph__.rebuild`).
+        """
+        store = self._ox_store()
+        if store is None:
+            return super().rebuild(mapping, graph_mappings)
+
+        mapping_of = self._mapping_of(mapping, graph_mappings)
+        store_new = pyoxigraph.Store()
+        store_new.bulk_extend(
+            pyoxigraph.Quad(
+                *_map_triple(mapping_of(q.graph_name), *q.triple), q.graph_name
+            )
+            for q in store
+        )
+        graph_new = rdflib.ConjunctiveGraph(
+            store=oxrdflib.OxigraphStore(store=store_new),
+            identifier=DATASET_DEFAULT_GRAPH_ID,
+        )
+        for prefix, namespace in self.graph.namespaces():
+            graph_new.bind(prefix, namespace)
+        self.graph = graph_new
+        return self
+
+    def _mapping_of(self, mapping, graph_mappings=None):
+        """Return function of a pyoxigraph graph name to its pyoxigraph mapping.
+
+        Without the pyoxigraph store, returns the rdflib mapping function instead
+        (see `__Graph__._mapping_of`).
+        """
+        if self._ox_store() is None:
+            return super()._mapping_of(mapping, graph_mappings)
+
+        def to_ox(mapping):
+            return {self._to_ox(k): self._to_ox(v) for k, v in mapping.items()}
+
+        if graph_mappings == None:
+            mapping = to_ox(mapping)
+            return lambda graph_name: mapping
+        ox_mappings = {
+            None if name == None else self._to_ox(name): to_ox(mapping)
+            for name, mapping in graph_mappings.items()
+        }
+        return lambda graph_name: ox_mappings.get(self._ox_graph_name(graph_name), {})
+
+    def _ox_graph_name(self, graph_name):
+        """Name of pyoxigraph graph 'graph_name', or None if it is part of the
+        default graph (see `__Graph__.graph_name`).
+        """
+        if type(graph_name) is not pyoxigraph.NamedNode:
+            return None
+        if rdflib.URIRef(graph_name.value) in self.default_graphs:
+            return None
+        return graph_name
+
+    def write_mapped(self, output, format, mapping, graph_mappings=None):
+        """Write rewritten quads with pyoxigraph, bypassing rdflib terms.
+
+        See `__Graph__.write_mapped`.
+        """
+        store = self._ox_store()
+        if store is None:
+            return super().write_mapped(output, format, mapping, graph_mappings)
+        return _write_ox(
+            store,
+            output,
+            format,
+            self._mapping_of(mapping, graph_mappings),
+            self._ox_graph_name,
+        )
 
 
 # __   __   __   __   __   __   __   __   __   __   __   __   __   __   __   __ #
@@ -287,6 +847,14 @@ class OxiGraph(__Graph__):
 
     supports_named_graphs = True
 
+    native_hashing = True
+
+    # Rewritten quads added to the store at once (see `replace`).
+    batch_size = 100000
+
+    def new_graph(self):
+        return self.graph_class()
+
     def __contains__(self, item):
         iter = self.quads(item)
         try:
@@ -296,12 +864,22 @@ class OxiGraph(__Graph__):
             return False
 
     def _parse(self, data, format):
-        input = io.StringIO(data)
-        self.graph.load(input, format)
+        self.graph.bulk_load(io.StringIO(data), format)
         return self
 
     def _parse_file(self, path, format):
-        self.graph.load(path, format)
+        self.graph.bulk_load(path, format)
+        return self
+
+    def parse_files(self, file_paths, format=None, jobs=None):
+        """Bulk load files concurrently, in a pool of 'jobs' threads.
+
+        Large N-Triples/N-Quads files are split into chunks loaded in parallel (see
+        `BulkLoader`).
+        """
+        with BulkLoader(self.graph, jobs) as loader:
+            for file_path in file_paths:
+                loader.load_file(file_path, self.file_format(file_path, format))
         return self
 
     def serialize(self, path=None, format=None):
@@ -329,26 +907,255 @@ class OxiGraph(__Graph__):
     def quads(self, quad):
         return self.graph.quads_for_pattern(*quad)
 
+    def query(self, query):
+        # Match triples of named graphs too, as rdflib's ConjunctiveGraph does.
+        return self.graph.query(query, use_default_graph_as_union=True)
+
+    def query_subjects(self, query):
+        for solution in self.query(query):
+            for term in solution:
+                if term is not None:
+                    yield term
+
     def triples(self, triple=None):
         if triple == None:
             triple = (None, None, None)
         return self.quads(triple)
 
     def term_to_string(self, term, expand_literals=False):
-        if expand_literals and type(term) == self.Literal:
-            value, datatype, language = term.value, term.datatype, term.language
-            if datatype == self.xsd_boolean:
-                value = str(value.capitalize())
-            if language:
-                return f'"{value}"^^{datatype}@{language}'
-            return f'"{value}"^^{datatype}'
+        if expand_literals:
+            return encode_term(term)
         return str(term)
 
+    def blank_subjects(self):
+        # Scanning in pyoxigraph is faster than iterating quads in Python.
+        return (
+            solution[0]
+            for solution in self.graph.query(
+                blank_subjects_query, use_default_graph_as_union=True
+            )
+        )
+
+    def pattern_subjects(self, predicate, object=None):
+        return (q.subject for q in self.graph.quads_for_pattern(None, predicate, object))
+
     def add(self, quad):
-        return self.graph.add(self.Quad(*quad))
+        if type(quad) is not self.Quad:
+            quad = self.Quad(*quad)
+        return self.graph.add(quad)
 
     def remove(self, quad):
-        return self.graph.remove(self.Quad(*quad))
+        if type(quad) is not self.Quad:
+            quad = self.Quad(*quad)
+        return self.graph.remove(quad)
+
+    def replace_subjects(self, data, graph_name=None):
+        if graph_name is None:
+            graph_name = pyoxigraph.DefaultGraph()
+        quads = [
+            self.Quad(triple.subject, triple.predicate, triple.object, graph_name)
+            for triple in pyoxigraph.parse(io.BytesIO(data.encode("utf-8")), mime["nt"])
+        ]
+        self.remove_subjects(
+            {q.subject for q in quads if type(q.subject) is self.NamedNode}, graph_name
+        )
+        self.graph.extend(quads)
+        return len(quads)
+
+    def remove_subjects(self, subjects, graph_name=None):
+        if graph_name is None:
+            graph_name = pyoxigraph.DefaultGraph()
+        quads_for_pattern = self.graph.quads_for_pattern
+        pending = list(subjects)
+        while pending:
+            subject = pending.pop()
+            for q in list(quads_for_pattern(subject, None, None, graph_name)):
+                self.graph.remove(q)
+                o = q.object
+                if type(o) is self.BlankNode:
+                    if next(quads_for_pattern(None, None, o, graph_name), None) is None:
+                        pending.append(o)
+
+    def subject_quads(self, subjects):
+        """Collect quads of 'subjects' and quads referencing them in one store pass.
+
+        Args:
+            subjects (set): Selected subjects.
+
+        Returns:
+            tuple: `(quads, references)`. Subject to list of its quads, and subject
+                to list of quads with it in the object position.
+        """
+        quads = defaultdict(list)
+        references = defaultdict(list)
+        for quad in self.graph:
+            if quad.subject in subjects:
+                quads[quad.subject].append(quad)
+            if quad.object in subjects:
+                references[quad.object].append(quad)
+        return dict(quads), references
+
+    def replace(self, mapping, quads, references):
+        """Replace hashed subjects: native removes, and `bulk_extend` of the new
+        quads every 'batch_size' quads.
+
+        If most of the store is affected, rebuilds it instead (see `rebuild`), as
+        removing quads one by one costs more than copying the rest.
+
+        Args:
+            mapping (dict): Subject to hashed subject.
+            quads (dict): Subject to list of its quads (see `subject_quads`).
+            references (dict): Subject to quads referencing it.
+        """
+        affected = sum(len(quads[s]) + len(references.get(s, ())) for s in mapping)
+        if affected * 2 >= len(self.graph):
+            return self.rebuild(mapping)
+
+        remove = self.graph.remove
+        Quad = self.Quad
+        quads_new = []
+
+        for subject, hash_subj in mapping.items():
+            for q in quads[subject]:
+                remove(q)
+                quads_new.append(
+                    Quad(
+                        hash_subj,
+                        mapping.get(q.predicate, q.predicate),
+                        mapping.get(q.object, q.object),
+                        q.graph_name,
+                    )
+                )
+            for q in references.get(subject, ()):
+                # References from hashed subjects are replaced above.
+                if q.subject in mapping:
+                    continue
+                remove(q)
+                quads_new.append(Quad(q.subject, q.predicate, hash_subj, q.graph_name))
+            if len(quads_new) >= self.batch_size:
+                self.graph.bulk_extend(quads_new)
+                quads_new = []
+
+        self.graph.bulk_extend(quads_new)
+        return self
+
+    def graph_name(self, graph):
+        return graph if type(graph) is self.NamedNode else None
+
+    def has_named_graphs(self):
+        return any(type(g) is self.NamedNode for g in self.graph.named_graphs())
+
+    def graph_triples(self, subjects):
+        graphs = defaultdict(lambda: defaultdict(list))
+        for quad in self.graph:
+            if quad.subject in subjects:
+                graphs[self.graph_name(quad.graph_name)][quad.subject].append(quad)
+        return graphs
+
+    def rebuild(self, mapping, graph_mappings=None):
+        """Rebuild store with `bulk_extend`, replacing terms found in 'mapping'.
+
+        Args:
+            mapping (dict): Old term to new term.
+            graph_mappings (dict, optional): Graph name to mapping of terms in that
+                graph, used instead of 'mapping' (see `__Graph__.rebuild`).
+        """
+        mapping_of = self._mapping_of(mapping, graph_mappings)
+        store_new = pyoxigraph.Store()
+        store_new.bulk_extend(
+            self.Quad(*_map_triple(mapping_of(q.graph_name), *q.triple), q.graph_name)
+            for q in self.graph
+        )
+        self.graph = store_new
+        return self
+
+    def write_mapped(self, output, format, mapping, graph_mappings=None):
+        """Write rewritten quads with `pyoxigraph.serialize`.
+
+        See `__Graph__.write_mapped`.
+        """
+        return _write_ox(
+            self.graph, output, format, self._mapping_of(mapping, graph_mappings)
+        )
+
+
+# __   __   __   __   __   __   __   __   __   __   __   __   __   __   __   __ #
+
+
+class OxiGraphDisk(OxiGraph):
+    """On-disk (RocksDB) pyoxigraph store, for graphs larger than memory.
+
+    Input is loaded with pyoxigraph's bulk loader. The store is updated in place:
+    rebuilds only rewrite changed quads instead of copying the store.
+    """
+
+    # Temporary directory of the store, if 'store_path' was not given.
+    tmp_dir = None
+
+    def __init__(
+        self, data=None, format=None, max_path=2048, store_path=None, parse_jobs=None
+    ):
+        """
+        Args:
+            store_path (str, optional): Directory of the store, created if missing.
+                Data already in the store is kept. Defaults to None (temporary
+                directory, deleted when the graph is closed, see `close`).
+        """
+        if store_path == None:
+            self.tmp_dir = tempfile.mkdtemp(prefix="rdfhash-")
+            store_path = self.tmp_dir
+        self.store_path = store_path
+        self.graph = pyoxigraph.Store(store_path)
+        super().__init__(data, format, max_path, parse_jobs)
+
+    def close(self):
+        """Close the store, then delete its temporary directory (if any).
+
+        RocksDB keeps writing to the directory while the store is open, so it is
+        only deleted once the store is released. Called when the graph is garbage
+        collected, if it was not closed before.
+        """
+        self.graph = None
+        if self.tmp_dir != None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+
+    def __del__(self):
+        self.close()
+
+    def rebuild(self, mapping, graph_mappings=None):
+        """Rewrite quads with terms found in 'mapping' in place, in one store scan.
+
+        Changed quads are removed and their rewritten quads added 'batch_size' at
+        a time, so memory does not grow with the store. The scan reads a snapshot
+        of the store: quads added on the way are not visited.
+
+        Args:
+            mapping (dict): Old term to new term.
+            graph_mappings (dict, optional): Graph name to mapping of terms in that
+                graph, used instead of 'mapping' (see `__Graph__.rebuild`).
+        """
+        mapping_of = self._mapping_of(mapping, graph_mappings)
+        removed = []
+        added = []
+        for q in self.graph:
+            s, p, o = q.triple
+            triple = _map_triple(mapping_of(q.graph_name), s, p, o)
+            # Unchanged terms are returned as is.
+            if triple[0] is not s or triple[1] is not p or triple[2] is not o:
+                removed.append(q)
+                added.append(self.Quad(*triple, q.graph_name))
+                if len(removed) >= self.batch_size:
+                    self._rewrite(removed, added)
+                    removed, added = [], []
+
+        self._rewrite(removed, added)
+        return self
+
+    def _rewrite(self, removed, added):
+        for q in removed:
+            self.graph.remove(q)
+        self.graph.bulk_extend(added)
 
 
 # _____________________________________________________________________________ #
@@ -357,6 +1164,7 @@ graph_types = {
     "rdflib": RdfLibGraph,
     "oxrdflib": OxRdfLibGraph,
     "oxigraph": OxiGraph,
+    "oxigraph-disk": OxiGraphDisk,
 }
 
 graph_classes = {
@@ -366,15 +1174,42 @@ graph_classes = {
 }
 
 
-def get_graph(data=None, format="trig", graph_type="oxrdflib", max_path=2048):
+def get_graph(
+    data=None,
+    format="trig",
+    graph_type="oxrdflib",
+    max_path=2048,
+    store_path=None,
+    parse_jobs=None,
+):
+    """Return graph of 'graph_type' containing 'data'.
+
+    Args:
+        store_path (str, optional): Directory of an on-disk pyoxigraph store (see
+            `OxiGraphDisk`). Only supported by graph types 'oxigraph' and
+            'oxigraph-disk'. Defaults to None.
+        parse_jobs (int, optional): Number of files parsed concurrently (see
+            `__Graph__.parse_files`). Defaults to None (`os.cpu_count()`).
+
+    Raises:
+        ValueError: If 'graph_type' is not supported, or does not support
+            'store_path'.
+    """
     type_data = type(data)
 
     if issubclass(type_data, __Graph__):
         return data
     elif type_data in graph_classes:
         return graph_classes[type_data](data, format)
+    elif store_path != None:
+        if graph_type not in ("oxigraph", "oxigraph-disk"):
+            raise ValueError(
+                "Argument 'store_path' requires graph type 'oxigraph' or "
+                "'oxigraph-disk'. Got: " + str(graph_type)
+            )
+        return OxiGraphDisk(data, format, max_path, store_path, parse_jobs)
     elif graph_type in graph_types:
-        return graph_types[graph_type](data, format, max_path)
+        return graph_types[graph_type](data, format, max_path, parse_jobs=parse_jobs)
     else:
         raise ValueError(
             "Argument 'graph_type' must be one of: "
@@ -1,5 +1,10 @@
 import hashlib
 import uuid
+import warnings
+
+from rdfhash.logger import logger
+from rdfhash.utils import stats as stats_module
+from rdfhash.utils.sort import ExternalSorter
 
 
 hashlib_methods = {
@@ -25,45 +30,285 @@ uuid_methods = {
 
 manual_methods = {
     "uuid5": lambda v: uuid.uuid5(uuid.NAMESPACE_OID, v).hex,
-    "shake-128": lambda v, length: hashlib.shake_128(v).hexdigest(length),
-    "shake-256": lambda v, length: hashlib.shake_256(v).hexdigest(length),
+    "shake-128": hashlib.shake_128,
+    "shake-256": hashlib.shake_256,
 }
 
+# Entry point group of hash method plugins. Each entry point is a function called
+# with `register_hash_method` at import, registering any number of methods.
+entry_point_group = "rdfhash.hash_methods"
+
 # ----------------------------------------------------------------------------- #
 
 
-hash_types_requiring_length = {
-    "shake-128",
-    "shake-256",
-}
+class HashMethod:
+    """Hash method registered with `register_hash_method`."""
 
-hash_types_requiring_string = {
-    "uuid5",
-}
+    def __init__(
+        self,
+        name,
+        factory,
+        supports_update=True,
+        requires_length=False,
+        requires_string=False,
+        resolvable=True,
+        deterministic=True,
+    ):
+        self.name = name
+        self.factory = factory
+        self.supports_update = supports_update
+        self.requires_length = requires_length
+        self.requires_string = requires_string
+        self.resolvable = resolvable
+        self.deterministic = deterministic
 
-hash_types_resolvable = {
-    *list(hashlib_methods.keys()),
-    "uuid5",
-    "shake-128",
-    "shake-256",
-}
+    def hexdigest(self, hash_object, length=None):
+        """Hexadecimal digest of incremental 'hash_object' (see `factory`)."""
+        if self.requires_length:
+            return hash_object.hexdigest(length)
+        return hash_object.hexdigest()
+
+    def __call__(self, data, length=None):
+        """Hash 'data' (bytes, or str if 'requires_string') at once."""
+        if self.supports_update:
+            hash_object = self.factory()
+            hash_object.update(data)
+            return self.hexdigest(hash_object, length)
+        if self.requires_length:
+            return self.factory(data, length)
+        return self.factory(data)
+
+
+# Registered hash methods: name to `HashMethod`. Use `register_hash_method`.
+hash_types = {}
+
+hash_types_requiring_length = set()
+
+hash_types_requiring_string = set()
+
+hash_types_resolvable = set()
+
+
+def register_hash_method(
+    name,
+    factory,
+    supports_update=True,
+    requires_length=False,
+    requires_string=False,
+    resolvable=True,
+    replace=False,
+    deterministic=True,
+):
+    """Register hash method 'name', used by hashing, `validate_uri` and reversing.
+
+    Example:
+
+        import xxhash
+        register_hash_method("xxh3-64", xxhash.xxh3_64)
+
+    Methods registered at runtime are registered again in spawned worker
+    processes, so their 'factory' must be picklable (eg. not a lambda) to be used
+    with 'workers' or 'jobs'.
+
+    Args:
+        name (str): Name of method, as used in `--method` and hash URIs.
+        factory (callable): If 'supports_update', returns a new hash object with
+            `update(bytes)` and `hexdigest()` (`hexdigest(length)` if
+            'requires_length'), like `hashlib.sha256`. Otherwise, returns the
+            hexadecimal hash of a whole input: `factory(data)`, or
+            `factory(data, length)` if 'requires_length'.
+        supports_update (bool, optional): Whether inputs are fed incrementally.
+            Defaults to True.
+        requires_length (bool, optional): Whether a length is required (eg.
+            `shake-128:64`). Defaults to False.
+        requires_string (bool, optional): Whether input is passed as str instead
+            of UTF-8 bytes. Only without 'supports_update'. Defaults to False.
+        resolvable (bool, optional): Whether the result only depends on the input.
+            Defaults to True.
+        replace (bool, optional): Replace a method already registered as 'name'.
+            Defaults to False.
+        deterministic (bool, optional): Whether hashing the same input twice gives
+            the same result. Results of other methods (eg. `uuid4`) are never read
+            from or written to a `HashCache`. Defaults to True.
+
+    Raises:
+        ValueError: If 'name' is already registered (without 'replace'), or is not
+            a valid method name.
+    """
+    if not name or ":" in name or any(c.isspace() for c in name):
+        raise ValueError(f"Invalid hash method name: {name!r}")
+    if name in hash_types and not replace:
+        raise ValueError(f"Hash method already registered: {name}")
+    if requires_string and supports_update:
+        raise ValueError("Hash methods supporting update() are passed bytes.")
+
+    unregister_hash_method(name)
+    hash_types[name] = HashMethod(
+        name,
+        factory,
+        supports_update,
+        requires_length,
+        requires_string,
+        resolvable,
+        deterministic,
+    )
+    if requires_length:
+        hash_types_requiring_length.add(name)
+    if requires_string:
+        hash_types_requiring_string.add(name)
+    if resolvable:
+        hash_types_resolvable.add(name)
+
+
+def unregister_hash_method(name):
+    """Remove hash method 'name' if registered."""
+    hash_types.pop(name, None)
+    hash_types_requiring_length.discard(name)
+    hash_types_requiring_string.discard(name)
+    hash_types_resolvable.discard(name)
+
+
+def runtime_hash_methods():
+    """Return hash methods registered after import (see `register_hash_methods`)."""
+    return [
+        hash_method
+        for name, hash_method in hash_types.items()
+        if import_hash_methods.get(name) is not hash_method
+    ]
+
+
+def register_hash_methods(methods):
+    """Register 'methods' (`HashMethod`), eg. in a spawned worker process."""
+    for m in methods:
+        register_hash_method(
+            m.name,
+            m.factory,
+            m.supports_update,
+            m.requires_length,
+            m.requires_string,
+            m.resolvable,
+            replace=True,
+            deterministic=m.deterministic,
+        )
 
-hash_type_functions = {
-    "hashlib": lambda method, val_list: hashlib_methods[method](*val_list).hexdigest(),
-    "uuid": lambda method, val_list: uuid_methods[method](*val_list).hex,
-    "manual": lambda method, val_list: manual_methods[method](*val_list),
-}
 
-hash_types = {
-    **{k: hash_type_functions["hashlib"] for k in hashlib_methods.keys()},
-    **{k: hash_type_functions["uuid"] for k in uuid_methods.keys()},
-    **{k: hash_type_functions["manual"] for k in manual_methods.keys()},
+def _register_accelerated():
+    """Register fast non-cryptographic methods of optional libraries if installed.
+
+    `xxhash` provides `xxh64`, `xxh3-64` and `xxh3-128`, `blake3` provides
+    `blake3`. These are much faster than SHA-2 for deduplication, where collision
+    resistance against an attacker is not needed.
+    """
+    try:
+        import xxhash
+    except ImportError:
+        pass
+    else:
+        register_hash_method("xxh64", xxhash.xxh64)
+        register_hash_method("xxh3-64", xxhash.xxh3_64)
+        register_hash_method("xxh3-128", xxhash.xxh3_128)
+
+    try:
+        import blake3
+    except ImportError:
+        pass
+    else:
+        register_hash_method("blake3", blake3.blake3)
+
+
+def _uuid_function(method):
+    """Return function hashing with `uuid_methods[method]` into a hex string."""
+    return lambda *v: uuid_methods[method](*v).hex
+
+
+def _deprecated_hash_function(method, val_list):
+    warnings.warn(
+        "'hash_type_functions' is deprecated, use 'hash_types[method](data, length)'.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return hash_types[method](*val_list)
+
+
+def _entry_points(group):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return []
+    points = entry_points()
+    if hasattr(points, "select"):
+        return points.select(group=group)
+    return points.get(group, [])
+
+
+def _register_plugins():
+    """Register hash methods of installed plugins (see 'entry_point_group')."""
+    for entry_point in _entry_points(entry_point_group):
+        try:
+            entry_point.load()(register_hash_method)
+        except Exception as e:
+            logger.warning(
+                f"Failed to load hash method plugin '{entry_point.name}': {e}"
+            )
+
+
+for name, factory in hashlib_methods.items():
+    register_hash_method(name, factory)
+for name in uuid_methods:
+    register_hash_method(
+        name,
+        _uuid_function(name),
+        supports_update=False,
+        resolvable=False,
+        deterministic=name == "uuid3",
+    )
+register_hash_method(
+    "uuid5", manual_methods["uuid5"], supports_update=False, requires_string=True
+)
+register_hash_method("shake-128", manual_methods["shake-128"], requires_length=True)
+register_hash_method("shake-256", manual_methods["shake-256"], requires_length=True)
+_register_accelerated()
+_register_plugins()
+
+# Methods registered at import, available in every process.
+import_hash_methods = dict(hash_types)
+
+# Deprecated: hash functions by kind of method, called as `function(method,
+# [data, length])`. Every kind now calls `hash_types[method](data, length)`.
+hash_type_functions = {
+    "hashlib": _deprecated_hash_function,
+    "uuid": _deprecated_hash_function,
+    "manual": _deprecated_hash_function,
 }
 
 
 # ----------------------------------------------------------------------------- #
 
 
+def split_method(method):
+    """Split hash method with optional length suffix (eg. 'shake-128:64').
+
+    Args:
+        method (str): Hash method, optionally followed by `:{length}`.
+
+    Returns:
+        tuple: `(method, length)`. 'length' is None if not specified.
+    """
+    if ":" in method:
+        method, length = method.split(":")
+        return method, int(length)
+    return method, None
+
+
+def is_deterministic(method):
+    """Return True if 'method' always gives the same hash of an input.
+
+    Only results of deterministic methods are cached (see `HashCache`).
+    """
+    hash_method = hash_types.get(method)
+    return hash_method == None or hash_method.deterministic
+
+
 def hash_string(s, method="sha256", length=None):
     """Hash a Python string with a given
 
@@ -90,13 +335,8 @@ def hash_string(s, method="sha256", length=None):
     if method not in hash_types:
         raise ValueError(f"Invalid hash method: {method}")
 
-    # Set up method values
-    method_vals = [s]
-    if method in hash_types_requiring_length:
-        method_vals.append(length)
-
     # Calculate hash
-    result = hash_types[method](method, method_vals)
+    result = hash_types[method](s, length)
 
     # If length specified, truncate result (unless already truncated in hash method)
     if length:
@@ -105,3 +345,164 @@ def hash_string(s, method="sha256", length=None):
         result = result[:length]
 
     return result
+
+
+def hash_uri(
+    hash_input, method="sha256", template="{method}:{value}", length=None, cache=None
+):
+    """Hash 'hash_input' and format the result with 'template'.
+
+    Args:
+        hash_input (str): Canonical hash input.
+        method (str, optional): Hash method to use. Defaults to "sha256".
+        template (str, optional): Template string for hash URI.
+            Defaults to "{method}:{value}".
+        length (int, optional): Length of hash result.
+        cache (HashCache, optional): Persistent cache checked before hashing.
+            Not used with methods which are not deterministic. Defaults to None.
+
+    Returns:
+        str: Hash URI.
+    """
+    if cache == None or not is_deterministic(method):
+        return template.format(method=method, value=hash_string(hash_input, method, length))
+
+    key = cache.fingerprint(hash_input, method, template, length)
+    uri = cache.get(key)
+    if uri == None:
+        uri = template.format(method=method, value=hash_string(hash_input, method, length))
+        cache.put(key, uri)
+    return uri
+
+
+def hasher(method):
+    """Return incremental hash object of 'method', or None if not supported.
+
+    Only methods registered with 'supports_update' are hashed with `update()`.
+    Other methods need the whole input at once.
+    """
+    hash_method = hash_types.get(method)
+    if hash_method == None or not hash_method.supports_update:
+        return None
+    return hash_method.factory()
+
+
+def hash_lines(lines, method="sha256", length=None):
+    """Hash sorted canonical lines, feeding them one by one into `update()`.
+
+    The result equals `hash_string` of the joined lines, without joining them:
+    memory is bounded by 'lines' (eg. a buffer of an external sort).
+
+    Args:
+        lines (iterable[bytes]): UTF-8 lines, in canonical (sorted) order.
+        method (str, optional): Hash method to use. Defaults to "sha256".
+        length (int, optional): Length of hash result.
+
+    Raises:
+        ValueError: Hash method specified is not in 'hash_types'
+
+    Returns:
+        tuple: `(value, size)`. Hexadecimal hash, and number of bytes hashed.
+    """
+    hash_object = hasher(method)
+    if hash_object == None:
+        # Method without incremental hashing: join lines.
+        hash_input = b"".join(lines)
+        return hash_string(hash_input.decode("utf-8"), method, length), len(hash_input)
+
+    size = 0
+    update = hash_object.update
+    for line in lines:
+        update(line)
+        size += len(line)
+
+    result = hash_types[method].hexdigest(hash_object, length)
+    if length and method not in hash_types_requiring_length:
+        result = result[:length]
+    return result, size
+
+
+def hash_uri_lines(
+    lines, method="sha256", template="{method}:{value}", length=None, cache=None
+):
+    """Hash sorted canonical lines incrementally, and format result with 'template'.
+
+    Same result as `hash_uri` of the joined lines (see `hash_lines`). With 'cache',
+    the cache key is computed first, and 'lines' is read a second time to hash it
+    only on a miss: 'lines' must then be re-iterable (eg. a list or an
+    `ExternalSorter`).
+
+    Returns:
+        tuple: `(uri, size)`. Hash URI, and number of bytes of 'lines'.
+    """
+    if cache == None or not is_deterministic(method):
+        value, size = hash_lines(lines, method, length)
+        return template.format(method=method, value=value), size
+
+    fingerprint = cache.fingerprinter(method, template, length)
+    size = 0
+    for line in lines:
+        fingerprint.update(line)
+        size += len(line)
+    key = fingerprint.digest()
+    uri = cache.get(key)
+    if uri == None:
+        uri = template.format(method=method, value=hash_lines(lines, method, length)[0])
+        cache.put(key, uri)
+    return uri, size
+
+
+def hash_canonical_lines(
+    lines,
+    method="sha256",
+    template="{method}:{value}",
+    length=None,
+    cache=None,
+    sort_threshold=1000000,
+    stats=stats_module.disabled,
+    lap=None,
+):
+    """Sort canonical lines of a subject as bytes and hash them incrementally.
+
+    Lines are sorted in memory, or with an external merge sort spilling to disk
+    above 'sort_threshold' lines (see `ExternalSorter`). Sorted lines are fed into
+    the hash with `update()` (see `hash_uri_lines`), without joining them: peak
+    memory is one copy of the lines, or a buffer of 'sort_threshold' lines.
+
+    Args:
+        lines (iterable[bytes]): UTF-8 `{predicate} {object}.\n` lines.
+        sort_threshold (int, optional): Lines sorted in memory.
+            Defaults to 1000000.
+        stats (Stats, optional): Collects `canonicalize` and `hash` laps from 'lap'.
+        lap (float, optional): Start of the `canonicalize` lap (see `clock`).
+
+    Returns:
+        str: Hash URI.
+    """
+    with ExternalSorter(sort_threshold, binary=True) as sorter:
+        sorter.extend(lines)
+        if stats.enabled:
+            lap = stats.lap("canonicalize", lap)
+        uri, size = hash_uri_lines(sorter, method, template, length, cache)
+    if stats.enabled:
+        stats.lap("hash", lap)
+        stats.count("bytes_hashed", size)
+    return uri
+
+
+def hash_canonical(lines, method="sha256", length=None):
+    """Hash canonical `{predicate} {object}.\n` lines of a subject.
+
+    Lines are sorted then hashed one by one (see `hash_lines`), so the result does
+    not depend on triple order.
+
+    Args:
+        lines (list[str]): Lines of `{predicate} {object}.\n`. Sorted in place.
+        method (str, optional): Hash method to use. Defaults to "sha256".
+        length (int, optional): Length of hash result.
+
+    Returns:
+        str: Hexadecimal string representation of hash.
+    """
+    lines.sort()
+    return hash_lines((line.encode("utf-8") for line in lines), method, length)[0]
@@ -0,0 +1,37 @@
+import sys
+from collections import defaultdict
+
+
+class ReferenceIndex:
+    """Index of triples referencing selected subjects in the object position.
+
+    Built in a single pass over the graph, so rewriting references to a hashed
+    subject does not need an object-bound `graph.triples((None, None, subject))`
+    lookup per subject.
+    """
+
+    def __init__(self, graph, subjects):
+        """Build index.
+
+        Args:
+            graph (__Graph__): Graph to index.
+            subjects (set): Subjects to index references to.
+        """
+        self.references = defaultdict(list)
+        for triple in graph.triples():
+            if triple[2] in subjects:
+                self.references[triple[2]].append(triple)
+
+    def __len__(self):
+        return sum(len(refs) for refs in self.references.values())
+
+    def pop(self, subject):
+        """Remove and return triples referencing 'subject'."""
+        return self.references.pop(subject, ())
+
+    def memory_size(self):
+        """Approximate size of index in bytes (terms are shared with the graph)."""
+        size = sys.getsizeof(self.references)
+        for refs in self.references.values():
+            size += sys.getsizeof(refs) + sum(sys.getsizeof(t) for t in refs)
+        return size
@@ -0,0 +1,124 @@
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rdfhash.utils.ntriples import mime_line_based
+
+# Line based files larger than this are split into chunks, loaded in parallel.
+chunk_size = 64 * 1024 * 1024
+
+
+def line_chunks(file_path, size=chunk_size):
+    """Yield chunks of about 'size' bytes of 'file_path', split on line boundaries.
+
+    Every chunk ends with a newline.
+    """
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            chunk += f.readline()
+            if not chunk.endswith(b"\n"):
+                chunk += b"\n"
+            yield chunk
+
+
+class BulkLoader:
+    """Load files into a pyoxigraph store with `bulk_load`, in a pool of threads.
+
+    pyoxigraph releases the GIL while loading, so files are loaded concurrently.
+    N-Triples/N-Quads files larger than 'chunk_size' are split on line boundaries
+    and their chunks are loaded concurrently too.
+
+    pyoxigraph scopes blank node labels to each load, so lines of a chunk holding
+    a blank node (any line containing `_:`) are set aside in a temporary file, and
+    loaded together once every chunk of their file is loaded.
+
+    Example:
+
+        with BulkLoader(store, jobs=8) as loader:
+            for path in file_paths:
+                loader.load_file(path, "application/n-triples")
+    """
+
+    def __init__(self, store, jobs=None, chunk_size=chunk_size):
+        """
+        Args:
+            store (pyoxigraph.Store): Store to load into.
+            jobs (int, optional): Number of loading threads.
+                Defaults to None (`os.cpu_count()`).
+            chunk_size (int, optional): Size in bytes of chunks of line based files.
+                Defaults to 64 MiB.
+        """
+        self.store = store
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers=self.jobs)
+        self.pending = set()
+        self.blank_files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type == None:
+                self.join()
+                for blank_file, format, kwargs in self.blank_files:
+                    blank_file.flush()
+                    blank_file.seek(0)
+                    self._submit(self.store.bulk_load, blank_file, format, **kwargs)
+                self.join()
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            for blank_file, _, _ in self.blank_files:
+                blank_file.close()
+
+    def _submit(self, function, *args, **kwargs):
+        # Bound tasks in flight, so only 'jobs' chunks are held in memory.
+        if len(self.pending) >= self.jobs:
+            done, self.pending = wait(self.pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        self.pending.add(self.executor.submit(function, *args, **kwargs))
+
+    def join(self):
+        """Wait for submitted loads, raising the first error."""
+        futures, self.pending = self.pending, set()
+        for future in futures:
+            future.result()
+
+    def load_file(self, file_path, format, to_graph=None):
+        """Submit 'file_path' to be loaded.
+
+        Args:
+            file_path (str): Path of file.
+            format (str): MIME type of file.
+            to_graph (pyoxigraph.NamedNode, optional): Graph to load triples of a
+                triple format into. Defaults to None (default graph).
+        """
+        kwargs = {} if to_graph is None else {"to_graph": to_graph}
+        if (
+            self.jobs == 1
+            or format not in mime_line_based
+            or os.path.getsize(file_path) <= self.chunk_size
+        ):
+            self._submit(self.store.bulk_load, file_path, format, **kwargs)
+            return
+
+        blank_file = tempfile.TemporaryFile(prefix="rdfhash-")
+        lock = threading.Lock()
+        self.blank_files.append((blank_file, format, kwargs))
+        for chunk in line_chunks(file_path, self.chunk_size):
+            self._submit(self._load_chunk, chunk, format, blank_file, lock, kwargs)
+
+    def _load_chunk(self, chunk, format, blank_file, lock, kwargs):
+        if b"_:" in chunk:
+            lines = chunk.splitlines(True)
+            with lock:
+                blank_file.writelines(line for line in lines if b"_:" in line)
+            chunk = b"".join(line for line in lines if b"_:" not in line)
+        self.store.bulk_load(io.BytesIO(chunk), format, **kwargs)
@@ -0,0 +1,102 @@
+import re
+
+mime_line_based = {
+    "application/n-triples",
+    "application/n-quads",
+}
+
+# Single N-Triples term: IRI, blank node label or literal (with datatype/language).
+term_re = (
+    r"<[^>]*>"
+    r'|_:[^\s<"]*[^\s<".]'
+    r'|"(?:[^"\\]|\\.)*"(?:\^\^<[^>]*>|@[A-Za-z]+(?:-[A-Za-z0-9]+)*)?'
+)
+
+statement_re = re.compile(
+    rf"^[ \t]*({term_re})[ \t]*({term_re})[ \t]*({term_re})"
+    rf"(?:[ \t]*({term_re}))?[ \t]*\.[ \t]*(?:#.*)?$"
+)
+
+escape_re = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+
+escape_chars = {
+    "t": "\t",
+    "b": "\b",
+    "n": "\n",
+    "r": "\r",
+    "f": "\f",
+    '"': '"',
+    "'": "'",
+    "\\": "\\",
+}
+
+
+def _unescape_match(match):
+    u4, u8, char = match.groups()
+    if char is not None:
+        return escape_chars.get(char, char)
+    return chr(int(u4 or u8, 16))
+
+
+def unescape(value):
+    """Decode N-Triples escape sequences (`ECHAR` and `UCHAR`) in 'value'."""
+    if "\\" not in value:
+        return value
+    return escape_re.sub(_unescape_match, value)
+
+
+def parse_line(line):
+    """Split a single N-Triples/N-Quads line into its terms.
+
+    Args:
+        line (str): Line of N-Triples or N-Quads.
+
+    Raises:
+        ValueError: If line is not a valid statement.
+
+    Returns:
+        tuple|None: `(subject, predicate, object, graph)` as N-Triples term strings
+            ('graph' is None for triples). None if line is blank or a comment.
+    """
+    stripped = line.strip()
+    if not stripped or stripped[0] == "#":
+        return None
+    match = statement_re.match(stripped)
+    if match == None:
+        raise ValueError(f"Invalid N-Triples/N-Quads statement: {stripped}")
+    return match.groups()
+
+
+def format_line(s, p, o, g=None):
+    """Serialize terms back to a normalized N-Triples/N-Quads line."""
+    if g:
+        return f"{s} {p} {o} {g} .\n"
+    return f"{s} {p} {o} .\n"
+
+
+def is_bnode(term):
+    return term[:2] == "_:"
+
+
+def is_uri(term):
+    return term[:1] == "<"
+
+
+def is_literal(term):
+    return term[:1] == '"'
+
+
+def split_literal(term):
+    """Split N-Triples literal into `(value, datatype, language)`.
+
+    'value' is unescaped. 'datatype' is an N-Triples IRI (`<...>`) or None.
+    """
+    end = term.rindex('"')
+    value = unescape(term[1:end])
+    suffix = term[end + 1 :]
+    if suffix[:2] == "^^":
+        return value, suffix[2:], None
+    if suffix[:1] == "@":
+        return value, None, suffix[1:]
+    return value, None, None
+
@@ -0,0 +1,72 @@
+import logging
+import time
+
+from rdfhash.logger import logger
+
+
+class Progress:
+    """Throttled progress reporter, logging rates and ETA at INFO level.
+
+    At most one line is logged per 'interval' seconds, however often 'update' is
+    called. If INFO is disabled, 'update' only increments counters.
+
+    Example:
+
+        progress = Progress(len(subjects))
+        for s in subjects:
+            ...
+            progress.update(triples=len(triples[s]))
+        progress.done()
+
+    Logs: `Hashed 12000/40000 subjects (30.0%): 5210 subjects/s, 20840 triples/s,
+    ETA 5.4s`.
+    """
+
+    def __init__(self, total=None, label="Hashed", interval=1.0, unit="subjects"):
+        """
+        Args:
+            total (int, optional): Expected number of subjects, used for ETA.
+            label (str, optional): Prefix of each line. Defaults to "Hashed".
+            interval (float, optional): Minimum seconds between lines.
+                Defaults to 1.0.
+            unit (str, optional): Name of counted items. Defaults to "subjects".
+        """
+        self.total = total
+        self.label = label
+        self.unit = unit
+        self.interval = interval
+        self.subjects = 0
+        self.triples = 0
+        self.enabled = logger.isEnabledFor(logging.INFO)
+        self.start = time.monotonic()
+        self.next_report = self.start + interval
+
+    def update(self, subjects=1, triples=0):
+        self.subjects += subjects
+        self.triples += triples
+        if self.enabled:
+            now = time.monotonic()
+            if now >= self.next_report:
+                self.next_report = now + self.interval
+                logger.info(self.message(now))
+
+    def message(self, now=None, done=False):
+        elapsed = max((now or time.monotonic()) - self.start, 1e-9)
+        subject_rate = self.subjects / elapsed
+        message = f"{self.label} {self.subjects}"
+        if done:
+            message += f" {self.unit} in {elapsed:.1f}s"
+        elif self.total:
+            message += f"/{self.total} {self.unit} ({100 * self.subjects / self.total:.1f}%)"
+        else:
+            message += f" {self.unit}"
+        message += (
+            f": {subject_rate:.0f} {self.unit}/s, {self.triples / elapsed:.0f} triples/s"
+        )
+        if self.total and subject_rate > 0 and not done:
+            message += f", ETA {(self.total - self.subjects) / subject_rate:.1f}s"
+        return message
+
+    def done(self):
+        if self.enabled:
+            logger.info(self.message(done=True))
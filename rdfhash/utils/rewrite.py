@@ -0,0 +1,32 @@
+def replace_subjects(graph, hashed_values, triples, index=None):
+    """Replace hashed subjects in 'graph' once every hash is resolved.
+
+    Args:
+        graph (__Graph__): Graph to update.
+        hashed_values (dict): Subject to hashed subject.
+        triples (dict): Subject to list of its triples, as read before hashing.
+        index (ReferenceIndex, optional): References to hashed subjects, built
+            before hashing. Defaults to None (look up references in 'graph').
+    """
+    for subject, hash_subj in hashed_values.items():
+        # Replace triples of subject with hashed subject.
+        for triple in triples[subject]:
+            graph.remove(triple)
+            graph.add(
+                (
+                    hash_subj,
+                    hashed_values.get(triple[1], triple[1]),
+                    hashed_values.get(triple[2], triple[2]),
+                )
+            )
+
+    for subject, hash_subj in hashed_values.items():
+        # Replace instances of subject in the object position.
+        if index == None:
+            references = [*graph.triples((None, None, subject))]
+        else:
+            # Skip references from hashed subjects, already replaced above.
+            references = [t for t in index.pop(subject) if t[0] not in hashed_values]
+        for triple in references:
+            graph.remove(triple)
+            graph.add((triple[0], triple[1], hash_subj))
@@ -0,0 +1,230 @@
+from collections import defaultdict
+
+
+def subject_dependencies(graph, subjects):
+    """Collect triples of 'subjects' and the selected subjects each one references.
+
+    Args:
+        graph (__Graph__): Graph containing 'subjects'.
+        subjects (set): Selected subjects.
+
+    Returns:
+        tuple: `(triples, dependencies)`.
+            'triples' maps each subject with triples to its list of triples.
+            'dependencies' maps each subject to the set of selected subjects found
+            in its predicate or object positions.
+    """
+    triples = {}
+    for s in subjects:
+        subject_triples = [*graph.triples((s, None, None))]
+        if subject_triples:
+            triples[s] = subject_triples
+
+    return triples, triple_dependencies(triples)
+
+
+def triple_dependencies(triples):
+    """Map each subject of 'triples' to the subjects of 'triples' it references.
+
+    Args:
+        triples (dict): Subject to list of its triples.
+
+    Returns:
+        dict: Subject to set of subjects found in its predicate or object positions.
+    """
+    return {
+        s: {t[i] for t in subject_triples for i in (1, 2) if t[i] in triples}
+        for s, subject_triples in triples.items()
+    }
+
+
+def dependency_levels(dependencies, term_to_string=str):
+    """Group subjects into levels that can be hashed once prior levels are done.
+
+    Kahn's algorithm: level 0 holds subjects without dependencies, level N holds
+    subjects whose dependencies are all within levels 0..N-1.
+
+    Args:
+        dependencies (dict): Subject to set of subjects it depends on.
+        term_to_string (callable, optional): Formats terms in error messages.
+
+    Raises:
+        ValueError: If circular dependency is detected between subjects.
+
+    Returns:
+        list[list]: Subjects of each level, in order.
+    """
+    dependents = defaultdict(list)
+    remaining = {}
+    for s, deps in dependencies.items():
+        remaining[s] = len(deps)
+        for d in deps:
+            dependents[d].append(s)
+
+    levels = []
+    level = [s for s, count in remaining.items() if count == 0]
+    resolved = 0
+    while level:
+        levels.append(level)
+        resolved += len(level)
+        next_level = []
+        for s in level:
+            for d in dependents[s]:
+                remaining[d] -= 1
+                if remaining[d] == 0:
+                    next_level.append(d)
+        level = next_level
+
+    if resolved != len(remaining):
+        cyclic = [term_to_string(s) for s, count in remaining.items() if count > 0]
+        raise ValueError(
+            "Unable to resolve hash. Circular dependency detected between: "
+            + ", ".join(cyclic)
+        )
+    return levels
+
+
+def topological_order(roots, dependencies_of, path=None, term_to_string=str):
+    """Yield subjects reachable from 'roots', each after all of its dependencies.
+
+    Depth first search with an explicit stack, so depth is only limited by memory.
+    Each subject is visited once and each dependency checked once: O(V+E).
+    'dependencies_of' is called when a subject is first visited, and the subject is
+    yielded once its dependencies have been yielded (and handled by the caller).
+
+    Args:
+        roots (iterable): Subjects to start from.
+        dependencies_of (callable): Returns the dependencies of a subject.
+        path (set, optional): Subjects considered in progress. Reaching one is a
+            circular dependency. Defaults to None.
+        term_to_string (callable, optional): Formats terms in error messages.
+
+    Raises:
+        ValueError: If circular dependency is detected.
+
+    Yields:
+        Subjects in scheduling order (leaves first).
+    """
+    path = set(path or ())
+    visited = set()
+
+    for root in roots:
+        if root in visited:
+            continue
+        path.add(root)
+        stack = [(root, iter(dependencies_of(root)))]
+
+        while stack:
+            subject, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency in visited:
+                    continue
+                if dependency in path:
+                    raise ValueError(
+                        "Unable to resolve hash. Circular dependency "
+                        f"detected: {term_to_string(subject)} <--> "
+                        f"{term_to_string(dependency)}"
+                    )
+                path.add(dependency)
+                stack.append((dependency, iter(dependencies_of(dependency))))
+                break
+            else:
+                stack.pop()
+                path.discard(subject)
+                visited.add(subject)
+                yield subject
+
+
+def strongly_connected_components(dependencies):
+    """Find strongly connected components of the dependency graph.
+
+    Tarjan's algorithm with an explicit stack, so depth is only limited by memory.
+    Each subject is visited once and each dependency checked once: O(V+E).
+    Components are returned leaves first: a component comes after every component
+    it depends on.
+
+    Args:
+        dependencies (dict): Subject to subjects it depends on. Every dependency
+            must be a key of 'dependencies'.
+
+    Returns:
+        list[list]: Subjects of each component.
+    """
+    index = {}  # Subject to the order it was visited in.
+    lowlink = {}  # Subject to the lowest index reachable from it on 'stack'.
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in dependencies:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(dependencies[root]))]
+
+        while work:
+            subject, deps = work[-1]
+            for dependency in deps:
+                if dependency not in index:
+                    index[dependency] = lowlink[dependency] = len(index)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(dependencies[dependency])))
+                    break
+                if dependency in on_stack:
+                    lowlink[subject] = min(lowlink[subject], index[dependency])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[subject])
+                if lowlink[subject] == index[subject]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == subject:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def is_cyclic(component, dependencies):
+    """Return True if 'component' has a cycle (more than one subject, or a self
+    reference)."""
+    return len(component) > 1 or component[0] in dependencies[component[0]]
+
+
+def component_levels(components, dependencies):
+    """Group 'components' into levels that can be hashed once prior levels are done.
+
+    Args:
+        components (list[list]): Components leaves first
+            (see `strongly_connected_components`).
+        dependencies (dict): Subject to subjects it depends on.
+
+    Returns:
+        list[list[list]]: Components of each level, in order.
+    """
+    component_of = {s: i for i, component in enumerate(components) for s in component}
+    depths = []
+    levels = []
+    for i, component in enumerate(components):
+        depth = max(
+            (
+                depths[component_of[d]] + 1
+                for s in component
+                for d in dependencies[s]
+                if component_of[d] != i
+            ),
+            default=0,
+        )
+        depths.append(depth)
+        if depth == len(levels):
+            levels.append([])
+        levels[depth].append(component)
+    return levels
@@ -0,0 +1,60 @@
+rdf_type = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+selectors = {
+    "bnodes": "All blank node subjects.",
+    "type": "Subjects with 'rdf:type' of any of the given IRIs.",
+    "predicate": "Subjects of triples with any of the given predicate IRIs.",
+}
+
+
+def parse_selector(selector):
+    """Parse a native subject selector: `bnodes`, `type=<IRI>[,<IRI>]` or
+    `predicate=<IRI>[,<IRI>]`.
+
+    Args:
+        selector (str): Selector to parse. Angle brackets around IRIs are optional.
+
+    Raises:
+        ValueError: If selector is not supported, or is missing its IRIs.
+
+    Returns:
+        tuple: `(name, iris)`. 'iris' is an empty list for `bnodes`.
+    """
+    name, _, value = selector.partition("=")
+    name = name.strip()
+    if name not in selectors:
+        raise ValueError(
+            f"Unsupported selector '{selector}'. Supports: "
+            + ", ".join(["bnodes", "type=<IRI>[,<IRI>]", "predicate=<IRI>[,<IRI>]"])
+        )
+    iris = [iri.strip().strip("<>") for iri in value.split(",") if iri.strip()]
+    if name == "bnodes" and iris:
+        raise ValueError(f"Selector 'bnodes' takes no value. Got: {selector}")
+    if name != "bnodes" and not iris:
+        raise ValueError(f"Selector '{name}' requires at least one IRI: {name}=<IRI>")
+    return name, iris
+
+
+def select_subjects(graph, selector):
+    """Yield subjects matching native 'selector', without a SPARQL query.
+
+    `bnodes` is a single scan of the store, `type` and `predicate` are pattern
+    lookups. Subjects may be yielded more than once.
+
+    Args:
+        graph (__Graph__): Graph to select subjects from.
+        selector (str): Selector (see `parse_selector`).
+
+    Yields:
+        Subjects of 'graph'.
+    """
+    name, iris = parse_selector(selector)
+    if name == "bnodes":
+        yield from graph.blank_subjects()
+    elif name == "type":
+        predicate = graph.NamedNode(rdf_type)
+        for iri in iris:
+            yield from graph.pattern_subjects(predicate, graph.NamedNode(iri))
+    else:
+        for iri in iris:
+            yield from graph.pattern_subjects(graph.NamedNode(iri))
@@ -0,0 +1,165 @@
+import heapq
+import struct
+import tempfile
+
+# Length prefix of records in binary run files.
+_record_size = struct.Struct("<Q")
+
+
+class ExternalSorter:
+    """Sort newline terminated strings with bounded memory.
+
+    Lines are buffered until 'max_lines' is reached, then sorted and spilled to a
+    temporary run file. Runs are merged lazily with `heapq.merge`. If all lines fit
+    within 'max_lines', no file is written.
+
+    With 'binary', lines are bytes and may contain newlines themselves: they are
+    spilled as length prefixed records instead of lines.
+
+    Example:
+
+        with ExternalSorter(max_lines=100000) as sorter:
+            for line in lines:
+                sorter.add(line)
+            for line in sorter.sorted():
+                ...
+    """
+
+    def __init__(self, max_lines=500000, tmp_dir=None, binary=False):
+        """Initialize sorter.
+
+        Args:
+            max_lines (int, optional): Lines held in memory before spilling to disk.
+                Defaults to 500000.
+            tmp_dir (str, optional): Directory for temporary run files.
+                Defaults to None (system default).
+            binary (bool, optional): Sort bytes instead of strings.
+                Defaults to False.
+        """
+        self.max_lines = max_lines
+        self.tmp_dir = tmp_dir
+        self.binary = binary
+        self.buffer = []
+        self.runs = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _spill(self):
+        self.buffer.sort()
+        if self.binary:
+            run = tempfile.TemporaryFile(dir=self.tmp_dir)
+            pack = _record_size.pack
+            run.writelines(
+                record for line in self.buffer for record in (pack(len(line)), line)
+            )
+        else:
+            run = tempfile.TemporaryFile(
+                mode="w+", encoding="utf-8", newline="\n", dir=self.tmp_dir
+            )
+            run.writelines(self.buffer)
+        run.seek(0)
+        self.runs.append(run)
+        self.buffer = []
+
+    @staticmethod
+    def _records(run):
+        read = run.read
+        while True:
+            prefix = read(_record_size.size)
+            if not prefix:
+                return
+            yield read(_record_size.unpack(prefix)[0])
+
+    def add(self, line):
+        self.buffer.append(line)
+        self.count += 1
+        if len(self.buffer) >= self.max_lines:
+            self._spill()
+
+    def extend(self, lines):
+        for line in lines:
+            self.add(line)
+
+    def sorted(self):
+        """Yield all added lines in sorted order.
+
+        Can be called again to read the lines again (eg. once for a cache key, once
+        to hash them), but not while a previous call is still being consumed.
+        """
+        if not self.runs:
+            self.buffer.sort()
+            yield from self.buffer
+            return
+        if self.buffer:
+            self._spill()
+        for run in self.runs:
+            run.seek(0)
+        if self.binary:
+            yield from heapq.merge(*(self._records(run) for run in self.runs))
+        else:
+            yield from heapq.merge(*self.runs)
+
+    def __iter__(self):
+        return self.sorted()
+
+    def close(self):
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.buffer = []
+
+
+def external_sort(lines, max_lines=500000, tmp_dir=None, binary=False):
+    """Sort an iterable of newline terminated strings with bounded memory.
+
+    Args:
+        lines (iterable[str]): Lines to sort, each ending with `\\n`.
+        max_lines (int, optional): Lines held in memory before spilling to disk.
+            Defaults to 500000.
+        tmp_dir (str, optional): Directory for temporary run files.
+            Defaults to None (system default).
+        binary (bool, optional): Sort bytes instead (see `ExternalSorter`).
+            Defaults to False.
+
+    Yields:
+        str: Lines in sorted order.
+    """
+    with ExternalSorter(max_lines, tmp_dir, binary) as sorter:
+        sorter.extend(lines)
+        yield from sorter.sorted()
+
+
+def group_sorted(lines, key):
+    """Group consecutive sorted lines by 'key'.
+
+    Yields:
+        tuple: `(key, [line, ...])` for each run of lines sharing the same key.
+    """
+    current_key = None
+    group = []
+    for line in lines:
+        line_key = key(line)
+        if group and line_key != current_key:
+            yield current_key, group
+            group = []
+        current_key = line_key
+        group.append(line)
+    if group:
+        yield current_key, group
+
+
+def unique_sorted(lines):
+    """Drop consecutive duplicates from sorted 'lines'."""
+    previous = None
+    for line in lines:
+        if line != previous:
+            yield line
+        previous = line
@@ -0,0 +1,116 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def clock():
+    """Return current `(wall, cpu)` time in seconds."""
+    return time.perf_counter(), time.process_time()
+
+
+class Stats:
+    """Phase timings and counters collected by `hash_subjects` when passed.
+
+    Phases record wall and CPU seconds, summed over every time a phase runs:
+
+    - `parse`: Parsing input in `get_graph`.
+    - `select`: Running the SPARQL subject selection.
+    - `fetch`: Fetching triples of selected subjects from a SPARQL endpoint.
+    - `index`: Collecting triples and references of selected subjects.
+    - `canonicalize`: Building sorted `{predicate} {object}.` hash inputs.
+    - `hash`: Hashing inputs into hash URIs.
+    - `rewrite`: Replacing hashed subjects in the graph.
+    - `serialize`: Serializing the result (CLI, or `hash_subjects` output).
+
+    Counters include triple and subject counts, 'max_depth' (longest chain of
+    nested selected subjects) and 'bytes_hashed'.
+
+    Example:
+
+        stats = Stats()
+        graph, hashed_values = hash_subjects(data, stats=stats)
+        print(stats.to_dict())
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.counters = {}
+        self.phases = {}
+        self.depths = {}  # Subject to longest chain of nested selected subjects.
+
+    def __getitem__(self, name):
+        return self.counters[name]
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def maximum(self, name, value):
+        if value > self.counters.get(name, 0):
+            self.counters[name] = value
+
+    def depth(self, subject, dependencies):
+        """Record depth of hashed 'subject' from depths of its 'dependencies'."""
+        depth = 1 + max((self.depths.get(d, 0) for d in dependencies), default=0)
+        self.depths[subject] = depth
+        self.maximum("max_depth", depth)
+
+    def add_time(self, name, wall, cpu):
+        phase = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        phase["wall"] += wall
+        phase["cpu"] += cpu
+
+    def lap(self, name, start):
+        """Add time since 'start' (see `clock`) to phase 'name'. Returns now."""
+        now = clock()
+        self.add_time(name, now[0] - start[0], now[1] - start[1])
+        return now
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager adding its wall and CPU time to phase 'name'."""
+        start = clock()
+        try:
+            yield
+        finally:
+            self.lap(name, start)
+
+    def to_dict(self):
+        return {
+            "phases": {name: dict(times) for name, times in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class NullStats(Stats):
+    """Disabled `Stats`: every method is a no-op."""
+
+    enabled = False
+    _phase = nullcontext()
+
+    def count(self, name, value=1):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    def maximum(self, name, value):
+        pass
+
+    def depth(self, subject, dependencies):
+        pass
+
+    def add_time(self, name, wall, cpu):
+        pass
+
+    def lap(self, name, start):
+        return start
+
+    def phase(self, name):
+        return self._phase
+
+
+# Used when no 'stats' is passed.
+disabled = NullStats()
@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from string import Formatter
+
+from rdfhash.utils.hash import hash_types
+
+hex_re = r"[a-f0-9]+"
+
+
+class TemplateMatcher:
+    """Hash URI template compiled once into a matcher.
+
+    Most URIs of a graph are not hash URIs, so they are rejected with cheap
+    checks first: prefix and suffix comparison, then a set lookup of the hash
+    method if the template starts with `{method}` followed by a separator (eg.
+    `{method}:{value}`). Remaining candidates are validated with a regular
+    expression compiled once, checking the digest alphabet.
+
+    Example:
+
+        matcher = TemplateMatcher("urn:{method}:{value}")
+        matcher.match("urn:md5:0cc1...")  # {"method": "md5", "value": "0cc1..."}
+    """
+
+    def __init__(self, template="{method}:{value}", methods=None, value=hex_re):
+        """
+        Args:
+            template (str, optional): Template of hash URIs.
+                Defaults to "{method}:{value}".
+            methods (iterable, optional): Accepted hash methods.
+                Defaults to None (all of 'hash_types').
+            value (str, optional): Regular expression of hash values.
+                Defaults to `[a-f0-9]+`.
+
+        Raises:
+            ValueError: If template contains a field other than 'method' and 'value'.
+        """
+        self.template = template
+        self.methods = frozenset(hash_types if methods == None else methods)
+
+        # Template split into `[literal, field, literal, ..., field, literal]`.
+        parts = [""]
+        for literal, field, _, _ in Formatter().parse(template):
+            parts[-1] += literal
+            if field != None:
+                if field not in ("method", "value"):
+                    raise ValueError(
+                        f"Unsupported field '{field}' in template: {template}"
+                    )
+                parts += [field, ""]
+        self.prefix = parts[0]
+        self.suffix = parts[-1] if len(parts) > 1 else ""
+
+        # Separator following a leading '{method}', used to look up the method.
+        self.method_separator = None
+        if len(parts) > 3 and parts[1] == "method" and parts[2]:
+            if not any(parts[2] in m for m in self.methods):
+                self.method_separator = parts[2]
+
+        regex = ""
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                regex += re.escape(part)
+            elif f"(?P<{part}>" in regex:
+                regex += f"(?P={part})"  # Repeated field must be identical.
+            elif part == "method":
+                if i == 1 and self.method_separator != None:
+                    # Method is looked up in 'methods' before matching.
+                    methods_re = ".+?"
+                else:
+                    methods_re = "|".join(
+                        re.escape(m)
+                        for m in sorted(self.methods, key=len, reverse=True)
+                    )
+                regex += f"(?P<method>{methods_re})"
+            else:
+                regex += f"(?P<value>{value})"
+        self.regex = re.compile(regex)
+
+    def match(self, uri):
+        """Match 'uri' against template.
+
+        Args:
+            uri (str): URI without angle brackets.
+
+        Returns:
+            dict|None: Field values (eg. `{"method": ..., "value": ...}`), or None
+                if 'uri' does not match template.
+        """
+        match = self._match(uri)
+        return None if match == None else match.groupdict()
+
+    def _match(self, uri):
+        if not uri.startswith(self.prefix) or not uri.endswith(self.suffix):
+            return None
+        if self.method_separator != None:
+            method = uri[len(self.prefix) :].partition(self.method_separator)[0]
+            if method not in self.methods:
+                return None
+        return self.regex.fullmatch(uri)
+
+    def __call__(self, uri):
+        return self._match(uri) != None
+
+
+def compile_template(template="{method}:{value}"):
+    """Return `TemplateMatcher` of 'template', accepting all of 'hash_types'.
+
+    Matchers are cached, and compiled again once a hash method is registered (see
+    `register_hash_method`).
+    """
+    return _compile_template(template, frozenset(hash_types))
+
+
+@lru_cache(maxsize=64)
+def _compile_template(template, methods):
+    return TemplateMatcher(template, methods)
@@ -25,4 +25,8 @@ setup(
         "oxrdflib >= 0.3.4",
         "pyoxigraph >= 0.3.16",
     ],
+    extras_require={
+        "xxhash": ["xxhash >= 2.0.0"],
+        "blake3": ["blake3 >= 0.3.0"],
+    },
 )
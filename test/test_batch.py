@@ -0,0 +1,43 @@
+import shutil
+from os import path
+from pathlib import Path
+from glob import glob
+
+import pytest
+
+from rdfhash.batch import hash_directory, output_path
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+ttl_files = glob(path.join(repo_dir, "examples", "*.ttl"))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test__hash_directory(jobs, tmp_path):
+    in_dir = tmp_path / "in"
+    out_dir = tmp_path / "out"
+    (in_dir / "nested").mkdir(parents=True)
+    for file_path in ttl_files:
+        shutil.copy(file_path, in_dir / "nested")
+    (in_dir / "invalid.ttl").write_text("_:a <p:a> .")
+
+    report = hash_directory(str(in_dir), str(out_dir), jobs=jobs)
+
+    assert report["succeeded"] == len(ttl_files)
+    assert report["failed"] == 1
+    assert [r["input"] for r in report["files"] if "error" in r] == [
+        str(in_dir / "invalid.ttl")
+    ]
+
+    for file_path in ttl_files:
+        name = path.splitext(path.basename(file_path))[0]
+        out_path = out_dir / "nested" / f"{name}__sha256.ttl"
+        expected = path.join(repo_dir, "examples", "hashed", f"{name}__sha256.ttl")
+        assert out_path.read_text() == open(expected).read()
+
+
+def test__output_path():
+    assert output_path("in/a/b.nt", "in", "out", "md5") == "out/a/b__md5.ttl"
+    assert (
+        output_path("in/b.ttl", "in", "out", "md5", "application/n-triples")
+        == "out/b__md5.nt"
+    )
@@ -0,0 +1,53 @@
+from os import path
+from pathlib import Path
+from glob import glob
+
+import pytest
+
+from rdfhash import hash_subjects, Stats
+from rdfhash.utils.cache import HashCache
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+ttl_files = (
+    path.relpath(file) for file in glob(path.join(repo_dir, "examples", "*.ttl"))
+)
+
+
+@pytest.mark.parametrize("file_path", ttl_files)
+@pytest.mark.parametrize("options", [{}, {"bulk": True}, {"workers": 2}])
+def test__hash_cache_matches_uncached(file_path, options, tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+    graph, hashed = hash_subjects(file_path, **options)
+
+    for run in range(2):
+        stats = Stats()
+        graph_cached, hashed_cached = hash_subjects(
+            file_path, cache=cache_path, stats=stats, **options
+        )
+        assert set(map(str, hashed.values())) == set(map(str, hashed_cached.values()))
+        assert sorted(
+            graph.serialize(format="application/n-triples").splitlines()
+        ) == sorted(graph_cached.serialize(format="application/n-triples").splitlines())
+        if run == 1:
+            assert stats["cache_misses"] == 0
+            assert stats["cache_hits"] == len(hashed)
+
+
+def test__hash_cache_key():
+    key = HashCache.fingerprint("<p:a> <p:b>.\n", "sha256", "{method}:{value}")
+    assert key != HashCache.fingerprint("<p:a> <p:b>.\n", "md5", "{method}:{value}")
+    assert key != HashCache.fingerprint("<p:a> <p:b>.\n", "sha256", "urn:{value}")
+    assert key != HashCache.fingerprint("<p:a> <p:b>.\n", "sha256", "{method}:{value}", 8)
+
+
+def test__hash_cache_eviction(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+    with HashCache(cache_path, max_entries=2) as cache:
+        for i in range(5):
+            cache.put(cache.fingerprint(str(i), "md5", "{value}"), f"uri:{i}")
+
+    with HashCache(cache_path, max_entries=2) as cache:
+        assert len(cache) == 2
+        assert cache.evicted == 0
+        assert cache.get(cache.fingerprint("4", "md5", "{value}")) == "uri:4"
+        assert cache.hits == 1
@@ -0,0 +1,61 @@
+from os import path
+from pathlib import Path
+
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils.graph import graph_types
+from rdfhash.utils.hash import (
+    hash_lines,
+    hash_string,
+    hash_types_resolvable,
+    hash_uri,
+    hash_uri_lines,
+)
+from rdfhash.utils.sort import ExternalSorter, external_sort
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+experiment = path.join(repo_dir, "examples", "experiment-0.ttl")
+
+lines = [f'<p:member> "{i}\nü"^^<x:s>.\n' for i in range(50)]
+
+
+@pytest.mark.parametrize("method", sorted(hash_types_resolvable))
+def test__hash_lines(method):
+    length = 16 if method.startswith("shake") else None
+    encoded = [line.encode("utf-8") for line in sorted(lines)]
+    value, size = hash_lines(encoded, method, length)
+    assert value == hash_string("".join(sorted(lines)), method, length)
+    assert size == len("".join(lines).encode("utf-8"))
+
+
+def test__hash_uri_lines_cache(tmp_path):
+    template = "{method}:{value}"
+    expected = hash_uri("".join(sorted(lines)), "md5", template)
+    with HashCache(str(tmp_path / "cache.sqlite")) as cache:
+        for _ in range(2):
+            with ExternalSorter(max_lines=7, binary=True) as sorter:
+                sorter.extend(line.encode("utf-8") for line in lines)
+                uri, size = hash_uri_lines(sorter, "md5", template, None, cache)
+            assert uri == expected
+            assert size == len("".join(lines).encode("utf-8"))
+            cache.flush()
+        assert (cache.hits, cache.misses) == (1, 1)
+        key = HashCache.fingerprint("".join(sorted(lines)), "md5", template)
+        assert cache.get(key) == expected
+
+
+def test__external_sort_binary():
+    encoded = [line.encode("utf-8") for line in reversed(lines)]
+    assert list(external_sort(encoded, max_lines=7, binary=True)) == sorted(encoded)
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__sort_threshold(graph_type):
+    expected, expected_values = hash_subjects(experiment, graph_type=graph_type)
+    graph, hashed_values = hash_subjects(
+        experiment, graph_type=graph_type, sort_threshold=2
+    )
+    assert set(hashed_values.values()) == set(expected_values.values())
+    assert len(graph) == len(expected)
@@ -0,0 +1,59 @@
+import gc
+from os import path
+from pathlib import Path
+
+import pyoxigraph
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.utils.graph import OxiGraphDisk
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+experiment = path.join(repo_dir, "examples", "experiment-0.ttl")
+
+
+def test__hash_store_path(tmp_path):
+    store_path = str(tmp_path / "store")
+    graph, hashed_values = hash_subjects(
+        experiment, graph_type="oxigraph", store_path=store_path
+    )
+    expected, _ = hash_subjects(experiment, graph_type="oxigraph")
+    del graph
+
+    assert set(pyoxigraph.Store(store_path)) == set(expected.graph)
+
+
+def test__hash_store_path_unsupported(tmp_path):
+    with pytest.raises(ValueError, match="store_path"):
+        hash_subjects(experiment, graph_type="rdflib", store_path=str(tmp_path))
+
+
+def test__temporary_store_removed():
+    graph, _ = hash_subjects(experiment, graph_type="oxigraph-disk")
+    store_path = graph.store_path
+    assert path.isdir(store_path)
+    graph.close()
+    assert not path.exists(store_path)
+
+    graph, _ = hash_subjects(experiment, graph_type="oxigraph-disk", bulk=True)
+    store_path = graph.store_path
+    del graph
+    gc.collect()
+    assert not path.exists(store_path)
+
+
+def test__rebuild_batches(monkeypatch):
+    rewrites = []
+    rewrite = OxiGraphDisk._rewrite
+    monkeypatch.setattr(OxiGraphDisk, "batch_size", 2)
+    monkeypatch.setattr(
+        OxiGraphDisk,
+        "_rewrite",
+        lambda self, removed, added: rewrites.append(len(added))
+        or rewrite(self, removed, added),
+    )
+    graph, _ = hash_subjects(experiment, graph_type="oxigraph-disk", bulk=True)
+    assert len(rewrites) > 2 and max(rewrites) == 2
+    expected, _ = hash_subjects(experiment, graph_type="oxigraph", bulk=True)
+    assert set(graph.graph) == set(expected.graph)
+    graph.close()
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from rdfhash import hash_subjects, hash_subjects_stream
+from rdfhash.utils.graph import graph_types
+
+xsd = "http://www.w3.org/2001/XMLSchema#"
+
+objects = [
+    f'"01"^^<{xsd}integer>',
+    f'"1"^^<{xsd}boolean>',
+    f'"false"^^<{xsd}boolean>',
+    f'"2020-01-01T00:00:00"^^<{xsd}dateTime>',
+    f'"499.99"^^<{xsd}decimal>',
+    '"x"@EN-us',
+    '"q\\"uote\\u00e9"',
+    "<http://rdfhash.com/o>",
+]
+
+data = "".join(f"_:a <http://rdfhash.com/p> {o} .\n" for o in objects)
+
+
+def test__hash_identical_across_graph_types():
+    hashes = set()
+    for graph_type in graph_types:
+        graph, hashed_values = hash_subjects(
+            data, format="application/n-triples", graph_type=graph_type
+        )
+        hashes.update(graph.term_to_string(v, True) for v in hashed_values.values())
+
+    output = io.StringIO()
+    hash_subjects_stream(io.StringIO(data), output)
+    hashes.add(output.getvalue().split(" ", 1)[0])
+
+    assert len(hashes) == 1
+
+
+# Hashes of `_:a <http://rdfhash.com/p> {object}` after literal normalization. These
+# changed from earlier versions: update README.md when they change again.
+pinned = {
+    f'"2020-01-01T00:00:00"^^<{xsd}dateTime>': (
+        "7cc28f97f8bd13adef5534600cbf9aa5c31a8020b406df607dc7289378e53edf"
+    ),
+    f'"2020-01-01T00:00:00Z"^^<{xsd}dateTime>': (
+        "fec889088ca7a5103eb378e1a7ce7d71169616db69e8bf60f93626e5045f63a6"
+    ),
+    f'"1.0E1"^^<{xsd}double>': (
+        "e9525a37b42133446bfe76862d03a9ae1b4e8a5881a84f74dcd234ad32621c8c"
+    ),
+}
+
+
+@pytest.mark.parametrize("graph_type", [*graph_types, "stream"])
+@pytest.mark.parametrize("object", pinned)
+def test__normalized_literal_hashes(object, graph_type):
+    data = f"_:a <http://rdfhash.com/p> {object} .\n"
+    if graph_type == "stream":
+        output = io.StringIO()
+        hash_subjects_stream(io.StringIO(data), output)
+        hash_subj = output.getvalue().split(" ", 1)[0]
+    else:
+        graph, hashed_values = hash_subjects(
+            data, format="application/n-triples", graph_type=graph_type
+        )
+        hash_subj = graph.term_to_string([*hashed_values.values()][0], True)
+    assert hash_subj == f"<sha256:{pinned[object]}>"
@@ -0,0 +1,173 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs
+
+import pyoxigraph
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.utils.endpoint import SparqlEndpoint
+from rdfhash.utils.graph import graph_types
+
+nt = "application/n-triples"
+rdf_type = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+
+full = "".join(
+    f"<p:person{i}> {rdf_type} <p:Person> .\n"
+    f'<p:person{i}> <p:name> "Person {i}" .\n'
+    f"<p:person{i}> <p:knows> <p:friend{i}> .\n"
+    f"<p:person{i}> <p:address> _:a{i} .\n"
+    f'_:a{i} <p:city> "City {i % 2}" .\n'
+    for i in range(5)
+)
+# Extract holding only the types of people.
+extract = "".join(f"<p:person{i}> {rdf_type} <p:Person> .\n" for i in range(5))
+
+select = """
+SELECT ?s WHERE { { ?s a <p:Person> } UNION { ?x <p:address> ?s } }
+"""
+select_nested = """
+SELECT ?s WHERE { { ?s a <p:Person> } UNION { ?x ?p ?s FILTER (isBlank(?s)) } }
+"""
+
+
+# People with an address nested 3 blank nodes deep.
+nested = "".join(
+    f"<p:person{i}> {rdf_type} <p:Person> .\n"
+    f"<p:person{i}> <p:address> _:a{i} .\n"
+    f'_:a{i} <p:city> "City {i}" .\n'
+    f"_:a{i} <p:geo> _:g{i} .\n"
+    f"_:g{i} <p:point> _:p{i} .\n"
+    f'_:p{i} <p:lat> "{i}" .\n'
+    for i in range(5)
+)
+# Extract holding an outdated address of 'p:person0'.
+extract_nested = (
+    extract
+    + "<p:person0> <p:address> _:x .\n"
+    + '_:x <p:city> "Old City" .\n'
+    + "_:x <p:geo> _:y .\n"
+    + '_:y <p:lat> "-1" .\n'
+)
+
+
+class Endpoint(ThreadingHTTPServer):
+    """Local SPARQL endpoint answering CONSTRUCT queries over 'data'."""
+
+    def __init__(self, data):
+        self.store = pyoxigraph.Store()
+        self.store.load(BytesIO(data.encode("utf-8")), nt)
+        self.requests = 0
+        self.clients = set()
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/query"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        query = parse_qs(body.decode("utf-8"))["query"][0]
+        self.server.requests += 1
+        self.server.clients.add(self.client_address)
+        try:
+            output = BytesIO()
+            pyoxigraph.serialize(self.server.store.query(query), output, nt)
+            status, content = 200, output.getvalue()
+        except SyntaxError as e:
+            status, content = 400, str(e).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", nt)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = Endpoint(full)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__fetch_context(server, graph_type):
+    _, expected = hash_subjects(
+        full, nt, sparql_select_subjects=select, graph_type=graph_type
+    )
+    graph, hashed_values = hash_subjects(
+        extract,
+        nt,
+        sparql_select_subjects=select,
+        graph_type=graph_type,
+        endpoint=server.url,
+    )
+    assert len(hashed_values) == 10
+    assert set(hashed_values.values()) == set(expected.values())
+    assert server.requests == 1
+
+
+@pytest.fixture
+def server_nested():
+    server = Endpoint(nested)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__fetch_nested_blank_nodes(server_nested, graph_type):
+    graph_full, expected = hash_subjects(
+        nested, nt, sparql_select_subjects=select_nested, graph_type=graph_type
+    )
+    graph, hashed_values = hash_subjects(
+        extract_nested,
+        nt,
+        sparql_select_subjects=select_nested,
+        graph_type=graph_type,
+        endpoint=server_nested.url,
+    )
+    assert len(hashed_values) == 20
+    assert set(hashed_values.values()) == set(expected.values())
+    # The outdated address of the extract is replaced.
+    assert len(graph) == len(graph_full)
+    assert "Old City" not in graph.serialize(format=nt)
+    # Depth 1, then 2, then 4.
+    assert server_nested.requests == 3
+
+
+def test__batches(server):
+    with SparqlEndpoint(server.url, batch_size=2, concurrency=2) as endpoint:
+        _, first = hash_subjects(
+            extract, nt, sparql_select_subjects=select, endpoint=endpoint
+        )
+        assert endpoint.requests == server.requests == 3
+        assert len(server.clients) <= 2
+
+        _, second = hash_subjects(
+            extract, nt, sparql_select_subjects=select, endpoint=endpoint
+        )
+        assert endpoint.stats()["endpoint_cache_hits"] == 3
+        assert server.requests == 3
+    assert set(first.values()) == set(second.values())
+
+
+def test__endpoint_error(server):
+    with SparqlEndpoint(server.url) as endpoint:
+        with pytest.raises(ValueError, match="HTTP 400"):
+            endpoint.construct("CONSTRUCT {")
+    with pytest.raises(ValueError, match="Invalid SPARQL endpoint URL"):
+        SparqlEndpoint("ftp://example.com/sparql")
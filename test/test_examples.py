@@ -13,7 +13,7 @@ from rdfhash.utils.hash import (
     hash_types_requiring_length,
     hash_types_resolvable,
 )
-from rdfhash.utils.graph import graph_types
+from rdfhash.utils.graph import OxRdfLibGraph, graph_types
 from utils import compare_graphs, graph_diff
 
 repo_dir = path.dirname(Path(__file__).parent.absolute())
@@ -32,11 +32,15 @@ for i in range(0, len(resolvable_hash_methods)):
 @pytest.mark.parametrize("hash_method", ["sha256"])
 @pytest.mark.parametrize("graph_type", list(graph_types.keys()))
 # @pytest.mark.parametrize("graph_type", ["oxrdflib"])
-def test__hash_examples(file_path, hash_method, graph_type, force_write=False):
+@pytest.mark.parametrize(
+    "options", [{}, {"bulk": True}, {"reference_index": False}], ids=str
+)
+def test__hash_examples(file_path, hash_method, graph_type, options, force_write=False):
     """Hash file and compare against hash file.
 
     Args:
         graph_type (str): Graph type to use.
+        options (dict): Keyword arguments passed to 'rdfhash'.
         force_write (bool, optional): If True, forces writing hash
             result to file './examples/hashed'. Defaults to True.
     """
@@ -50,7 +54,7 @@ def test__hash_examples(file_path, hash_method, graph_type, force_write=False):
 
     # Generate hash of blank nodes in example file.
     graph, replaced_subjects = rdfhash(
-        file_path, method=hash_method, graph_type=graph_type
+        file_path, method=hash_method, graph_type=graph_type, **options
     )
 
     graph_actual = (
@@ -112,3 +116,18 @@ def test__hash_examples(file_path, hash_method, graph_type, force_write=False):
 
 # def test__reverse_example(file_path, template="{method}:{value}"):
 #     graph_generated = reverse_hash_subjects(file_path, )
+
+
+@pytest.mark.parametrize("options", [{}, {"bulk": True}], ids=str)
+def test__oxrdflib_without_inner_store(options, monkeypatch):
+    """oxrdflib graphs fall back to the rdflib API without oxrdflib's store."""
+    file_path = path.join(repo_dir, "examples", "experiment-0.ttl")
+    graph, expected = rdfhash(file_path, graph_type="oxrdflib", **options)
+
+    monkeypatch.setattr(OxRdfLibGraph, "_ox_store", lambda self: None)
+    graph_fallback, hashed_values = rdfhash(file_path, graph_type="oxrdflib", **options)
+
+    assert set(hashed_values.values()) == set(expected.values())
+    assert sorted(
+        graph_fallback.serialize(format="application/n-quads").splitlines()
+    ) == sorted(graph.serialize(format="application/n-quads").splitlines())
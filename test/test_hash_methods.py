@@ -0,0 +1,123 @@
+import itertools
+import zlib
+
+import pytest
+
+from rdfhash import hash_subjects, reverse_hash_subjects
+from rdfhash.utils import validate_uri
+from rdfhash.utils.cache import HashCache
+from rdfhash.utils.hash import (
+    hash_string,
+    hash_type_functions,
+    hash_types,
+    is_deterministic,
+    register_hash_method,
+    unregister_hash_method,
+    uuid_methods,
+)
+
+data = "".join(f'<p:root> <p:has> _:b{i} .\n_:b{i} <p:value> "{i}" .\n' for i in range(9))
+
+
+class Crc32:
+    """Incremental CRC-32, a fast non-cryptographic checksum."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+
+def adler32(data):
+    return f"{zlib.adler32(data):08x}"
+
+
+@pytest.fixture
+def methods():
+    register_hash_method("crc32", Crc32)
+    register_hash_method("adler32", adler32, supports_update=False)
+    yield
+    unregister_hash_method("crc32")
+    unregister_hash_method("adler32")
+
+
+@pytest.mark.parametrize("method", ["crc32", "adler32"])
+@pytest.mark.parametrize("workers", [None, 2])
+def test__registered_method(methods, method, workers):
+    graph, hashed_values = hash_subjects(
+        data, "application/n-triples", method, graph_type="oxigraph", workers=workers
+    )
+    expected = {
+        f"{method}:{hash_string(f'<p:value> {v}.{chr(10)}', method)}"
+        for v in [f'"{i}"^^<http://www.w3.org/2001/XMLSchema#string>' for i in range(9)]
+    }
+    assert {v.value for v in hashed_values.values()} == expected
+    assert all(validate_uri(uri) for uri in expected)
+
+    reversed_graph = reverse_hash_subjects(
+        graph.serialize(format="application/n-triples"),
+        "application/n-triples",
+        graph_type="oxigraph",
+    )
+    assert not any(
+        validate_uri(term.value)
+        for quad in reversed_graph.graph
+        for term in quad.triple
+        if hasattr(term, "value")
+    )
+
+
+def test__unregistered_method():
+    assert not validate_uri("crc32:0000abcd")
+    with pytest.raises(ValueError, match="Invalid hash method"):
+        hash_string("x", "crc32")
+
+
+def test__register_invalid(methods):
+    with pytest.raises(ValueError, match="already registered"):
+        register_hash_method("crc32", Crc32)
+    with pytest.raises(ValueError, match="Invalid hash method name"):
+        register_hash_method("crc:32", Crc32)
+    register_hash_method("crc32", Crc32, replace=True)
+    assert hash_types["crc32"].factory is Crc32
+
+
+counter = itertools.count()
+
+
+def counted(data):
+    return f"{next(counter):08x}"
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test__non_deterministic_not_cached(tmp_path, workers):
+    register_hash_method("counted", counted, supports_update=False, deterministic=False)
+    try:
+        with HashCache(str(tmp_path / "cache.sqlite")) as cache:
+            for _ in range(2):
+                hash_subjects(
+                    data,
+                    "application/n-triples",
+                    "counted",
+                    workers=workers,
+                    cache=cache,
+                )
+            assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+    finally:
+        unregister_hash_method("counted")
+    assert not is_deterministic("uuid4")
+    assert is_deterministic("sha256")
+
+
+def test__deprecated_hash_type_functions():
+    assert uuid_methods["uuid4"]().version == 4
+    with pytest.deprecated_call():
+        value = hash_type_functions["hashlib"]("sha256", [b"x"])
+    assert value == hash_string("x", "sha256")
+    with pytest.deprecated_call():
+        value = hash_type_functions["manual"]("shake-128", [b"x", 8])
+    assert value == hash_string("x", "shake-128", 8)
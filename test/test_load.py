@@ -0,0 +1,52 @@
+import pyoxigraph
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.utils.graph import graph_types
+from rdfhash.utils.load import BulkLoader, line_chunks
+
+nt = "application/n-triples"
+
+
+def chain(name, length=20):
+    return (
+        f"<p:{name}> <p:has> _:b0 .\n"
+        + "".join(f"_:b{i} <p:next> _:b{i + 1} .\n" for i in range(length))
+        + f'_:b{length} <p:value> "{name}" .\n'
+        + "".join(f'<p:{name}{i}> <p:value> "{i}" .\n' for i in range(length))
+    )
+
+
+def test__line_chunks(tmp_path):
+    path = tmp_path / "data.nt"
+    path.write_text(chain("a"))
+    chunks = list(line_chunks(str(path), 64))
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert b"".join(chunks) == path.read_bytes()
+
+
+def test__bulk_loader_chunks(tmp_path):
+    path = tmp_path / "data.nt"
+    path.write_text(chain("a"))
+
+    store = pyoxigraph.Store()
+    with BulkLoader(store, jobs=3, chunk_size=64) as loader:
+        loader.load_file(str(path), nt)
+
+    expected, _ = hash_subjects(str(path), nt, graph_type="oxigraph")
+    graph, _ = hash_subjects(store, nt)
+    assert set(graph.graph) == set(expected.graph)
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__parse_jobs(graph_type, tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        paths.append(str(tmp_path / f"{name}.nt"))
+        (tmp_path / f"{name}.nt").write_text(chain(name))
+
+    expected, _ = hash_subjects(paths, nt, graph_type=graph_type, parse_jobs=1)
+    graph, _ = hash_subjects(paths, nt, graph_type=graph_type, parse_jobs=3)
+    assert len(graph) == len(expected) == 3 * 42
+    assert set(graph.triples()) == set(expected.triples())
@@ -0,0 +1,56 @@
+from os import path
+from pathlib import Path
+
+import pyoxigraph
+
+from rdfhash import hash_subjects, merge_subjects
+from rdfhash.cli import cli
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+experiment = path.join(repo_dir, "examples", "experiment-0.ttl")
+
+batch_1 = """
+_:a <p:name> "John" ; <p:address> _:b .
+_:b <p:city> "Denver" .
+"""
+
+# Same address as 'batch_1', new contact.
+batch_2 = """
+_:c <p:name> "Jane" ; <p:address> _:d .
+_:d <p:city> "Denver" .
+<p:list> <p:item> _:c .
+"""
+
+
+def test__merge_subjects(tmp_path):
+    store_path = str(tmp_path / "store")
+
+    report = merge_subjects(store_path, batch_1, "text/turtle")
+    assert report["subjects_new"] == 2
+    assert report["subjects_deduplicated"] == 0
+
+    report = merge_subjects(store_path, batch_2, "text/turtle")
+    assert report["subjects_new"] == 1
+    assert report["subjects_deduplicated"] == 1
+    assert report["triples_skipped"] == 1
+    assert report["triples_inserted"] == 3
+
+    store = pyoxigraph.Store(store_path)
+    graph, _ = hash_subjects(batch_1 + batch_2, "text/turtle", graph_type="oxigraph")
+    assert set(store) == set(graph.graph)
+
+
+def test__merge_subjects_again(tmp_path):
+    store = pyoxigraph.Store(str(tmp_path / "store"))
+    merge_subjects(store, experiment)
+    size = len(store)
+
+    report = merge_subjects(store, experiment)
+    assert report["subjects_new"] == 0
+    assert report["subjects_deduplicated"] == report["subjects_hashed"] > 0
+    assert len(store) == size
+
+
+def test__merge_cli(tmp_path, capsys):
+    cli(["merge", str(tmp_path / "store"), experiment])
+    assert "deduplicated" in capsys.readouterr().out
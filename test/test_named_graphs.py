@@ -0,0 +1,132 @@
+from os import path
+from pathlib import Path
+
+import pytest
+from rdflib import ConjunctiveGraph, Literal, URIRef
+
+from rdfhash import hash_subjects
+import rdfhash.parallel
+from rdfhash.utils.encode import encode_term
+from rdfhash.utils.graph import get_graph, graph_types
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+experiment = path.join(repo_dir, "examples", "experiment-0.ttl")
+
+# '_:b' has different triples in each graph, '_:d' has the triples of '_:b' in 'g:1'.
+data = """_:a <p:a> _:b <g:1> .
+_:b <p:b> "x" <g:1> .
+_:b <p:b> "y" <g:2> .
+_:c <p:b> "y" .
+_:d <p:b> "x" <g:3> .
+"""
+
+hash_x = "sha256:f81fbc07223744bc14732f175c7b1f715776e1b75bce66ed00918f4d1732be9c"
+hash_y = "sha256:d29344b31f0f726942c596771cfeacea53c359587d823683613c77fe10719918"
+# Hash of '<p:s>' from its triples in two files.
+hash_split = "sha256:f72c2954d10766069a5059264fab20b56fe9f9c9e1297672dd1b153e564368ce"
+hash_a = "sha256:15b104c8e73c046de2eaf40dd9eb675f31e8df2d6d10efd53f5a4d8576b2b155"
+
+expected = {
+    (f"<{hash_a}>", "<p:a>", f"<{hash_x}>", "<g:1>"),
+    (f"<{hash_x}>", "<p:b>", encode_term(Literal("x")), "<g:1>"),
+    (f"<{hash_y}>", "<p:b>", encode_term(Literal("y")), "<g:2>"),
+    (f"<{hash_y}>", "<p:b>", encode_term(Literal("y")), None),
+    (f"<{hash_x}>", "<p:b>", encode_term(Literal("x")), "<g:3>"),
+}
+
+
+def quads(graph):
+    dataset = ConjunctiveGraph()
+    dataset.parse(
+        data=graph.serialize(format="application/n-quads"), format="nquads"
+    )
+    return {
+        (
+            *map(encode_term, (s, p, o)),
+            encode_term(ctx.identifier) if type(ctx.identifier) == URIRef else None,
+        )
+        for s, p, o, ctx in dataset.quads((None, None, None, None))
+    }
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__hash_named_graphs(graph_type, workers):
+    graph, hashed_values = hash_subjects(
+        data, "application/n-quads", graph_type=graph_type, workers=workers
+    )
+    assert quads(graph) == expected
+    assert sorted(
+        ("" if name is None else encode_term(name), encode_term(hash_subj))
+        for (name, s), hash_subj in hashed_values.items()
+    ) == sorted(
+        [
+            ("", f"<{hash_y}>"),
+            ("<g:1>", f"<{hash_a}>"),
+            ("<g:1>", f"<{hash_x}>"),
+            ("<g:2>", f"<{hash_y}>"),
+            ("<g:3>", f"<{hash_x}>"),
+        ]
+    )
+
+
+def test__hash_named_graphs_parallel(monkeypatch):
+    # Send each graph to the process pool.
+    monkeypatch.setattr(rdfhash.parallel, "min_chunk_size", 1)
+    data = "".join(
+        f'_:a{i} <p:a> _:b{i} <g:{i}> .\n_:b{i} <p:b> "{i % 3}" <g:{i}> .\n'
+        for i in range(20)
+    )
+    graph_serial, _ = hash_subjects(data, "application/n-quads", graph_type="oxigraph")
+    graph_parallel, _ = hash_subjects(
+        data, "application/n-quads", graph_type="oxigraph", workers=2
+    )
+    assert quads(graph_serial) == quads(graph_parallel)
+    assert len({q[0] for q in quads(graph_parallel)}) == 6
+
+
+def test__hash_named_graphs_circular():
+    data = "_:a <p:to> _:b <g:1> .\n_:b <p:to> _:a <g:1> .\n_:a <p:to> _:a <g:2> .\n"
+    graph, hashed_values = hash_subjects(data, "application/n-quads")
+    assert len(set(hashed_values.values())) == 3
+    assert {q[3] for q in quads(graph)} == {"<g:1>", "<g:2>"}
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__file_contexts_not_named(graph_type):
+    # rdflib parses each file into its own context, which is not a named graph.
+    graph, hashed_values = hash_subjects(experiment, graph_type=graph_type)
+    assert not graph.has_named_graphs()
+    assert not any(type(key) == tuple for key in hashed_values)
+
+
+@pytest.mark.parametrize("ext", ["ttl", "nt"])
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__subject_split_across_files(graph_type, ext, tmp_path):
+    (tmp_path / f"a.{ext}").write_text('<p:s> <p:a> "1" .\n')
+    (tmp_path / f"b.{ext}").write_text('<p:s> <p:b> "2" .\n')
+    graph, hashed_values = hash_subjects(
+        [str(tmp_path / f"a.{ext}"), str(tmp_path / f"b.{ext}")],
+        sparql_select_subjects="SELECT ?s { ?s <p:a> ?o }",
+        graph_type=graph_type,
+    )
+    assert [encode_term(v) for v in hashed_values.values()] == [f"<{hash_split}>"]
+    # Triples of the files are written to the default graph.
+    assert len(quads(graph)) == 2
+    assert not any(q[3] for q in quads(graph))
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__serialize_nquads(graph_type):
+    graph = get_graph(
+        "<p:s> <p:a> <p:o> .\n<g:1> { <p:s> <p:b> <p:o> . }",
+        "application/trig",
+        graph_type,
+    )
+    assert quads(graph) == {
+        ("<p:s>", "<p:a>", "<p:o>", None),
+        ("<p:s>", "<p:b>", "<p:o>", "<g:1>"),
+    }
+    graph = get_graph(experiment, None, graph_type)
+    assert len(quads(graph)) == len(graph)
+    assert not any(q[3] for q in quads(graph))
@@ -0,0 +1,77 @@
+import io
+
+import pyoxigraph
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.cli import cli
+from rdfhash.utils.graph import get_graph, graph_types
+
+# Two identical blank nodes in each graph: their rewritten quads collapse.
+data = (
+    '<p:root> <p:has> _:a .\n_:a <p:value> "x" .\n'
+    '<p:root> <p:has> _:b .\n_:b <p:value> "x" .\n'
+    '<p:root> <p:has> _:c <g:1> .\n_:c <p:value> "x" <g:1> .\n'
+    '<p:root> <p:has> _:d <g:1> .\n_:d <p:value> "x" <g:1> .\n'
+)
+nq = "application/n-quads"
+
+
+def quads(data, format=nq):
+    return set(pyoxigraph.parse(io.BytesIO(data), format))
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__output_streamed(graph_type):
+    expected, _ = hash_subjects(data, nq, graph_type="oxigraph")
+
+    output = io.BytesIO()
+    graph, hashed_values = hash_subjects(
+        data, nq, graph_type=graph_type, output=output, accept=nq
+    )
+
+    assert output.getvalue().count(b"\n") == 4
+    assert quads(output.getvalue()) == set(expected.graph)
+    assert len(hashed_values) == 4
+    # Graph is not rewritten.
+    assert len(graph) == 8
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__output_ntriples(graph_type):
+    data_nt = "".join(line for line in data.splitlines(True) if "<g:1>" not in line)
+    expected, _ = hash_subjects(data_nt, "application/n-triples", graph_type="oxigraph")
+
+    output = io.BytesIO()
+    hash_subjects(
+        data_nt,
+        "application/n-triples",
+        graph_type=graph_type,
+        output=output,
+        accept="application/n-triples",
+    )
+    assert quads(output.getvalue(), "application/n-triples") == {
+        q.triple for q in expected.graph
+    }
+
+
+def test__write_mapped_format():
+    graph = get_graph(data, nq, "oxigraph")
+    with pytest.raises(ValueError, match="n-quads"):
+        graph.write_mapped(io.BytesIO(), "text/turtle", {})
+
+
+def test__cli_output(tmp_path, capsys):
+    input_path = tmp_path / "input.nq"
+    input_path.write_text(data)
+    output_path = tmp_path / "output.trig"
+
+    options = [str(input_path), "-f", "nq", "-g", "oxigraph"]
+    cli(options + ["-a", "trig", "-o", str(output_path)])
+    cli(options + ["-a", "nq"])
+
+    assert capsys.readouterr().out.count("\n") == 4
+    expected, _ = hash_subjects(data, nq, graph_type="oxigraph")
+    assert set(pyoxigraph.parse(str(output_path), "application/trig")) == set(
+        expected.graph
+    )
@@ -0,0 +1,41 @@
+from os import path
+from pathlib import Path
+from glob import glob
+
+import pytest
+
+from rdfhash import hash_subjects
+import rdfhash.parallel
+from rdfhash.utils.graph import graph_types
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+ttl_files = (
+    path.relpath(file) for file in glob(path.join(repo_dir, "examples", "*.ttl"))
+)
+
+
+@pytest.mark.parametrize("file_path", ttl_files)
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__hash_parallel_matches_serial(file_path, graph_type, monkeypatch):
+    # Send every level to the process pool, however small.
+    monkeypatch.setattr(rdfhash.parallel, "min_chunk_size", 1)
+
+    graph_serial, hashed_serial = hash_subjects(file_path, graph_type=graph_type)
+    graph_parallel, hashed_parallel = hash_subjects(
+        file_path, graph_type=graph_type, workers=2, sort_threshold=2
+    )
+
+    assert set(map(str, hashed_serial.values())) == set(
+        map(str, hashed_parallel.values())
+    )
+    assert sorted(
+        graph_serial.serialize(format="application/n-triples").splitlines()
+    ) == sorted(graph_parallel.serialize(format="application/n-triples").splitlines())
+
+
+def test__hash_parallel_circular():
+    data = "_:a <p:to> _:b . _:b <p:to> _:a ; <p:v> 1 . _:c <p:to> _:a ."
+    _, hashed_serial = hash_subjects(data)
+    _, hashed_parallel = hash_subjects(data, workers=2)
+    assert len(set(hashed_parallel.values())) == 3
+    assert set(hashed_serial.values()) == set(hashed_parallel.values())
@@ -0,0 +1,40 @@
+import logging
+
+from rdfhash.logger import logger
+from rdfhash.utils.progress import Progress
+
+
+def test__progress_throttled(caplog, monkeypatch):
+    monkeypatch.setattr(logger, "propagate", True)
+    caplog.set_level(logging.INFO, logger="rdfhash")
+
+    progress = Progress(total=100, interval=3600)
+    for _ in range(100):
+        progress.update(triples=5)
+    progress.done()
+
+    messages = [r.getMessage() for r in caplog.records if r.name == "rdfhash"]
+    assert len(messages) == 1
+    assert messages[0].startswith("Hashed 100 subjects in ")
+    assert progress.triples == 500
+
+
+def test__progress_message():
+    progress = Progress(total=10, interval=0)
+    progress.update(5, 20)
+    message = progress.message(progress.start + 1)
+    assert message == (
+        "Hashed 5/10 subjects (50.0%): 5 subjects/s, 20 triples/s, ETA 1.0s"
+    )
+
+
+def test__progress_disabled():
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        progress = Progress(total=10, interval=0)
+    finally:
+        logger.setLevel(level)
+    assert not progress.enabled
+    progress.update()
+    assert progress.subjects == 1
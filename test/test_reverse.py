@@ -0,0 +1,58 @@
+import io
+from os import path
+from pathlib import Path
+from glob import glob
+
+import pytest
+from rdflib import Graph
+
+from rdfhash import reverse_hash_subjects, reverse_hash_subjects_stream
+from rdfhash.utils import validate_uri
+from rdfhash.utils.graph import graph_types
+from rdfhash.utils.template import TemplateMatcher
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+hashed_files = glob(path.join(repo_dir, "examples", "hashed", "*.ttl"))
+
+sha256 = "f3cfc44d97472f0a474c286bdcc23ec0ac64835cf0eed2b9e41a6624b852db76"
+
+
+@pytest.mark.parametrize(
+    "template, uri, fields",
+    [
+        ("{method}:{value}", f"sha256:{sha256}", {"method": "sha256", "value": sha256}),
+        ("{method}:{value}", f"sha256:{sha256}/x", None),
+        ("{method}:{value}", "sha256:ABC", None),
+        ("{method}:{value}", "sha9:abc", None),
+        ("{method}:{value}", "http://example.com/a", None),
+        ("urn:{method}/{value}", "urn:sha3-256/abc", {"method": "sha3-256", "value": "abc"}),
+        ("http://x.com/{value}#{method}", "http://x.com/abc#md5", {"value": "abc", "method": "md5"}),
+        ("{value}{method}", "abcmd5", {"value": "abc", "method": "md5"}),
+    ],
+)
+def test__template_matcher(template, uri, fields):
+    assert TemplateMatcher(template).match(uri) == fields
+    assert validate_uri(uri, template) == (fields != None)
+
+
+def test__template_matcher_invalid_field():
+    with pytest.raises(ValueError, match="Unsupported field"):
+        TemplateMatcher("{method}:{hash}")
+
+
+@pytest.mark.parametrize("file_path", hashed_files)
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__reverse_stream_matches_graph(file_path, graph_type):
+    data = Graph().parse(file_path).serialize(format="nt")
+
+    graph = reverse_hash_subjects(data, "application/n-triples", graph_type=graph_type)
+    output = io.StringIO()
+    reverse_hash_subjects_stream(io.StringIO(data), output, "application/n-triples")
+
+    expected = Graph().parse(
+        data=graph.serialize(format="application/n-triples"), format="nt"
+    )
+    streamed = Graph().parse(data=output.getvalue(), format="nt")
+    assert len(streamed) == len(Graph().parse(data=data, format="nt"))
+    assert expected.isomorphic(streamed)
+    assert not any(str(t).startswith("sha256:") for triple in streamed for t in triple)
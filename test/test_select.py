@@ -0,0 +1,77 @@
+from os import path
+from pathlib import Path
+
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.utils.graph import get_graph, graph_types
+from rdfhash.utils.select import parse_selector, select_subjects
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+experiment = path.join(repo_dir, "examples", "experiment-0.ttl")
+
+ns = "http://rdfhash.com/ontology/"
+
+sparql_selectors = [
+    ("bnodes", "SELECT DISTINCT ?s { ?s ?p ?o . FILTER (isBlank(?s)) }"),
+    (
+        f"type=<{ns}Sample>,{ns}CompositionPart",
+        f"SELECT DISTINCT ?s {{ ?s a ?t . VALUES ?t {{ <{ns}Sample> <{ns}CompositionPart> }} }}",
+    ),
+    (f"predicate={ns}substance", f"SELECT DISTINCT ?s {{ ?s <{ns}substance> ?o }}"),
+]
+
+
+@pytest.mark.parametrize(
+    "selector, parsed",
+    [
+        ("bnodes", ("bnodes", [])),
+        ("type=<p:A>, p:B", ("type", ["p:A", "p:B"])),
+        ("predicate=p:a", ("predicate", ["p:a"])),
+    ],
+)
+def test__parse_selector(selector, parsed):
+    assert parse_selector(selector) == parsed
+
+
+@pytest.mark.parametrize("selector", ["uris", "type=", "bnodes=p:a"])
+def test__parse_selector_invalid(selector):
+    with pytest.raises(ValueError):
+        parse_selector(selector)
+
+
+@pytest.mark.parametrize("selector, sparql", sparql_selectors)
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__select_matches_sparql(selector, sparql, graph_type):
+    graph = get_graph(experiment, None, graph_type)
+    expected = {row[0] for row in graph.query(sparql)}
+    assert expected
+    assert set(select_subjects(graph, selector)) == expected
+
+    graph_select, hashed_select = hash_subjects(
+        experiment, graph_type=graph_type, select=selector
+    )
+    graph_sparql, hashed_sparql = hash_subjects(
+        experiment, graph_type=graph_type, sparql_select_subjects=sparql
+    )
+    assert set(map(str, hashed_select.values())) == set(
+        map(str, hashed_sparql.values())
+    )
+
+
+def test__select_exclusive():
+    with pytest.raises(ValueError, match="exclusive"):
+        hash_subjects(experiment, select="bnodes", sparql_select_subjects="SELECT")
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+def test__query_subjects(graph_type):
+    graph = get_graph(experiment, None, graph_type)
+    # Prefix ':' is only declared in the data.
+    query = "SELECT ?s ?o { ?s :hasObservation ?o }"
+    if graph_type.startswith("oxigraph"):
+        query = f"PREFIX : <{ns}> " + query
+    terms = set(graph.query_subjects(query))
+    assert len(terms) == 4
+    if graph_type == "oxrdflib":
+        assert terms == {term for row in graph.graph.query(query) for term in row}
@@ -0,0 +1,128 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from rdfhash import hash_subjects
+from rdfhash.serve import HashServer, request_options
+
+nt = "application/n-triples"
+
+data = "".join(
+    f'<p:root> <p:has> _:b{i} .\n_:b{i} <p:value> "{i}" .\n' for i in range(9)
+)
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def connect(server):
+    if server.socket_path != None:
+        return UnixConnection(server.socket_path)
+    return http.client.HTTPConnection(*server.server.server_address[:2])
+
+
+def request(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body, headers or {})
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def run(**options):
+    server = HashServer(("127.0.0.1", 0), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def server():
+    server = run()
+    yield server
+    server.shutdown()
+    server.close()
+
+
+def expected(**options):
+    graph, _ = hash_subjects(data, nt, graph_type="oxigraph", **options)
+    return set(graph.serialize(format=nt).splitlines())
+
+
+def test__hash(server):
+    connection = connect(server)
+    for method in ("md5", "sha1"):
+        response, body = request(
+            connection,
+            "POST",
+            f"/hash?method={method}&accept=nt&graph=oxigraph",
+            data,
+            {"Content-Type": nt},
+        )
+        assert response.status == 200
+        assert response.getheader("Content-Type") == nt
+        assert response.getheader("X-Subjects-Hashed") == "9"
+        assert set(body.decode("utf-8").splitlines()) == expected(method=method)
+
+    response, body = request(
+        connection, "POST", "/hash?format=nt&accept=nt&reverse=true", data
+    )
+    assert response.status == 200
+    assert "_:" in body.decode("utf-8") and "sha256:" not in body.decode("utf-8")
+
+    response, body = request(connection, "GET", "/stats")
+    stats = json.loads(body)
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    assert stats["subjects_hashed"] == 27
+    assert stats["latency"]["max"] > 0
+    assert "hash" in stats["phases"]
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("method=nope", "Invalid hash method"),
+        ("cache=x.sqlite", "configured by the server"),
+        ("colour=red", "Unknown option"),
+        ("accept=text/plain", "Unsupported accept"),
+        ("format=nt&select=type=", "Selector"),
+        ("graph=oxigraph-disk", "not available per request"),
+    ],
+)
+def test__bad_request(server, query, message):
+    response, body = request(connect(server), "POST", f"/hash?{query}", data)
+    assert response.status == 400
+    assert message in body.decode("utf-8")
+
+
+def test__request_options():
+    options = request_options("select=bnodes&bulk=", "text/turtle; charset=utf-8")
+    assert options["format"] == "text/turtle"
+    assert options["select"] == "bnodes" and options["bulk"]
+    with pytest.raises(ValueError, match="Unknown option"):
+        request_options("m=md5")
+
+
+def test__unix_socket_workers(tmp_path):
+    server = run(socket_path=str(tmp_path / "rdfhash.sock"), jobs=2)
+    try:
+        connection = connect(server)
+        for _ in range(3):
+            response, body = request(
+                connection, "POST", "/hash?format=nt&accept=nt&graph=oxigraph", data
+            )
+            assert response.status == 200
+            assert set(body.decode("utf-8").splitlines()) == expected()
+        response, body = request(connection, "GET", "/stats")
+        assert json.loads(body)["jobs"] == 2
+    finally:
+        server.shutdown()
+        server.close()
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from rdfhash import hash_subjects, hash_subjects_stream, Stats
+from rdfhash.utils.graph import graph_types
+
+chain = "".join(f"_:b{i} <p:next> _:b{i + 1} .\n" for i in range(9)) + (
+    '_:b9 <p:value> "end" .\n<p:root> <p:has> _:b0 .\n'
+)
+
+
+@pytest.mark.parametrize("graph_type", list(graph_types.keys()))
+@pytest.mark.parametrize("options", [{}, {"bulk": True}, {"workers": 2}])
+def test__stats_counters(graph_type, options):
+    stats = Stats()
+    graph, hashed_values = hash_subjects(
+        chain, "application/n-triples", graph_type=graph_type, stats=stats, **options
+    )
+    result = stats.to_dict()
+
+    assert result["counters"]["subjects_selected"] == 10
+    assert result["counters"]["subjects_hashed"] == len(hashed_values) == 10
+    assert result["counters"]["triples_before"] == 11
+    assert result["counters"]["triples_after"] == 11
+    assert result["counters"]["max_depth"] == 10
+    assert result["counters"]["bytes_hashed"] > 0
+    for phase in ("parse", "select", "canonicalize", "hash", "rewrite"):
+        assert result["phases"][phase]["wall"] >= 0
+        assert result["phases"][phase]["cpu"] >= 0
+
+
+def test__stats_stream():
+    stats = Stats()
+    output = io.StringIO()
+    hash_subjects_stream(
+        io.StringIO(chain), output, "application/n-triples", stats=stats
+    )
+    result = stats.to_dict()
+
+    assert result["counters"]["subjects_hashed"] == 10
+    assert result["counters"]["triples_before"] == 11
+    assert set(result["phases"]) == {"parse", "index", "hash", "rewrite"}
@@ -0,0 +1,86 @@
+import io
+from os import path
+from pathlib import Path
+from glob import glob
+
+from rdflib import Graph
+import pytest
+import pyoxigraph
+
+import rdfhash.stream
+from rdfhash import hash_subjects_stream
+from rdfhash.cli import cli
+from utils import compare_graphs
+
+repo_dir = path.dirname(Path(__file__).parent.absolute())
+ttl_files = (
+    path.relpath(file) for file in glob(path.join(repo_dir, "examples", "*.ttl"))
+)
+
+
+def to_ntriples(file_path):
+    buffer = io.BytesIO()
+    pyoxigraph.serialize(
+        pyoxigraph.parse(file_path, "text/turtle"), buffer, "application/n-triples"
+    )
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("file_path", ttl_files)
+@pytest.mark.parametrize("max_lines", [3, 500000])
+def test__hash_stream_examples(file_path, max_lines, hash_method="sha256"):
+    """Stream hash N-Triples of example file and compare against hash file."""
+    hash_file_path = path.join(
+        path.dirname(file_path),
+        "hashed",
+        f"{path.splitext(path.basename(file_path))[0]}__{hash_method}.ttl",
+    )
+
+    output = io.StringIO()
+    hash_subjects_stream(
+        to_ntriples(file_path),
+        output,
+        method=hash_method,
+        max_lines=max_lines,
+        sort_threshold=max_lines,
+    )
+
+    graph_generated = Graph(store="Oxigraph").parse(
+        data=output.getvalue(), format="nt"
+    )
+    graph_actual = Graph(store="Oxigraph").parse(hash_file_path)
+
+    assert compare_graphs(graph_generated, graph_actual)
+
+
+def test__hash_stream_circular():
+    data = io.StringIO("_:a <p:to> _:b .\n_:b <p:to> _:a .\n")
+    with pytest.raises(ValueError, match="Circular dependency"):
+        hash_subjects_stream(data, io.StringIO())
+
+
+def test__cli_stream_sort_threshold(tmp_path, monkeypatch):
+    input_path = tmp_path / "input.nt"
+    input_path.write_text('_:a <p:v> "1" .\n_:a <p:v> "2" .\n_:a <p:v> "3" .\n')
+
+    thresholds = []
+    hash_canonical_lines = rdfhash.stream.hash_canonical_lines
+
+    def spy(*args):
+        thresholds.append(args[5])
+        return hash_canonical_lines(*args)
+
+    monkeypatch.setattr(rdfhash.stream, "hash_canonical_lines", spy)
+
+    outputs = []
+    for threshold in [2, 1000000]:
+        output_path = tmp_path / f"output-{threshold}.nt"
+        cli(
+            [str(input_path), "--stream", "--sort-threshold", str(threshold)]
+            + ["-o", str(output_path)]
+        )
+        outputs.append(output_path.read_text())
+
+    assert thresholds == [2, 1000000]
+    assert outputs[0] == outputs[1]